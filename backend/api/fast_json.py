@@ -0,0 +1,66 @@
+"""
+Direct JSON encoding of index rows for large result pages: rows go from the
+SQLite cursor into bytes without intermediate dicts, pydantic or
+jsonable_encoder. orjson is used for string escaping and the columnar
+layout when installed; otherwise the stdlib C string escaper does the work.
+"""
+import json
+from json.encoder import encode_basestring, encode_basestring_ascii
+from typing import Iterable
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib fallback below
+    orjson = None
+
+ROW_FORMAT = "rows"  # {"items": [{"path", "size_bytes", "mtime_ns"}, ...]}
+COLUMN_FORMAT = "columns"  # {"paths": [...], "sizes": [...], "mtimes": [...]}
+FORMATS = (ROW_FORMAT, COLUMN_FORMAT)
+
+_ROW = b'{"path":%b,"size_bytes":%d,"mtime_ns":%d}'
+
+
+# Windows file names may hold lone surrogates, which are not valid UTF-8;
+# those fall back to \uXXXX escapes (valid JSON, round-trips in JS).
+
+
+def _encode_str(s: str) -> bytes:
+    try:
+        if orjson is not None:
+            return orjson.dumps(s)
+        return encode_basestring(s).encode("utf-8")
+    except (TypeError, UnicodeEncodeError):  # orjson.JSONEncodeError is a TypeError
+        return encode_basestring_ascii(s).encode("ascii")
+
+
+def _dumps(obj) -> bytes:
+    try:
+        if orjson is not None:
+            return orjson.dumps(obj)
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    except (TypeError, UnicodeEncodeError):
+        return json.dumps(obj, separators=(",", ":")).encode("ascii")
+
+
+def encode_file_rows(
+    rows: Iterable[tuple[str, int, int]],
+    fmt: str = ROW_FORMAT,
+    extra: dict | None = None,
+) -> bytes:
+    """
+    JSON body for (path, size_bytes, mtime_ns) rows in the row or columnar
+    layout; extra keys (limit, offset, ...) are appended at the top level.
+    """
+    tail = b"".join(b"," + _encode_str(k) + b":" + _dumps(v) for k, v in (extra or {}).items())
+    if fmt == COLUMN_FORMAT:
+        paths: list[str] = []
+        sizes: list[int] = []
+        mtimes: list[int] = []
+        for path, size, mtime in rows:
+            paths.append(path)
+            sizes.append(size)
+            mtimes.append(mtime)
+        body = _dumps({"paths": paths, "sizes": sizes, "mtimes": mtimes})
+        return body[:-1] + tail + b"}"
+    items = b",".join(_ROW % (_encode_str(path), size, mtime) for path, size, mtime in rows)
+    return b'{"items":[' + items + b"]" + tail + b"}"
@@ -0,0 +1,108 @@
+"""
+HTTP caching for read-mostly endpoints. A response's ETag is derived from
+the route, its query parameters and a version tuple that changes whenever
+the underlying data does (config version, disk sample time, index
+generation), so validating a poll costs no serialization at all:
+If-None-Match answers 304, and otherwise a small LRU of serialized bodies
+keyed by route + parameters is reused while the version is unchanged.
+"""
+import hashlib
+import inspect
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Callable
+
+from fastapi import Request, Response
+
+from backend.core.constants import RESPONSE_CACHE_ENTRIES
+
+
+class ResponseCache:
+    """LRU of (version, etag, body) keyed by route + query parameters."""
+
+    def __init__(self, maxsize: int = RESPONSE_CACHE_ENTRIES) -> None:
+        self.maxsize = maxsize
+        self._entries: OrderedDict[tuple, tuple[tuple, str, bytes]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple, version: tuple) -> tuple[str, bytes] | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != version:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1], entry[2]
+
+    def put(self, key: tuple, version: tuple, etag: str, body: bytes) -> None:
+        with self._lock:
+            self._entries[key] = (version, etag, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+_cache = ResponseCache()
+# Versions are in-process counters; the boot token keeps ETags from one run valid only for that run
+_BOOT_TOKEN = os.urandom(6).hex()
+
+
+def get_response_cache() -> ResponseCache:
+    """Process-wide response cache."""
+    return _cache
+
+
+def make_etag(key: tuple, version: tuple) -> str:
+    raw = repr((_BOOT_TOKEN, key, version)).encode("utf-8")
+    digest = hashlib.blake2b(raw, digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+
+def _etag_matches(header: str | None, etag: str) -> bool:
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(tag.strip() == etag for tag in header.split(","))
+
+
+async def cached_json(
+    request: Request,
+    version: tuple,
+    build: Callable[[], Any],
+    cache: ResponseCache | None = None,
+) -> Response:
+    """
+    JSON response for request with an ETag from (path, query, version).
+    build() (sync or async) is only called on an LRU miss and returns either
+    data to serialize or an already encoded JSON body (bytes); a matching
+    If-None-Match returns 304 without looking at the body.
+    """
+    cache = cache or _cache
+    key = (request.url.path, tuple(sorted(request.query_params.multi_items())))
+    etag = make_etag(key, version)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    hit = cache.get(key, version)
+    if hit is not None:
+        body = hit[1]
+    else:
+        data = build()
+        if inspect.isawaitable(data):
+            data = await data
+        if isinstance(data, bytes):
+            body = data
+        else:
+            body = json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        cache.put(key, version, etag, body)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,34 @@
+"""
+ASGI middleware recording per-route request latency into
+http_request_duration_seconds. The route label is the matched path template
+(e.g. /api/disk/usage/{drive}), so label cardinality stays bounded.
+"""
+import time
+
+from backend.core.metrics import HTTP_REQUEST_SECONDS
+
+
+class RequestMetricsMiddleware:
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter_ns()
+        status = [500]
+
+        async def send_wrapper(message) -> None:
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get("route")
+            template = getattr(route, "path", None) or "unmatched"
+            HTTP_REQUEST_SECONDS.labels(scope.get("method", ""), template, str(status[0])).record_ns(
+                time.perf_counter_ns() - start
+            )
@@ -0,0 +1,48 @@
+"""
+ASGI middleware: ?profile=sample|cprofile on any request profiles it
+(backend.core.profiler). The response carries X-Profile with the output file
+name, downloadable from GET /api/profiles/{name} once the request finishes.
+cprofile covers the event-loop thread only (other requests interleave there);
+work the route hands to an executor pool shows up in sample mode. No
+pause_point() runs on the event loop, so a loop timer stops a cprofile
+session after PROFILE_MAX_SECONDS even if the request is still going.
+"""
+import asyncio
+from urllib.parse import parse_qs
+
+from starlette.responses import JSONResponse
+
+from backend.core.profiler import MODES, profiling
+
+
+class RequestProfilerMiddleware:
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or b"profile=" not in scope.get("query_string", b""):
+            await self.app(scope, receive, send)
+            return
+        modes = parse_qs(scope["query_string"].decode("latin-1")).get("profile")
+        if not modes:
+            await self.app(scope, receive, send)
+            return
+        mode = modes[0]
+        if mode not in MODES:
+            await JSONResponse({"detail": "profile 须为 sample 或 cprofile"}, status_code=400)(scope, receive, send)
+            return
+        with profiling(f"{scope.get('method', '')} {scope.get('path', '')}", mode) as session:
+
+            async def send_wrapper(message) -> None:
+                if session is not None and message["type"] == "http.response.start":
+                    message["headers"] = list(message.get("headers", [])) + [(b"x-profile", session.name.encode())]
+                await send(message)
+
+            timer = None
+            if session is not None and session.mode == "cprofile":
+                timer = asyncio.get_running_loop().call_later(session.max_seconds, session.expire)
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                if timer is not None:
+                    timer.cancel()
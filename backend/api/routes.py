@@ -1,27 +1,56 @@
 """
 REST API: disk info, config, rules, scan triggers. All under /api.
+
+Cheap endpoints are async and answer from in-memory state (sampler, volume
+registry, cached config). Blocking work runs on the dedicated pools in
+backend.core.executors (UI dialogs, disk probes, DB reads) rather than
+Starlette's shared threadpool.
 """
+import threading
+import time
 from typing import Any
 
-from fastapi import APIRouter, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, HTTPException, Request, Response
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse
 from pydantic import BaseModel
 
+from backend.api.fast_json import FORMATS, encode_file_rows
+from backend.api.http_cache import cached_json
 from backend.core.config import (
     AppSettings,
+    get_config_version,
     load_config,
+    load_config_cached,
     save_config,
 )
+from backend.core.executors import DB, DISK, UI, WorkCancelled, run_blocking, run_blocking_watched
+from backend.core.metrics import get_metrics
+from backend.core.profiler import MODES as PROFILE_MODES, list_profiles, profile_job, profile_path
 from backend.utils.startup import set_start_with_windows
 from backend.core.constants import DEFAULT_PAGE_SIZE, MAX_RESULTS_PAGE
 from backend.services.index_service import (
+    LARGE_FILE_SORTS,
+    count_large_files,
+    decode_large_files_cursor,
+    encode_large_files_cursor,
     ensure_index_schema,
     full_scan_directory,
+    get_index_generation,
+    growth_report,
     index_full_scan_volume,
-    query_large_files,
+    iter_large_files,
+    iter_name_search,
+    refresh_index_volume,
 )
-from backend.utils.disk import get_all_disk_usage, get_disk_usage
-from backend.utils.usn_journal import is_usn_available
+from backend.services.junk_policy import age_report
+from backend.services.junk_service import get_junk_analyzer
+from backend.services.monitor_service import find_rule, run_rule_cleanup
+from backend.services.idle_scheduler import get_idle_scheduler
+from backend.services.quarantine_service import get_quarantine_store
+from backend.services.disk_sampler import get_disk_sampler
+from backend.services.forecast_service import get_disk_forecaster
+from backend.utils.disk import get_disk_usage
+from backend.utils.volumes import get_volume_registry
 
 router = APIRouter(prefix="/api", tags=["api"])
 
@@ -29,27 +58,43 @@ router = APIRouter(prefix="/api", tags=["api"])
 # --- Disk ---
 
 
-@router.get("/disk/drives")
-def api_disk_drives() -> list[dict]:
-    """List fixed drives and basic usage."""
-    usages = get_all_disk_usage()
-    return [
-        {
+async def _ensure_sampled() -> None:
+    """First request before the sampler's first round: take one sample on the disk pool."""
+    sampler = get_disk_sampler()
+    if not sampler.last_sample_at:
+        await run_blocking(DISK, sampler.sample_once)
+
+
+def _drives_payload() -> list[dict]:
+    registry = get_volume_registry()
+    result = []
+    for u in get_disk_sampler().latest_all():
+        volume = registry.get(u.drive, refresh=False)
+        result.append({
             "drive": u.drive,
             "total_bytes": u.total_bytes,
             "used_bytes": u.used_bytes,
             "free_bytes": u.free_bytes,
             "free_percent": round(u.free_percent, 2),
-            "usn_available": is_usn_available(u.drive),
-        }
-        for u in usages
-    ]
+            "fs_type": volume.fs_type if volume else "",
+            "usn_available": volume.usn_available if volume else False,
+        })
+    return result
+
+
+@router.get("/disk/drives", response_model=list[dict])
+async def api_disk_drives(request: Request):
+    """List fixed drives and basic usage (capabilities from the volume registry cache)."""
+    await _ensure_sampled()
+    version = (get_disk_sampler().last_sample_at, get_volume_registry().generation)
+    return await cached_json(request, version, _drives_payload)
 
 
 @router.get("/disk/usage/{drive}")
-def api_disk_usage(drive: str) -> dict:
-    """Get usage for one drive (e.g. C or C:)."""
-    u = get_disk_usage(drive)
+async def api_disk_usage(drive: str) -> dict:
+    """Get usage for one drive (e.g. C or C:); latest sample, direct query for unsampled drives."""
+    await _ensure_sampled()
+    u = get_disk_sampler().latest(drive) or await run_blocking(DISK, get_disk_usage, drive)
     if u is None:
         raise HTTPException(status_code=404, detail="Drive not found or not accessible")
     return {
@@ -61,13 +106,49 @@ def api_disk_usage(drive: str) -> dict:
     }
 
 
+@router.get("/disk/history")
+async def api_disk_history(drive: str, points: int = 200, hours: float | None = None) -> dict:
+    """Downsampled free-space series for charting (from the sampler ring buffer)."""
+    points = max(1, min(points, 2000))
+    since = time.time() - hours * 3600 if hours else 0.0
+    series = get_disk_sampler().history(drive, points=points, since=since)
+    if series is None:
+        raise HTTPException(status_code=404, detail="No samples for this drive")
+    return series
+
+
+@router.get("/disk/forecast")
+async def api_disk_forecast() -> list[dict]:
+    """Per-drive free-space trend and ETA to each configured alert threshold."""
+    forecaster = get_disk_forecaster()
+    thresholds = load_config_cached().disk_thresholds
+    result = []
+    for item in forecaster.summary():
+        etas = []
+        for t in thresholds:
+            letter = (t.drive_letter or "").strip().upper().rstrip(":")
+            if letter and not item["drive"].upper().startswith(letter):
+                continue
+            eta = forecaster.seconds_until(item["drive"], t.free_percent_alert_below)
+            etas.append({
+                "free_percent_alert_below": t.free_percent_alert_below,
+                "eta_hours": None if eta is None else round(eta / 3600, 1),
+            })
+        result.append({**item, "thresholds": etas})
+    return result
+
+
 # --- Config ---
 
 
-@router.get("/config")
-def api_config_get() -> dict:
+@router.get("/config", response_model=dict)
+async def api_config_get(request: Request):
     """Return current app settings (JSON-serializable)."""
-    return load_config().model_dump(mode="json")
+    return await cached_json(
+        request,
+        (get_config_version(),),
+        lambda: load_config_cached().model_dump(mode="json"),
+    )
 
 
 class ConfigUpdateBody(BaseModel):
@@ -107,92 +188,312 @@ def api_config_update(body: ConfigUpdateBody) -> dict:
 # --- Large files / index ---
 
 
-@router.get("/scan/large-files")
-def api_scan_large_files(
+def _resolve_volume(drive: str, refresh: bool = False) -> tuple[str, str]:
+    """(index volume label, root) for "C", "C:" or a platform label; Windows-style fallback for unknown drives."""
+    volume = get_volume_registry().get(drive, refresh=refresh)
+    if volume is not None:
+        return volume.drive, volume.root
+    label = drive.rstrip(":\\") + ":"
+    return label, label + "\\"
+
+
+@router.get("/scan/large-files", response_model=dict)
+async def api_scan_large_files(
+    request: Request,
     drive: str | None = None,
     min_size_mb: float = 500,
     extensions: str | None = None,
     limit: int = DEFAULT_PAGE_SIZE,
     offset: int = 0,
-) -> dict:
+    format: str = "rows",
+    sort: str = "size",
+    order: str = "desc",
+    q: str | None = None,
+    cursor: str | None = None,
+    total: bool = False,
+):
     """
     Query indexed large files. If index empty, returns empty list; caller
     can trigger rebuild via POST /api/scan/rebuild-index.
+    format=rows: {"items": [{path, size_bytes, mtime_ns}]}; format=columns:
+    {"paths": [...], "sizes": [...], "mtimes": [...]} (compact, for tables).
+    sort=size|mtime|path with order=desc|asc; q filters on a path substring.
+    Pages continue from next_cursor (keyset, so deep pages are as cheap as the
+    first; null on the last page); total=true adds the match count. A request
+    whose client disconnects is dropped from the DB queue or interrupted.
     """
+    if format not in FORMATS:
+        raise HTTPException(status_code=400, detail="format must be rows or columns")
+    if sort not in LARGE_FILE_SORTS or order not in ("asc", "desc"):
+        raise HTTPException(status_code=400, detail="sort 须为 size、mtime 或 path，order 须为 asc 或 desc")
+    after = None
+    if cursor:
+        try:
+            after = decode_large_files_cursor(cursor, sort)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="cursor 无效或与排序方式不符")
     if limit <= 0 or limit > MAX_RESULTS_PAGE:
         limit = DEFAULT_PAGE_SIZE
     exts = [e.strip() for e in extensions.split(",")] if extensions else None
     min_bytes = int(min_size_mb * 1024 * 1024)
-    vol = drive.rstrip(":") + ":" if drive else None
-    rows = query_large_files(
-        volume=vol,
-        min_size_bytes=min_bytes,
-        extensions=exts,
-        limit=limit,
-        offset=offset,
-    )
-    return {"items": rows, "limit": limit, "offset": offset}
+    vol = _resolve_volume(drive)[0] if drive else None
+    name = q.strip() if q else None
+
+    def encode(cancelled: threading.Event) -> bytes:
+        extra: dict[str, Any] = {"limit": limit, "offset": offset}
+        if total:
+            extra["total"] = count_large_files(vol, min_bytes, exts, name, cancelled=cancelled)
+        rows = list(iter_large_files(
+            volume=vol,
+            min_size_bytes=min_bytes,
+            extensions=exts,
+            limit=limit,
+            offset=offset,
+            sort=sort,
+            descending=order == "desc",
+            after=after,
+            name_contains=name,
+            cancelled=cancelled,
+        ))
+        extra["next_cursor"] = encode_large_files_cursor(rows[-1], sort) if len(rows) == limit else None
+        return encode_file_rows(rows, format, extra)
+
+    async def build() -> bytes:
+        return await run_blocking_watched(DB, request.is_disconnected, encode)
+
+    try:
+        return await cached_json(request, (get_index_generation(),), build)
+    except WorkCancelled:
+        return Response(status_code=499)  # client closed request; nobody reads this
 
 
 class RebuildIndexBody(BaseModel):
     drive: str  # e.g. "C:"
+    incremental: bool = False  # True: directory-mtime rescan when a previous index exists
+    profile: str | None = None  # "sample" / "cprofile": profile this job (see GET /api/profiles)
 
 
 @router.post("/scan/rebuild-index")
-def api_scan_rebuild_index(body: RebuildIndexBody) -> dict:
-    """Trigger full index rebuild for one drive (runs in background; returns immediately)."""
-    drive = body.drive.rstrip(":\\") + ":"
-    root = drive + "\\"
-    import threading
+async def api_scan_rebuild_index(body: RebuildIndexBody) -> dict:
+    """
+    Queue an index rebuild for one drive on the idle scheduler (runs once the
+    machine is idle, pauses when the user is active; returns immediately).
+    status is "already_queued" when a rebuild of this drive is pending or running.
+    """
+    if body.profile is not None and body.profile not in PROFILE_MODES:
+        raise HTTPException(status_code=400, detail="profile 须为 sample 或 cprofile")
+    drive, root = await run_blocking(DISK, _resolve_volume, body.drive, True)
 
     def run():
-        index_full_scan_volume(drive, root)
+        with profile_job(f"index {drive}", body.profile):
+            if body.incremental:
+                refresh_index_volume(drive, root)
+            else:
+                index_full_scan_volume(drive, root)
+
+    queued = get_idle_scheduler().submit(f"index_rebuild {drive}", run)
+    return {"status": "queued" if queued else "already_queued", "drive": drive, "incremental": body.incremental}
+
+
+@router.get("/scan/growth")
+async def api_scan_growth(drive: str | None = None, hours: float | None = None, limit: int = 20) -> dict:
+    """
+    Top growing directories and files between index scans: since the previous
+    scan by default, or summed over scans in the last `hours`.
+    """
+    if limit <= 0 or limit > MAX_RESULTS_PAGE:
+        limit = 20
+    vol = _resolve_volume(drive)[0] if drive else None
+    since = time.time() - hours * 3600 if hours else None
+    return await run_blocking(DB, growth_report, volume=vol, since=since, limit=limit)
+
+
+@router.get("/search", response_model=dict)
+async def api_search(
+    request: Request,
+    q: str = "",
+    drive: str | None = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    cursor: str | None = None,
+    format: str = "rows",
+):
+    """
+    Indexed files by name: q is a case-insensitive substring, or a glob on the
+    whole name when it contains * ? or [...] ("*.iso", "IMG_20??_*.jpg").
+    Same body layouts as /api/scan/large-files; pages continue from
+    next_cursor (null on the last page).
+    """
+    query = q.strip()
+    if not query:
+        raise HTTPException(status_code=400, detail="q 不能为空")
+    if format not in FORMATS:
+        raise HTTPException(status_code=400, detail="format must be rows or columns")
+    try:
+        after = int(cursor) if cursor else 0
+    except ValueError:
+        raise HTTPException(status_code=400, detail="cursor 无效")
+    if limit <= 0 or limit > MAX_RESULTS_PAGE:
+        limit = DEFAULT_PAGE_SIZE
+    vol = _resolve_volume(drive)[0] if drive else None
+
+    def encode(cancelled: threading.Event) -> bytes:
+        found = list(iter_name_search(query, volume=vol, limit=limit, after=after, cancelled=cancelled))
+        extra = {"limit": limit, "next_cursor": str(found[-1][0]) if len(found) == limit else None}
+        return encode_file_rows((row[1:] for row in found), format, extra)
+
+    async def build() -> bytes:
+        return await run_blocking_watched(DB, request.is_disconnected, encode)
+
+    try:
+        return await cached_json(request, (get_index_generation(),), build)
+    except WorkCancelled:
+        return Response(status_code=499)
+
+
+# --- Junk ---
 
-    t = threading.Thread(target=run, daemon=True)
-    t.start()
-    return {"status": "started", "drive": drive}
+
+@router.get("/junk/summary")
+async def api_junk_summary(refresh: bool = False) -> dict:
+    """Junk size by category and root; served from the last analysis unless refresh=true."""
+    analyzer = get_junk_analyzer()
+    report = None if refresh else analyzer.last_report()
+    if report is None:
+        report = await run_blocking(DISK, analyzer.analyze)
+    return report.to_dict()
+
+
+@router.get("/junk/age-report")
+async def api_junk_age_report(cutoffs: str = "7,30,90", basis: str = "mtime") -> dict:
+    """Bytes a junk rule would free at each age cutoff (days), from the index."""
+    try:
+        days = [float(c) for c in cutoffs.split(",") if c.strip()]
+    except ValueError:
+        raise HTTPException(status_code=400, detail="cutoffs must be comma-separated numbers")
+    if basis not in ("mtime", "atime"):
+        raise HTTPException(status_code=400, detail="basis must be mtime or atime")
+    return await run_blocking(DB, age_report, days, age_basis=basis)
+
+
+# --- Cleanup ---
+
+
+class CleanupRunBody(BaseModel):
+    rule_id: str
+    dry_run: bool = True
+
+
+@router.post("/cleanup/run")
+async def api_cleanup_run(body: CleanupRunBody) -> dict:
+    """Run one rule's cleanup now (dry-run by default); returns the run report."""
+    rule = find_rule(body.rule_id)
+    if rule is None:
+        raise HTTPException(status_code=404, detail="Rule not found")
+    report = await run_blocking(DISK, run_rule_cleanup, rule, dry_run=body.dry_run)
+    return report.to_dict()
+
+
+@router.get("/quarantine/runs")
+async def api_quarantine_runs() -> list[dict]:
+    """Cleanup runs whose files are still held in quarantine."""
+    return await run_blocking(DB, lambda: get_quarantine_store().list_runs())
+
+
+class QuarantineRestoreBody(BaseModel):
+    run_id: str
+    overwrite: bool = False
+
+
+@router.post("/quarantine/restore")
+async def api_quarantine_restore(body: QuarantineRestoreBody) -> dict:
+    """Move every file of one run back to its original location."""
+    return await run_blocking(
+        DISK, lambda: get_quarantine_store().restore_run(body.run_id, overwrite=body.overwrite).to_dict()
+    )
 
 
 # --- Folder picker ---
 
 
+_dialog_open = False  # one native dialog at a time (only touched on the event loop)
+
+
+def _pick_folder_dialog(initial_dir: str | None) -> str:
+    """Blocking tkinter folder dialog; "" on cancel or error."""
+    try:
+        import tkinter as tk
+        from tkinter import filedialog
+        root = tk.Tk()
+        root.withdraw()
+        root.attributes("-topmost", True)
+        path = filedialog.askdirectory(
+            initialdir=initial_dir or "",
+            title="选择文件夹"
+        )
+        root.destroy()
+        return path or ""
+    except Exception:
+        return ""
+
+
 @router.get("/pick-folder")
-def api_pick_folder(initial_dir: str | None = None) -> dict:
+async def api_pick_folder(initial_dir: str | None = None) -> dict:
     """
     Open a native folder picker dialog and return selected path.
-    Returns empty string if user cancels.
+    Returns empty string if user cancels. The request waits for as long as
+    the dialog is open (a dialog cannot be closed from outside, so a timeout
+    would only throw the choice away); 409 while another dialog is open.
     """
-    import threading
-    result = {"path": ""}
-    event = threading.Event()
-
-    def pick():
-        try:
-            import tkinter as tk
-            from tkinter import filedialog
-            root = tk.Tk()
-            root.withdraw()
-            root.attributes("-topmost", True)
-            path = filedialog.askdirectory(
-                initialdir=initial_dir or "",
-                title="选择文件夹"
-            )
-            root.destroy()
-            result["path"] = path or ""
-        except Exception:
-            result["path"] = ""
-        finally:
-            event.set()
-
-    t = threading.Thread(target=pick)
-    t.start()
-    event.wait(timeout=120)
-    return result
+    global _dialog_open
+    if _dialog_open:
+        raise HTTPException(status_code=409, detail="已有一个选择文件夹对话框打开，请先完成或关闭它")
+    _dialog_open = True
+    try:
+        path = await run_blocking(UI, _pick_folder_dialog, initial_dir)
+    finally:
+        _dialog_open = False
+    return {"path": path}
 
 
 # --- Health ---
 
 
 @router.get("/health")
-def api_health() -> dict:
+async def api_health() -> dict:
     return {"status": "ok"}
+
+
+@router.get("/metrics")
+async def api_metrics(format: str = "prometheus"):
+    """
+    Request latency, SQLite query time, walker throughput, throttling, queue
+    depths and notification latency. format: prometheus (text exposition) or json.
+    """
+    if format not in ("prometheus", "json"):
+        raise HTTPException(status_code=400, detail="format 须为 prometheus 或 json")
+    registry = get_metrics()
+    if format == "json":
+        return registry.to_dict()
+    return PlainTextResponse(registry.render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
+# --- Profiles ---
+
+
+@router.get("/profiles")
+async def api_profiles() -> list[dict]:
+    """
+    Profiles written by ?profile=sample|cprofile on a request, the rebuild-index
+    "profile" flag or WINDOWS_CLEANER_PROFILE for scan jobs; newest first.
+    """
+    return await run_blocking(DISK, list_profiles)
+
+
+@router.get("/profiles/{name}")
+async def api_profile_download(name: str):
+    """Download one profile: .folded (collapsed stacks) or .prof (pstats)."""
+    path = await run_blocking(DISK, profile_path, name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    media_type = "text/plain; charset=utf-8" if name.endswith(".folded") else "application/octet-stream"
+    return FileResponse(path, media_type=media_type, filename=name)
@@ -4,6 +4,7 @@ intervals and limits stay in constants.py and resource_guard.
 """
 import json
 import os
+import threading
 from pathlib import Path
 from typing import Any
 
@@ -28,8 +29,13 @@ class CleanupRuleConfig(BaseModel):
     rule_type: str = "large_file"  # large_file | by_extension | junk
     size_mb_min: float = 500.0  # for large_file
     extensions: list[str] = Field(default_factory=lambda: [".mp4", ".avi"])  # for by_extension
+    min_age_days: float = 30.0  # for junk
+    age_basis: str = "mtime"  # for junk: mtime | atime
+    junk_min_size_kb: float = 0.0  # for junk
+    categories: list[str] = Field(default_factory=list)  # for junk: temp | inetcache | browser_cache; empty = all
     cron_expr: str = "0 3 * * *"  # default 3:00 daily
     auto_clean: bool = False  # False = notify only
+    clean_action: str = "recycle"  # recycle | quarantine | delete (used when auto_clean)
 
 
 class NotificationConfig(BaseModel):
@@ -42,6 +48,7 @@ class NotificationConfig(BaseModel):
     smtp_user: str = ""
     smtp_password: str = ""
     smtp_use_tls: bool = True
+    smtp_allow_plain_login: bool = False  # log in on a plain port without STARTTLS (password sent in cleartext)
     notify_email_to: str = ""
 
 
@@ -89,6 +96,51 @@ def save_config(settings: AppSettings) -> None:
     ensure_config_dir()
     with open(CONFIG_FILE, "w", encoding="utf-8") as f:
         f.write(settings.model_dump_json(indent=2))
+    _invalidate_cached_config()
+
+
+_cache_lock = threading.Lock()
+_cached: tuple[tuple, AppSettings] | None = None  # ((path, mtime_ns, size), settings)
+_config_version = 0
+
+
+def _file_key() -> tuple:
+    try:
+        st = os.stat(CONFIG_FILE)
+        return (CONFIG_FILE, st.st_mtime_ns, st.st_size)
+    except OSError:
+        return (CONFIG_FILE, None, None)
+
+
+def _invalidate_cached_config() -> None:
+    global _cached, _config_version
+    with _cache_lock:
+        _cached = None
+        _config_version += 1
+
+
+def load_config_cached() -> AppSettings:
+    """
+    Shared, read-only settings: re-parsed only when the config file changes
+    (one stat per call). Callers must not mutate the returned object.
+    """
+    global _cached, _config_version
+    key = _file_key()
+    with _cache_lock:
+        if _cached is not None and _cached[0] == key:
+            return _cached[1]
+    settings = load_config()
+    with _cache_lock:
+        if _cached is None or _cached[0] != key:
+            _config_version += 1
+        _cached = (key, settings)
+    return settings
+
+
+def get_config_version() -> int:
+    """Counter bumped whenever the settings seen by load_config_cached change."""
+    load_config_cached()
+    return _config_version
 
 
 def get_config_path() -> str:
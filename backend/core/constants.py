@@ -17,23 +17,85 @@ CONFIG_DIR = _base
 CONFIG_FILE = os.path.join(CONFIG_DIR, "config.json")
 INDEX_DB_DIR = CONFIG_DIR
 INDEX_DB_NAME = "file_index.db"
+QUARANTINE_DIR = os.path.join(CONFIG_DIR, "quarantine")
+QUARANTINE_VOLUME_DIR_NAME = ".wc_quarantine"  # store root at the top of other volumes (quarantine is a rename)
+PROFILE_DIR = os.path.join(CONFIG_DIR, "profiles")
+
+# Platform layer: "windows" / "posix" / "fake" (headless, volumes from FAKE_VOLUMES_ENV_VAR)
+PLATFORM_ENV_VAR = "WINDOWS_CLEANER_PLATFORM"
+FAKE_VOLUMES_ENV_VAR = "WINDOWS_CLEANER_FAKE_VOLUMES"
 
 # Internal intervals (not user-configurable)
 DISK_CHECK_INTERVAL_MINUTES = 20
+DISK_SAMPLE_INTERVAL_SECONDS = 60
+DISK_HISTORY_CAPACITY = 7 * 24 * 60  # one week at the sample interval
 LARGE_FILE_JUNK_SCAN_INTERVAL_HOURS = 24
+# First rules/junk pass after launch waits this long, so it does not compete with startup
+STARTUP_HEAVY_WORK_DELAY_SECONDS = 120
+# run.py / main: how long to wait for uvicorn to bind before giving up on the window
+SERVER_READY_TIMEOUT_SECONDS = 15
 BATCH_DIRS_BEFORE_SLEEP = 200
 BATCH_SLEEP_SECONDS = 0.5
 RESOURCE_CHECK_INTERVAL_SECONDS = 5
+GROWTH_HISTORY_DAYS = 30  # scan generations (and their growth deltas) kept this long
+GROWTH_FILE_MIN_DELTA_BYTES = 1024 * 1024  # smaller per-file changes only show in dir totals
+NAME_SEARCH_BACKFILL_ROWS = 20_000  # file rows per transaction when filling name search for an older index
+
+FORECAST_LEVEL_TAU_SECONDS = 3600
+FORECAST_TREND_TAU_SECONDS = 6 * 3600
+FORECAST_MIN_HISTORY_SECONDS = 6 * 3600
+FORECAST_CLIP_MADS = 4.0
+FORECAST_ALERT_HORIZON_HOURS = 72
+ALERT_BATCH_WINDOW_SECONDS = 60  # alerts within this window go out as one digest
+ALERT_MAX_PER_HOUR = 6
+ALERT_REARM_MARGIN_PERCENT = 2.0  # free % must recover this far above a threshold to alert again
+NOTIFY_QUEUE_SIZE = 32  # pending deliveries; overflow is merged into the newest one
+NOTIFY_MAX_RETRIES = 3
+NOTIFY_RETRY_BACKOFF_SECONDS = 2.0  # doubled per attempt
+SMTP_TIMEOUT_SECONDS = 10
+SMTP_IDLE_TIMEOUT_SECONDS = 60  # close the kept-open SMTP session after this long unused
+VOLUME_REFRESH_SECONDS = 300
+VOLUME_PROBE_TIMEOUT_SECONDS = 2.0
 
 # Resource guard thresholds (internal)
 CPU_PERCENT_THRESHOLD = 70.0
 MEMORY_MB_THRESHOLD = 400
 HIGH_LOAD_SLEEP_SECONDS = 10
 
+# Idle scheduler (internal): heavy jobs run while the machine is idle and pause when it is not
+IDLE_POLL_SECONDS = 15
+IDLE_CPU_PERCENT = 25.0  # system CPU, excluding this process
+IDLE_DISK_BYTES_PER_SECOND = 8 * 1024 * 1024  # system disk I/O, excluding this process
+IDLE_INPUT_SECONDS = 180  # no keyboard/mouse input for this long (where detectable)
+IDLE_SETTLE_SECONDS = 60  # idle this long before a job starts or resumes
+IDLE_MAX_DEFER_SECONDS = 6 * 3600  # overdue jobs then run anyway (throttled, not paused)
+
+# Profiler (opt-in): scan jobs are profiled when this env var is "sample" or "cprofile"
+PROFILE_ENV_VAR = "WINDOWS_CLEANER_PROFILE"
+PROFILE_SAMPLE_INTERVAL_SECONDS = 0.005
+PROFILE_MAX_SECONDS = 120  # sampling stops after this; cProfile at the next checkpoint
+PROFILE_MAX_DEPTH = 96  # deeper stacks keep their innermost frames
+PROFILE_MAX_BYTES = 4 * 1024 * 1024  # per output file; least-hit stacks / functions are dropped
+PROFILE_KEEP_FILES = 40
+
 # Index / scan
 MAX_RESULTS_PAGE = 500
 DEFAULT_PAGE_SIZE = 100
 
+# API executors (internal): dedicated pools for blocking work behind async routes
+UI_DIALOG_WORKERS = 1  # one folder dialog at a time (see api_pick_folder)
+DISK_PROBE_WORKERS = 4
+DB_READ_WORKERS = 4
+DISCONNECT_POLL_SECONDS = 0.05  # how often a waiting DB read checks whether its client is still there
+CANCEL_CHECK_INSTRUCTIONS = 1000  # SQLite VM steps between checks of a query's cancel flag
+RESPONSE_CACHE_ENTRIES = 64  # serialized bodies kept for ETag'd GET endpoints
+
+# Cleanup executor (internal)
+CLEANUP_BATCH_SIZE = 200
+CLEANUP_WORKERS = 4
+QUARANTINE_MAX_AGE_DAYS = 30
+QUARANTINE_MAX_BYTES = 10 * 1024 * 1024 * 1024
+
 # Junk dirs (Windows common temp/cache)
 JUNK_DIR_ENV_KEYS = [
     "TEMP",
@@ -41,6 +103,10 @@ JUNK_DIR_ENV_KEYS = [
     "LOCALAPPDATA",
 ]
 
+# Junk analyzer (internal)
+JUNK_ROOT_TIME_BUDGET_SECONDS = 30
+JUNK_WORKERS = 4
+
 # Junk subpaths under LOCALAPPDATA (relative)
 JUNK_SUBPATHS = [
     "Temp",
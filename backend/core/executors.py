@@ -0,0 +1,91 @@
+"""
+Dedicated thread pools for blocking work done on behalf of API requests.
+Each kind of slow call gets its own small pool, so open folder dialogs, a
+stalled volume probe or a long index query cannot exhaust Starlette's
+shared threadpool (and with it /api/health and the cached endpoints).
+
+run_blocking_watched() additionally stops work for clients that have gone
+away (a virtual table scrolled past a page, a filter retyped): queued calls
+are dropped and running ones see their cancel event set.
+"""
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable
+
+from backend.core.constants import (
+    DB_READ_WORKERS,
+    DISCONNECT_POLL_SECONDS,
+    DISK_PROBE_WORKERS,
+    UI_DIALOG_WORKERS,
+)
+from backend.core.metrics import QUEUE_DEPTH
+
+UI = "ui"  # native dialogs (tkinter); may block for minutes
+DISK = "disk"  # volume probes, disk_usage, junk walks
+DB = "db"  # SQLite index reads
+
+_POOL_SIZES = {UI: UI_DIALOG_WORKERS, DISK: DISK_PROBE_WORKERS, DB: DB_READ_WORKERS}
+_pools: dict[str, ThreadPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+
+def get_executor(kind: str) -> ThreadPoolExecutor:
+    """Shared pool for one kind of blocking work (created on first use)."""
+    with _pools_lock:
+        pool = _pools.get(kind)
+        if pool is None:
+            pool = _pools[kind] = ThreadPoolExecutor(
+                max_workers=_POOL_SIZES[kind], thread_name_prefix=f"api-{kind}"
+            )
+            QUEUE_DEPTH.set_function(pool._work_queue.qsize, f"pool_{kind}")
+        return pool
+
+
+async def run_blocking(kind: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Await fn(*args, **kwargs) running on the pool for kind."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(kind), functools.partial(fn, *args, **kwargs))
+
+
+class WorkCancelled(Exception):
+    """Blocking work stopped because its requester is gone."""
+
+
+async def run_blocking_watched(
+    kind: str,
+    disconnected: Callable[[], Awaitable[bool]],
+    fn: Callable[..., Any],
+    *args: Any,
+    **kwargs: Any,
+) -> Any:
+    """
+    run_blocking(kind, fn, *args, cancelled=event, **kwargs), polling
+    disconnected() while it waits. Once the client is gone the call is removed
+    from the pool queue if it has not started, and event is set so a running
+    fn can stop early; either way WorkCancelled is raised.
+    """
+    cancelled = threading.Event()
+    future = asyncio.ensure_future(run_blocking(kind, fn, *args, cancelled=cancelled, **kwargs))
+    while True:
+        done, _ = await asyncio.wait({future}, timeout=DISCONNECT_POLL_SECONDS)
+        if done:
+            return future.result()
+        if await disconnected():
+            cancelled.set()
+            future.cancel()
+            try:
+                await future
+            except (asyncio.CancelledError, WorkCancelled):
+                pass
+            raise WorkCancelled()
+
+
+def shutdown_executors() -> None:
+    """Stop accepting work on all pools (running dialogs are not waited for)."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.shutdown(wait=False, cancel_futures=True)
@@ -41,6 +41,9 @@ def setup_logging(log_dir: str | None = None) -> str | None:
     except OSError:
         return None
     log_path = os.path.join(logs_dir, LOG_FILE_NAME)
+    # run.py 与 run_server 都会调用；同一文件只挂一个 handler，避免每行日志重复
+    if _file_handler is not None and _file_handler.baseFilename == os.path.abspath(log_path):
+        return _file_handler.baseFilename
     try:
         handler = RotatingFileHandler(
             log_path,
@@ -0,0 +1,301 @@
+"""
+In-process metrics: counters, gauges and HDR-style latency histograms,
+rendered for GET /api/metrics as Prometheus text or JSON.
+
+Histograms keep counts in one preallocated array per series: values (in
+nanoseconds) below 32 get a bucket each, above that every power of two is
+split into 16 linear sub-buckets, so any recorded latency is known to within
+~6 % and recording is a bit_length() plus an array increment. Hot loops
+(directory walkers) keep their own local counts and add them here once per
+batch, which keeps recording cost out of the per-entry path.
+"""
+import threading
+import time
+from array import array
+from contextlib import contextmanager
+from typing import Callable, Iterator
+
+SUB_BITS = 4
+SUB_BUCKETS = 1 << SUB_BITS  # linear sub-buckets per power of two
+LINEAR_LIMIT = SUB_BUCKETS << 1  # values below this get one bucket each
+MAX_SHIFT = 38  # top bucket starts at 2**42 ns (~73 min); larger values are clamped into it
+BUCKET_COUNT = LINEAR_LIMIT + MAX_SHIFT * SUB_BUCKETS
+
+# Cumulative "le" boundaries (seconds) used for the Prometheus exposition
+PROMETHEUS_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                      0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_LE_LABELS = [f'le="{b}"' for b in PROMETHEUS_BUCKETS] + ['le="+Inf"']
+
+_enabled = True
+
+
+def set_enabled(flag: bool) -> None:
+    """Turn recording on/off process-wide (used by the overhead benchmark)."""
+    global _enabled
+    _enabled = flag
+
+
+def bucket_index(value_ns: int) -> int:
+    if value_ns < LINEAR_LIMIT:
+        return value_ns if value_ns > 0 else 0
+    shift = value_ns.bit_length() - SUB_BITS - 1
+    idx = LINEAR_LIMIT + (shift - 1) * SUB_BUCKETS + (value_ns >> shift) - SUB_BUCKETS
+    return idx if idx < BUCKET_COUNT else BUCKET_COUNT - 1
+
+
+def bucket_bounds(idx: int) -> tuple[int, int]:
+    """[low, high) in nanoseconds covered by bucket idx."""
+    if idx < LINEAR_LIMIT:
+        return idx, idx + 1
+    k = idx - LINEAR_LIMIT
+    shift = k // SUB_BUCKETS + 1
+    sub = k % SUB_BUCKETS + SUB_BUCKETS
+    return sub << shift, (sub + 1) << shift
+
+
+class HdrHistogram:
+    """One latency series; counts live in a preallocated array."""
+
+    __slots__ = ("counts", "count", "sum_ns", "max_ns", "_lock")
+
+    def __init__(self) -> None:
+        self.counts = array("q", bytes(8 * BUCKET_COUNT))
+        self.count = 0
+        self.sum_ns = 0
+        self.max_ns = 0
+        self._lock = threading.Lock()
+
+    def record_ns(self, value_ns: int) -> None:
+        if not _enabled:
+            return
+        idx = bucket_index(value_ns)
+        with self._lock:
+            self.counts[idx] += 1
+            self.count += 1
+            self.sum_ns += value_ns
+            if value_ns > self.max_ns:
+                self.max_ns = value_ns
+
+    def observe(self, seconds: float) -> None:
+        self.record_ns(int(seconds * 1e9))
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        start = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            self.record_ns(time.perf_counter_ns() - start)
+
+    def quantile(self, q: float) -> float:
+        """Approximate q-quantile in seconds (bucket midpoint)."""
+        with self._lock:
+            if not self.count:
+                return 0.0
+            rank = max(1, int(q * self.count + 0.5))
+            seen = 0
+            for idx, c in enumerate(self.counts):
+                if c:
+                    seen += c
+                    if seen >= rank:
+                        lo, hi = bucket_bounds(idx)
+                        return min((lo + hi) / 2, self.max_ns) / 1e9
+            return self.max_ns / 1e9
+
+    def cumulative(self, bounds_seconds: tuple[float, ...]) -> list[int]:
+        """Counts at or below each bound (values in the boundary bucket count as below)."""
+        with self._lock:
+            counts = self.counts.tolist()
+        out = []
+        running = 0
+        upto = 0
+        for bound in bounds_seconds:
+            last = bucket_index(int(bound * 1e9))
+            while upto <= last:
+                running += counts[upto]
+                upto += 1
+            out.append(running)
+        return out
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "sum_seconds": round(self.sum_ns / 1e9, 6),
+            "p50": round(self.quantile(0.5), 6),
+            "p90": round(self.quantile(0.9), 6),
+            "p99": round(self.quantile(0.99), 6),
+            "max": round(self.max_ns / 1e9, 6),
+        }
+
+
+class _Value:
+    """Counter / gauge cell."""
+
+    __slots__ = ("value", "_lock")
+
+    def __init__(self) -> None:
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1) -> None:
+        if not _enabled:
+            return
+        with self._lock:
+            self.value += amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Metric:
+    """A metric family: one child per label-value tuple (created on first use)."""
+
+    def __init__(self, kind: str, name: str, help_text: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.kind = kind
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self._children: dict[tuple[str, ...], HdrHistogram | _Value] = {}
+        self._functions: dict[tuple[str, ...], Callable[[], float]] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str) -> "HdrHistogram | _Value":
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = HdrHistogram() if self.kind == "histogram" else _Value()
+                    self._children[values] = child
+        return child
+
+    # Unlabeled shortcuts
+    def inc(self, amount: float = 1) -> None:
+        self.labels().inc(amount)
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+    def observe(self, seconds: float) -> None:
+        self.labels().observe(seconds)
+
+    def record_ns(self, value_ns: int) -> None:
+        self.labels().record_ns(value_ns)
+
+    def set_function(self, fn: Callable[[], float], *values: str) -> None:
+        """Gauge read at scrape time (queue depths), so it costs nothing in between."""
+        with self._lock:
+            self._functions[values] = fn
+
+    def samples(self) -> list[tuple[tuple[str, ...], "HdrHistogram | float"]]:
+        with self._lock:
+            children = list(self._children.items())
+            functions = list(self._functions.items())
+        out: list = [(k, c if isinstance(c, HdrHistogram) else c.value) for k, c in children]
+        for k, fn in functions:
+            try:
+                out.append((k, float(fn())))
+            except Exception:
+                pass
+        return out
+
+
+def _label_str(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, Metric] = {}
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+
+    def _get(self, kind: str, name: str, help_text: str, labelnames: tuple[str, ...]) -> Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = Metric(kind, name, help_text, labelnames)
+            return metric
+
+    def counter(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()) -> Metric:
+        return self._get("counter", name, help_text, labelnames)
+
+    def gauge(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()) -> Metric:
+        return self._get("gauge", name, help_text, labelnames)
+
+    def histogram(self, name: str, help_text: str, labelnames: tuple[str, ...] = ()) -> Metric:
+        return self._get("histogram", name, help_text, labelnames)
+
+    def render_prometheus(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        lines = [
+            "# HELP process_uptime_seconds Seconds since the metrics registry was created.",
+            "# TYPE process_uptime_seconds gauge",
+            f"process_uptime_seconds {time.time() - self.started_at:.3f}",
+        ]
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        for m in metrics:
+            lines.append(f"# HELP {m.name} {m.help}")
+            lines.append(f"# TYPE {m.name} {m.kind}")
+            for values, sample in m.samples():
+                if isinstance(sample, HdrHistogram):
+                    cumulative = sample.cumulative(PROMETHEUS_BUCKETS) + [sample.count]
+                    for le, cum in zip(_LE_LABELS, cumulative):
+                        lines.append(f"{m.name}_bucket{_label_str(m.labelnames, values, le)} {cum}")
+                    labels = _label_str(m.labelnames, values)
+                    lines.append(f"{m.name}_sum{labels} {sample.sum_ns / 1e9:.9f}")
+                    lines.append(f"{m.name}_count{labels} {sample.count}")
+                else:
+                    lines.append(f"{m.name}{_label_str(m.labelnames, values)} {sample:g}")
+        return "\n".join(lines) + "\n"
+
+    def to_dict(self) -> dict:
+        """JSON view: histograms as count / sum / p50 / p90 / p99 / max (seconds)."""
+        out: dict = {"uptime_seconds": round(time.time() - self.started_at, 3), "metrics": {}}
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda m: m.name)
+        for m in metrics:
+            series = []
+            for values, sample in m.samples():
+                entry: dict = {"labels": dict(zip(m.labelnames, values))}
+                if isinstance(sample, HdrHistogram):
+                    entry.update(sample.summary())
+                else:
+                    entry["value"] = sample
+                series.append(entry)
+            out["metrics"][m.name] = {"type": m.kind, "help": m.help, "series": series}
+        return out
+
+
+_registry = MetricsRegistry()
+
+
+def get_metrics() -> MetricsRegistry:
+    """Process-wide metrics registry."""
+    return _registry
+
+
+# Metrics shared across modules (registered here so /api/metrics lists them before first use)
+HTTP_REQUEST_SECONDS = _registry.histogram(
+    "http_request_duration_seconds", "API request latency by route template.", ("method", "route", "status")
+)
+SQLITE_QUERY_SECONDS = _registry.histogram(
+    "sqlite_query_duration_seconds", "Time spent in SQLite index queries and batch writes.", ("query",)
+)
+SCAN_STAT_CALLS = _registry.counter("scan_stat_calls_total", "stat() calls made by directory walkers.", ("walker",))
+SCAN_DIRS_WALKED = _registry.counter("scan_dirs_walked_total", "Directories visited by directory walkers.", ("walker",))
+THROTTLE_SLEEPS = _registry.counter("throttle_sleeps_total", "Sleeps taken by resource_guard under high load.")
+THROTTLE_SLEEP_SECONDS = _registry.counter("throttle_sleep_seconds_total", "Seconds slept by resource_guard under high load.")
+QUEUE_DEPTH = _registry.gauge("queue_depth", "Items waiting in internal queues.", ("queue",))
+NOTIFY_DELIVERY_SECONDS = _registry.histogram(
+    "notification_delivery_seconds", "Time from queueing a notification to delivery, by channel.", ("channel",)
+)
@@ -0,0 +1,337 @@
+"""
+Opt-in profiling for scan jobs and API requests, for the packaged tray app
+where no debugger can be attached.
+
+Two modes:
+- "sample": a daemon thread reads sys._current_frames() every
+  PROFILE_SAMPLE_INTERVAL_SECONDS and counts each thread's stack. Written as
+  collapsed stacks (.folded, one "thread;outer;...;inner count" line per
+  stack), which flamegraph.pl, inferno and speedscope load directly. Covers
+  every thread, so work handed to worker pools shows up; threads parked on a
+  lock, queue or selector are skipped.
+- "cprofile": deterministic cProfile of the calling thread, written as a
+  pstats dump (.prof) for snakeviz / flameprof / tuna.
+
+Sampling stops after PROFILE_MAX_SECONDS; cProfile stops at the first
+checkpoint() past that (resource_guard.pause_point calls it), or, for a
+request, when the event loop's timer calls expire(). Output is
+capped at PROFILE_MAX_BYTES by dropping the least-hit stacks / functions.
+Files go to PROFILE_DIR, newest PROFILE_KEEP_FILES kept. One session runs at
+a time; a second request while one is active runs unprofiled.
+"""
+import marshal
+import os
+import re
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from backend.core.constants import (
+    PROFILE_DIR,
+    PROFILE_ENV_VAR,
+    PROFILE_KEEP_FILES,
+    PROFILE_MAX_BYTES,
+    PROFILE_MAX_DEPTH,
+    PROFILE_MAX_SECONDS,
+    PROFILE_SAMPLE_INTERVAL_SECONDS,
+)
+
+MODES = ("sample", "cprofile")
+_EXTENSIONS = {"sample": ".folded", "cprofile": ".prof"}
+_NAME_RE = re.compile(r"^[\w.-]+\.(folded|prof)$")
+
+# Leaf frames of threads that are waiting, not working (file basename, function)
+_PARKED = {
+    ("threading.py", "wait"),
+    ("threading.py", "_wait_for_tstate_lock"),
+    ("queue.py", "get"),
+    ("selectors.py", "select"),
+    ("windows_events.py", "_poll"),
+    ("thread.py", "_worker"),  # concurrent.futures worker blocked on its work queue
+}
+
+
+def _frame_label(code, cache: dict) -> str:
+    label = cache.get(code)
+    if label is None:
+        parts = code.co_filename.replace("\\", "/").rsplit("/", 2)
+        where = "/".join(parts[-2:])
+        label = f"{code.co_name} ({where}:{code.co_firstlineno})".replace(";", ":")
+        cache[code] = label
+    return label
+
+
+class StackSampler:
+    """Counts the collapsed stack of every other thread at a fixed interval."""
+
+    def __init__(
+        self,
+        interval_seconds: float = PROFILE_SAMPLE_INTERVAL_SECONDS,
+        max_seconds: float = PROFILE_MAX_SECONDS,
+        max_depth: int = PROFILE_MAX_DEPTH,
+    ) -> None:
+        self.interval_seconds = interval_seconds
+        self.max_seconds = max_seconds
+        self.max_depth = max_depth
+        self.counts: dict[str, int] = {}
+        self.ticks = 0
+        self.timed_out = False
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, daemon=True, name="profiler-sampler")
+        self._thread.start()
+
+    def stop(self) -> dict[str, int]:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return self.counts
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        deadline = time.monotonic() + self.max_seconds
+        labels: dict = {}
+        counts = self.counts
+        while not self._stop.wait(self.interval_seconds):
+            if time.monotonic() >= deadline:
+                self.timed_out = True
+                return
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for tid, frame in sys._current_frames().items():
+                if tid == me:
+                    continue
+                code = frame.f_code
+                if (os.path.basename(code.co_filename), code.co_name) in _PARKED:
+                    continue
+                stack = []
+                while frame is not None and len(stack) < self.max_depth:
+                    stack.append(_frame_label(frame.f_code, labels))
+                    frame = frame.f_back
+                if frame is not None:
+                    stack.append("[truncated]")
+                stack.append(names.get(tid, f"thread-{tid}"))
+                key = ";".join(reversed(stack))
+                counts[key] = counts.get(key, 0) + 1
+            frame = None
+            self.ticks += 1
+
+
+def write_folded(counts: dict[str, int], path: str, max_bytes: int = PROFILE_MAX_BYTES) -> int:
+    """Write collapsed stacks, most-hit first; what does not fit becomes one "[other stacks]" line."""
+    written = 0
+    dropped = 0
+    with open(path, "w", encoding="utf-8") as f:
+        for key, count in sorted(counts.items(), key=lambda kv: kv[1], reverse=True):
+            line = f"{key} {count}\n"
+            size = len(line.encode("utf-8"))
+            if written + size > max_bytes - 64:
+                dropped += count
+                continue
+            f.write(line)
+            written += size
+        if dropped:
+            f.write(f"[other stacks] {dropped}\n")
+    return dropped
+
+
+def write_pstats(stats: dict, path: str, max_bytes: int = PROFILE_MAX_BYTES) -> int:
+    """Write a pstats dump; over max_bytes, keep the functions with the most cumulative time."""
+    data = marshal.dumps(stats)
+    kept = len(stats)
+    ranked = sorted(stats, key=lambda fn: stats[fn][3], reverse=True)
+    while len(data) > max_bytes and kept > 1:
+        kept = max(1, int(kept * 0.7))
+        keep = set(ranked[:kept])
+        trimmed = {
+            fn: (cc, nc, tt, ct, {c: v for c, v in callers.items() if c in keep})
+            for fn, (cc, nc, tt, ct, callers) in stats.items()
+            if fn in keep
+        }
+        data = marshal.dumps(trimmed)
+    with open(path, "wb") as f:
+        f.write(data)
+    return len(stats) - kept
+
+
+def _file_name(target: str, mode: str) -> str:
+    now = time.time()
+    slug = re.sub(r"[^\w.-]+", "_", target).strip("_.")[:60] or "job"
+    stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(now))
+    return f"{stamp}-{int(now * 1000) % 1000:03d}-{slug}{_EXTENSIONS[mode]}"
+
+
+_local = threading.local()
+
+
+class ProfileSession:
+    """One profiling run; start() and stop() (cProfile: on the profiled thread)."""
+
+    def __init__(
+        self,
+        mode: str,
+        target: str,
+        out_dir: str | None = None,
+        max_seconds: float | None = None,
+    ) -> None:
+        if mode not in MODES:
+            raise ValueError(f"unknown profile mode: {mode}")
+        self.mode = mode
+        self.target = target
+        self.out_dir = out_dir or PROFILE_DIR
+        self.max_seconds = PROFILE_MAX_SECONDS if max_seconds is None else max_seconds
+        self.name = _file_name(target, mode)
+        self.path = os.path.join(self.out_dir, self.name)
+        self.timed_out = False
+        self._started = 0.0
+        self._sampler: StackSampler | None = None
+        self._profiler = None
+
+    def start(self) -> None:
+        self._started = time.monotonic()
+        if self.mode == "sample":
+            self._sampler = StackSampler(max_seconds=self.max_seconds)
+            self._sampler.start()
+        else:
+            import cProfile
+            self._profiler = cProfile.Profile()
+            _local.session = self
+            self._profiler.enable()
+
+    def checkpoint(self) -> None:
+        if time.monotonic() - self._started >= self.max_seconds:
+            self.expire()
+
+    def expire(self) -> None:
+        """Stop recording now, keeping what was collected (cProfile: call on the profiled thread)."""
+        if self._profiler is not None and not self.timed_out:
+            self._profiler.disable()
+            self.timed_out = True
+
+    def stop(self) -> str:
+        """Stop profiling and write the output file; returns its path."""
+        elapsed = time.monotonic() - self._started
+        os.makedirs(self.out_dir, exist_ok=True)
+        if self._sampler is not None:
+            counts = self._sampler.stop()
+            self.timed_out = self._sampler.timed_out
+            dropped = write_folded(counts, self.path)
+        else:
+            self._profiler.disable()
+            if getattr(_local, "session", None) is self:
+                _local.session = None
+            self._profiler.create_stats()
+            dropped = write_pstats(self._profiler.stats, self.path)
+        prune_profiles(self.out_dir)
+        try:
+            from backend.core.logging_config import get_logger
+            get_logger().info(
+                "性能分析已写入: %s（%s，%.1f s%s%s）",
+                self.path,
+                self.mode,
+                elapsed,
+                "，已达时长上限" if self.timed_out else "",
+                f"，按大小上限舍去 {dropped} 项" if dropped else "",
+            )
+        except Exception:
+            pass
+        return self.path
+
+
+def checkpoint() -> None:
+    """Let a cProfile session on this thread stop once past its time limit (cheap no-op otherwise)."""
+    session = getattr(_local, "session", None)
+    if session is not None:
+        session.checkpoint()
+
+
+_busy = threading.Lock()
+
+
+@contextmanager
+def profiling(target: str, mode: str | None, out_dir: str | None = None) -> Iterator[ProfileSession | None]:
+    """
+    Profile the enclosed block with mode ("sample" / "cprofile"); yields the
+    session, or None when mode is None or another session is already running.
+    """
+    if mode is None:
+        yield None
+        return
+    if not _busy.acquire(blocking=False):
+        try:
+            from backend.core.logging_config import get_logger
+            get_logger().info("已有性能分析在进行，本次不分析: %s", target)
+        except Exception:
+            pass
+        yield None
+        return
+    session = ProfileSession(mode, target, out_dir=out_dir)
+    try:
+        session.start()
+        yield session
+    finally:
+        try:
+            session.stop()
+        except Exception:
+            try:
+                from backend.core.logging_config import get_logger
+                get_logger().warning("性能分析写入失败: %s", session.path, exc_info=True)
+            except Exception:
+                pass
+        finally:
+            _busy.release()
+
+
+def job_profile_mode(mode: str | None = None) -> str | None:
+    """Explicit mode, else the PROFILE_ENV_VAR setting; None when profiling is off."""
+    if mode is None:
+        mode = os.environ.get(PROFILE_ENV_VAR, "").strip().lower() or None
+    return mode if mode in MODES else None
+
+
+def profile_job(target: str, mode: str | None = None, out_dir: str | None = None):
+    """profiling() for a background scan job, honouring PROFILE_ENV_VAR."""
+    return profiling(target, job_profile_mode(mode), out_dir=out_dir)
+
+
+def list_profiles(out_dir: str | None = None) -> list[dict]:
+    """Profile files, newest first."""
+    out_dir = out_dir or PROFILE_DIR
+    try:
+        names = [n for n in os.listdir(out_dir) if _NAME_RE.match(n)]
+    except OSError:
+        return []
+    result = []
+    for name in names:
+        try:
+            st = os.stat(os.path.join(out_dir, name))
+        except OSError:
+            continue
+        result.append({
+            "name": name,
+            "mode": "sample" if name.endswith(".folded") else "cprofile",
+            "size_bytes": st.st_size,
+            "created_at": st.st_mtime,
+        })
+    result.sort(key=lambda p: p["created_at"], reverse=True)
+    return result
+
+
+def profile_path(name: str, out_dir: str | None = None) -> str | None:
+    """Path of a listed profile file; None for unknown or malformed names."""
+    if not _NAME_RE.match(name):
+        return None
+    path = os.path.join(out_dir or PROFILE_DIR, name)
+    return path if os.path.isfile(path) else None
+
+
+def prune_profiles(out_dir: str | None = None, keep: int = PROFILE_KEEP_FILES) -> None:
+    out_dir = out_dir or PROFILE_DIR
+    for p in list_profiles(out_dir)[keep:]:
+        try:
+            os.remove(os.path.join(out_dir, p["name"]))
+        except OSError:
+            pass
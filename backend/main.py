@@ -6,6 +6,8 @@ For GUI: python -m backend.main --gui
 import argparse
 import os
 import sys
+import threading
+from typing import Callable
 
 # Project root and frontend dist: when frozen (PyInstaller), use _MEIPASS
 if getattr(sys, "frozen", False):
@@ -18,11 +20,15 @@ if _ROOT not in sys.path:
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 
+from backend.api.request_metrics import RequestMetricsMiddleware
+from backend.api.request_profiler import RequestProfilerMiddleware
 from backend.api.routes import router as api_router
-from backend.core.constants import APP_NAME, APP_VERSION
+from backend.core.constants import APP_NAME, APP_VERSION, SERVER_READY_TIMEOUT_SECONDS
 
 app = FastAPI(title=APP_NAME, version=APP_VERSION)
 app.include_router(api_router)
+app.add_middleware(RequestProfilerMiddleware)
+app.add_middleware(RequestMetricsMiddleware)
 
 # Mount Vue SPA dist when present (packaged: frontend/dist added via PyInstaller datas)
 _DIST = os.path.join(_ROOT, "frontend", "dist")
@@ -60,20 +66,14 @@ else:
 
 
 def _disk_check_callback() -> None:
-    """Update tray tooltip with disk summary and junk size."""
+    """
+    First tray summary after startup: size the junk roots once, which fills
+    the analyzer cache and pushes the junk line to the tooltip (disk lines
+    arrive from the sampler listener). Later updates are pushed by events.
+    """
     try:
-        from backend.utils.disk import get_all_disk_usage
         from backend.services.monitor_service import run_junk_scan
-        from backend.services.tray_service import set_tooltip_lines
-        usages = get_all_disk_usage()
-        junk_bytes, junk_count = run_junk_scan()
-        lines = [
-            f"{u.drive} 剩余 {u.free_percent:.1f}% ({u.free_bytes // (1024**3)} GB)"
-            for u in usages
-        ]
-        if junk_count:
-            lines.append(f"垃圾目录约 {junk_bytes // (1024**2)} MB")
-        set_tooltip_lines(lines)
+        run_junk_scan()
     except Exception as e:
         try:
             from backend.core.logging_config import get_logger
@@ -82,6 +82,46 @@ def _disk_check_callback() -> None:
             pass
 
 
+# Set by run_server once uvicorn's socket is listening; GUI launchers wait on it
+# instead of sleeping and polling /api/health.
+server_ready = threading.Event()
+
+
+def wait_until_ready(timeout: float | None = SERVER_READY_TIMEOUT_SECONDS) -> bool:
+    """Block until the in-process server is accepting connections; False on timeout."""
+    return server_ready.wait(timeout)
+
+
+def start_server_thread(
+    port: int = 8765,
+    on_ready: Callable[[], None] | None = None,
+    on_error: Callable[[BaseException], None] | None = None,
+) -> threading.Thread:
+    """
+    Run run_server on a daemon thread. on_ready (e.g. the first tooltip and
+    junk scan) runs on its own daemon thread once the socket is listening, so
+    neither the caller nor request handling waits for it. on_error receives an
+    exception that ends the server thread.
+    """
+    def serve() -> None:
+        try:
+            run_server(port=port)
+        except BaseException as e:
+            if on_error:
+                on_error(e)
+            raise
+
+    def after_ready() -> None:
+        if wait_until_ready(timeout=None) and on_ready:
+            on_ready()
+
+    if on_ready:
+        threading.Thread(target=after_ready, daemon=True, name="startup-ready").start()
+    t = threading.Thread(target=serve, daemon=True, name="api-server")
+    t.start()
+    return t
+
+
 def run_server(host: str = "127.0.0.1", port: int = 8765) -> None:
     """Run uvicorn server (blocking). Starts background monitor scheduler."""
     # When running as packaged GUI (no console), stdout/stderr can be None; uvicorn's
@@ -125,11 +165,35 @@ def run_server(host: str = "127.0.0.1", port: int = 8765) -> None:
             "uvicorn.access": {"handlers": ["access"], "level": "INFO", "propagate": False},
         },
     }
+    from backend.services.disk_sampler import get_disk_sampler
+    from backend.services.forecast_service import get_disk_forecaster
+    from backend.services.junk_service import get_junk_analyzer
     from backend.services.monitor_service import start_background_scheduler
-    start_background_scheduler(on_disk_check=_disk_check_callback)
+    from backend.services.tray_service import get_tray_tooltip
+    sampler = get_disk_sampler()
+    sampler.add_listener(get_disk_forecaster().on_sample)
+    # Tray tooltip is event-driven: disk samples and junk reports push changes
+    tooltip = get_tray_tooltip()
+    sampler.add_listener(tooltip.on_sample)
+    get_junk_analyzer().add_listener(tooltip.on_junk_report)
+    sampler.start()
+    start_background_scheduler()
     logger.info("后台监控调度已启动")
     import uvicorn
-    uvicorn.run(app, host=host, port=port, log_level="info", log_config=log_config)
+
+    class _ReadyServer(uvicorn.Server):
+        async def startup(self, sockets=None) -> None:
+            await super().startup(sockets=sockets)
+            if self.started:
+                server_ready.set()
+                logger.info("服务已就绪")
+
+    config = uvicorn.Config(app, host=host, port=port, log_level="info", log_config=log_config)
+    try:
+        _ReadyServer(config).run()
+    finally:
+        if not server_ready.is_set():
+            logger.error("服务未能启动（端口 %s 可能被占用）", port)
 
 
 if __name__ == "__main__":
@@ -140,17 +204,10 @@ if __name__ == "__main__":
     args = parser.parse_args()
     port = args.port
     if args.gui and not args.no_tray:
-        # Run server in thread, tray in main thread (tray blocks)
-        import threading
-        def run_api() -> None:
-            run_server(port=port)
-        t = threading.Thread(target=run_api, daemon=True)
-        t.start()
-        # Give server time to bind
-        import time
-        time.sleep(1)
+        # Run server in thread, tray in main thread (tray blocks); the initial
+        # tooltip is computed in the background once the server is listening
+        start_server_thread(port=port, on_ready=_disk_check_callback)
         from backend.services.tray_service import run_tray
-        _disk_check_callback()  # Initial tooltip
         run_tray(port=port)
     else:
         run_server(port=port)
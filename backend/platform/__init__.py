@@ -0,0 +1,46 @@
+"""
+Platform layer. get_platform() returns the implementation for this OS
+(windows / posix), or the one named by WINDOWS_CLEANER_PLATFORM: "fake"
+runs the whole server headless with volumes from WINDOWS_CLEANER_FAKE_VOLUMES
+("B:=/dev/shm/tree;D:=/srv/data"), e.g. for performance runs on Linux.
+Implementation modules are imported on first use.
+"""
+import os
+import threading
+
+from backend.core.constants import FAKE_VOLUMES_ENV_VAR, PLATFORM_ENV_VAR
+from backend.platform.base import Platform
+
+_platform: Platform | None = None
+_platform_lock = threading.Lock()
+
+
+def _create(name: str) -> Platform:
+    if name == "fake":
+        from backend.platform.fake import FakePlatform, parse_volumes
+        return FakePlatform(volumes=parse_volumes(os.environ.get(FAKE_VOLUMES_ENV_VAR, "")))
+    if name == "windows":
+        from backend.platform.windows import WindowsPlatform
+        return WindowsPlatform()
+    if name == "posix":
+        from backend.platform.posix import PosixPlatform
+        return PosixPlatform()
+    raise ValueError(f"unknown platform: {name}")
+
+
+def get_platform() -> Platform:
+    """Process-wide platform implementation."""
+    global _platform
+    with _platform_lock:
+        if _platform is None:
+            name = os.environ.get(PLATFORM_ENV_VAR, "").strip().lower()
+            _platform = _create(name or ("windows" if os.name == "nt" else "posix"))
+        return _platform
+
+
+def set_platform(platform: Platform | None) -> Platform | None:
+    """Replace the process-wide platform (None: choose again on next use); returns the previous one."""
+    global _platform
+    with _platform_lock:
+        previous, _platform = _platform, platform
+        return previous
@@ -0,0 +1,108 @@
+"""
+Platform interfaces: volume enumeration, change journal, recycle bin,
+autostart and input-idle detection. Scan and index code is shared and never
+branches on the OS; everything OS-specific sits behind these classes.
+"""
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+
+
+@dataclass(frozen=True)
+class VolumeInfo:
+    """One mounted volume and its cached capabilities."""
+
+    drive: str  # "C:" on Windows, mount point on POSIX, any label for the fake platform
+    root: str  # "C:\\" or mount point
+    fs_type: str
+    usn_available: bool = False
+
+
+class VolumeProbe(ABC):
+    """Platform-specific discovery. candidates() must be cheap; describe() may block."""
+
+    @abstractmethod
+    def candidates(self) -> list[tuple[str, str]]:
+        """(drive, root) pairs worth describing."""
+
+    @abstractmethod
+    def describe(self, drive: str, root: str) -> VolumeInfo | None:
+        """Capabilities of one volume, or None if not usable."""
+
+
+# Change reasons (same bits as the NTFS USN reasons, so Windows records pass through)
+CHANGE_CREATE = 0x00000100
+CHANGE_DELETE = 0x00000200
+CHANGE_MODIFY = 0x00000400
+
+
+@dataclass
+class ChangeRecord:
+    """One journal entry: file name (Windows) or path (fake), reason bits, directory flag."""
+
+    path: str
+    reason: int
+    is_directory: bool = False
+
+
+@dataclass
+class ChangeBatch:
+    records: list[ChangeRecord] = field(default_factory=list)
+    cursor: int = 0  # pass back to read() to continue after these records
+
+
+class ChangeJournal:
+    """Per-volume change journal; the default has none (the index falls back to mtime rescans)."""
+
+    def available(self, drive: str) -> bool:
+        return False
+
+    def read(self, drive: str, cursor: int = 0, max_records: int = 1000) -> ChangeBatch | None:
+        """Records after cursor (0: oldest kept), or None when the volume has no journal."""
+        return None
+
+
+class RecycleBin(ABC):
+    """Undoable removal. send() returns the paths actually removed."""
+
+    def available(self) -> bool:
+        return False
+
+    @abstractmethod
+    def send(self, paths: list[str]) -> list[str]:
+        """Move paths to the bin; the ones that could not be moved are left in place."""
+
+
+class NoRecycleBin(RecycleBin):
+    """Default where the platform has no bin: nothing is ever removed."""
+
+    def send(self, paths: list[str]) -> list[str]:
+        return []
+
+
+class Autostart:
+    """Start at login for the current user."""
+
+    def enabled(self) -> bool:
+        return False
+
+    def set_enabled(self, enabled: bool, command: str | None) -> None:
+        """Register command (enabled) or remove the registration; no-op where unsupported."""
+
+
+class Platform(ABC):
+    """One implementation of every interface above."""
+
+    name = "base"
+
+    def __init__(self) -> None:
+        self.change_journal = ChangeJournal()
+        self.recycle_bin = NoRecycleBin()
+        self.autostart = Autostart()
+
+    @abstractmethod
+    def volume_probe(self) -> VolumeProbe:
+        """Discovery for this platform's volumes."""
+
+    def input_idle_seconds(self) -> float | None:
+        """Seconds since the last keyboard/mouse input; None where not detectable."""
+        return None
@@ -0,0 +1,133 @@
+"""
+Fake implementation for tests and headless performance runs: volumes are
+given labels mapped to ordinary directories (so "B:" can be a synthetic tree
+on tmpfs), the change journal is an in-memory list, the recycle bin moves
+files into a directory, autostart is a flag and input idleness is settable.
+"""
+import os
+import shutil
+import tempfile
+import threading
+
+from backend.platform.base import (
+    CHANGE_MODIFY,
+    Autostart,
+    ChangeBatch,
+    ChangeJournal,
+    ChangeRecord,
+    Platform,
+    RecycleBin,
+    VolumeInfo,
+    VolumeProbe,
+)
+
+
+class FakeVolumeProbe(VolumeProbe):
+    """Fixed [(drive label, root directory)] list; roots that do not exist are skipped."""
+
+    def __init__(self, volumes: list[tuple[str, str]], journal: ChangeJournal | None = None) -> None:
+        self._volumes = list(volumes)
+        self.journal = journal or ChangeJournal()
+
+    def candidates(self) -> list[tuple[str, str]]:
+        return list(self._volumes)
+
+    def describe(self, drive: str, root: str) -> VolumeInfo | None:
+        if not os.path.isdir(root):
+            return None
+        return VolumeInfo(drive=drive, root=root, fs_type="fake", usn_available=self.journal.available(drive))
+
+
+class FakeChangeJournal(ChangeJournal):
+    """Per-drive in-memory journal; cursor is the index of the next record."""
+
+    def __init__(self, drives: list[str] | None = None) -> None:
+        self._drives = drives  # None: every drive has a journal
+        self._records: dict[str, list[ChangeRecord]] = {}
+        self._lock = threading.Lock()
+
+    def available(self, drive: str) -> bool:
+        return self._drives is None or drive in self._drives
+
+    def record(self, drive: str, path: str, reason: int = CHANGE_MODIFY, is_directory: bool = False) -> None:
+        with self._lock:
+            self._records.setdefault(drive, []).append(ChangeRecord(path, reason, is_directory))
+
+    def read(self, drive: str, cursor: int = 0, max_records: int = 1000) -> ChangeBatch | None:
+        if not self.available(drive):
+            return None
+        with self._lock:
+            records = self._records.get(drive, [])[cursor:cursor + max_records]
+        return ChangeBatch(records=records, cursor=cursor + len(records))
+
+
+class FakeRecycleBin(RecycleBin):
+    """Moves files into bin_dir (a temp directory by default); sent lists (original, stored) pairs."""
+
+    def __init__(self, bin_dir: str | None = None) -> None:
+        self._bin_dir = bin_dir
+        self.sent: list[tuple[str, str]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def bin_dir(self) -> str:
+        with self._lock:
+            if self._bin_dir is None:
+                self._bin_dir = tempfile.mkdtemp(prefix="wc-fake-recycle-")
+            return self._bin_dir
+
+    def available(self) -> bool:
+        return True
+
+    def send(self, paths: list[str]) -> list[str]:
+        bin_dir = self.bin_dir
+        done = []
+        for path in paths:
+            with self._lock:
+                dest = os.path.join(bin_dir, str(len(self.sent)))
+                try:
+                    shutil.move(path, dest)
+                except OSError:
+                    continue
+                self.sent.append((path, dest))
+            done.append(path)
+        return done
+
+
+class FakeAutostart(Autostart):
+    def __init__(self) -> None:
+        self.command: str | None = None
+
+    def enabled(self) -> bool:
+        return self.command is not None
+
+    def set_enabled(self, enabled: bool, command: str | None) -> None:
+        self.command = command if enabled and command else None
+
+
+class FakePlatform(Platform):
+    name = "fake"
+
+    def __init__(self, volumes: list[tuple[str, str]] | None = None, idle_seconds: float | None = None) -> None:
+        super().__init__()
+        self.volumes = list(volumes or [])
+        self.change_journal = FakeChangeJournal()
+        self.recycle_bin = FakeRecycleBin()
+        self.autostart = FakeAutostart()
+        self.idle_seconds = idle_seconds
+
+    def volume_probe(self) -> VolumeProbe:
+        return FakeVolumeProbe(self.volumes, self.change_journal)
+
+    def input_idle_seconds(self) -> float | None:
+        return self.idle_seconds
+
+
+def parse_volumes(spec: str) -> list[tuple[str, str]]:
+    """ "B:=/dev/shm/tree;D:=/srv/data" -> [("B:", "/dev/shm/tree"), ("D:", "/srv/data")]."""
+    volumes = []
+    for part in spec.split(";"):
+        label, sep, root = part.partition("=")
+        if sep and label.strip() and root.strip():
+            volumes.append((label.strip(), root.strip()))
+    return volumes
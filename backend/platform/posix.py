@@ -0,0 +1,219 @@
+"""
+POSIX implementation (Linux, macOS): mounts from /proc/mounts, no change
+journal (the index uses directory-mtime rescans, as on non-NTFS Windows
+volumes), the freedesktop.org trash, an XDG autostart entry, and no
+input-idle source (idleness is judged on CPU and disk alone).
+"""
+import os
+import stat
+import time
+from urllib.parse import quote
+
+from backend.platform.base import Autostart, Platform, RecycleBin, VolumeInfo, VolumeProbe
+
+AUTOSTART_NAME = "WindowsCleaner.desktop"
+
+
+class MountPointProbe(VolumeProbe):
+    """
+    POSIX mounts from /proc/mounts (pseudo filesystems skipped), or from an
+    explicit [(mount_point, fs_type)] list for tests.
+    """
+
+    PSEUDO_FS = {
+        "autofs", "binfmt_misc", "bpf", "cgroup", "cgroup2", "configfs", "debugfs",
+        "devpts", "devtmpfs", "efivarfs", "fusectl", "hugetlbfs", "mqueue", "nsfs",
+        "proc", "pstore", "rpc_pipefs", "securityfs", "squashfs", "sysfs", "tracefs",
+    }
+
+    def __init__(
+        self,
+        mounts: list[tuple[str, str]] | None = None,
+        mounts_file: str = "/proc/mounts",
+    ) -> None:
+        self._mounts = mounts
+        self._mounts_file = mounts_file
+        self._fs_types: dict[str, str] = {}
+
+    def _read_mounts(self) -> list[tuple[str, str]]:
+        if self._mounts is not None:
+            return list(self._mounts)
+        result = []
+        try:
+            with open(self._mounts_file, "r", encoding="utf-8") as f:
+                for line in f:
+                    parts = line.split()
+                    if len(parts) >= 3:
+                        mount_point = parts[1].replace("\\040", " ")
+                        result.append((mount_point, parts[2]))
+        except OSError:
+            pass
+        return result
+
+    def candidates(self) -> list[tuple[str, str]]:
+        result = []
+        for mount_point, fs_type in self._read_mounts():
+            if fs_type in self.PSEUDO_FS or mount_point.startswith(("/proc", "/sys", "/dev")):
+                continue
+            self._fs_types[mount_point] = fs_type
+            result.append((mount_point, mount_point))
+        return result
+
+    def describe(self, drive: str, root: str) -> VolumeInfo | None:
+        if not os.path.isdir(root):
+            return None
+        return VolumeInfo(drive=drive, root=root, fs_type=self._fs_types.get(root, ""))
+
+
+def _xdg_dir(env: str, default: str) -> str:
+    return os.environ.get(env) or os.path.join(os.path.expanduser("~"), default)
+
+
+class FreedesktopTrash(RecycleBin):
+    """
+    Trash per the freedesktop.org spec: files/<name> plus info/<name>.trashinfo.
+    Files on the home trash's device go to the home trash; files on other
+    mounts go to that mount's $topdir/.Trash/$uid (admin-created, sticky) or
+    $topdir/.Trash-$uid, so nothing is ever copied across devices. A file
+    whose mount has no usable trash directory is reported as not sent.
+    """
+
+    def __init__(self, trash_dir: str | None = None) -> None:
+        self.trash_dir = trash_dir or os.path.join(_xdg_dir("XDG_DATA_HOME", os.path.join(".local", "share")), "Trash")
+        self._home_device: int | None = None
+        self._topdir_trash: dict[int, tuple[str, str] | None] = {}  # device -> (trash dir, topdir)
+
+    def available(self) -> bool:
+        return True
+
+    def _device(self, path: str) -> int:
+        return os.lstat(path).st_dev
+
+    def _mount_point(self, path: str, device: int) -> str:
+        """Topmost directory above path that is still on device."""
+        current = os.path.dirname(os.path.abspath(path))
+        while True:
+            parent = os.path.dirname(current)
+            if parent == current or self._device(parent) != device:
+                return current
+            current = parent
+
+    def _trash_for(self, path: str) -> tuple[str, str | None] | None:
+        """(trash dir, topdir for relative Path= or None) for path, or None if its mount has no usable trash."""
+        if self._home_device is None:
+            os.makedirs(self.trash_dir, exist_ok=True)
+            self._home_device = self._device(self.trash_dir)
+        device = self._device(path)
+        if device == self._home_device:
+            return self.trash_dir, None
+        if device not in self._topdir_trash:
+            self._topdir_trash[device] = self._find_topdir_trash(self._mount_point(path, device))
+        return self._topdir_trash[device]
+
+    def _find_topdir_trash(self, topdir: str) -> tuple[str, str] | None:
+        uid = os.getuid()
+        shared = os.path.join(topdir, ".Trash")
+        try:
+            st = os.lstat(shared)
+            if stat.S_ISDIR(st.st_mode) and st.st_mode & stat.S_ISVTX:
+                own = os.path.join(shared, str(uid))
+                os.makedirs(own, mode=0o700, exist_ok=True)
+                return own, topdir
+        except OSError:
+            pass
+        own = os.path.join(topdir, f".Trash-{uid}")
+        try:
+            os.makedirs(own, mode=0o700, exist_ok=True)
+            st = os.lstat(own)
+            if stat.S_ISDIR(st.st_mode) and st.st_uid == uid:
+                return own, topdir
+        except OSError:
+            pass
+        return None
+
+    def _reserve(self, info_dir: str, base: str) -> tuple[str, int]:
+        """Create info/<name>.trashinfo exclusively (the spec's way of claiming a name)."""
+        n = 1
+        while True:
+            name = base if n == 1 else f"{base}.{n}"
+            try:
+                return name, os.open(os.path.join(info_dir, name + ".trashinfo"), os.O_WRONLY | os.O_CREAT | os.O_EXCL)
+            except FileExistsError:
+                n += 1
+
+    def _send_one(self, path: str) -> bool:
+        """Trash one file; False if its mount has no usable trash, OSError on failure."""
+        target = self._trash_for(path)
+        if target is None:
+            return False
+        trash_dir, topdir = target
+        files_dir = os.path.join(trash_dir, "files")
+        info_dir = os.path.join(trash_dir, "info")
+        os.makedirs(files_dir, exist_ok=True)
+        os.makedirs(info_dir, exist_ok=True)
+        name, fd = self._reserve(info_dir, os.path.basename(path))
+        info_path = os.path.join(info_dir, name + ".trashinfo")
+        shown = path if topdir is None else os.path.relpath(path, topdir)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(
+                    "[Trash Info]\n"
+                    f"Path={quote(shown, safe='/')}\n"
+                    f"DeletionDate={time.strftime('%Y-%m-%dT%H:%M:%S')}\n"
+                )
+            os.rename(path, os.path.join(files_dir, name))  # same device by construction
+        except OSError:
+            try:
+                os.remove(info_path)
+            except OSError:
+                pass
+            raise
+        return True
+
+    def send(self, paths: list[str]) -> list[str]:
+        done = []
+        for path in paths:
+            path = os.path.abspath(path)
+            try:
+                if self._send_one(path):
+                    done.append(path)
+            except OSError:  # vanished, trash not writable, ...: this path fails, the rest go on
+                continue
+        return done
+
+
+class XdgAutostart(Autostart):
+    """$XDG_CONFIG_HOME/autostart/WindowsCleaner.desktop."""
+
+    def __init__(self, autostart_dir: str | None = None) -> None:
+        self.autostart_dir = autostart_dir or os.path.join(_xdg_dir("XDG_CONFIG_HOME", ".config"), "autostart")
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.autostart_dir, AUTOSTART_NAME)
+
+    def enabled(self) -> bool:
+        return os.path.isfile(self.path)
+
+    def set_enabled(self, enabled: bool, command: str | None) -> None:
+        if enabled and command:
+            os.makedirs(self.autostart_dir, exist_ok=True)
+            with open(self.path, "w", encoding="utf-8") as f:
+                f.write(f"[Desktop Entry]\nType=Application\nName=Windows Cleaner\nExec={command}\n")
+        else:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+
+class PosixPlatform(Platform):
+    name = "posix"
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.recycle_bin = FreedesktopTrash()
+        self.autostart = XdgAutostart()
+
+    def volume_probe(self) -> VolumeProbe:
+        return MountPointProbe()
@@ -0,0 +1,175 @@
+"""
+Windows implementation: logical-drive enumeration via kernel32, the NTFS USN
+journal, the shell Recycle Bin (pywin32), the HKCU Run key and
+GetLastInputInfo. Win32 modules are imported on first use.
+"""
+import os
+
+from backend.platform.base import (
+    Autostart,
+    ChangeBatch,
+    ChangeJournal,
+    ChangeRecord,
+    Platform,
+    RecycleBin,
+    VolumeInfo,
+    VolumeProbe,
+)
+
+RUN_KEY = r"Software\Microsoft\Windows\CurrentVersion\Run"
+APP_VALUE = "WindowsCleaner"
+
+
+class UsnChangeJournal(ChangeJournal):
+    """NTFS USN journal (backend.utils.usn_journal); records carry file names, not full paths."""
+
+    def available(self, drive: str) -> bool:
+        from backend.utils.usn_journal import is_usn_available
+        return is_usn_available(drive)
+
+    def read(self, drive: str, cursor: int = 0, max_records: int = 1000) -> ChangeBatch | None:
+        from backend.utils.usn_journal import query_usn_journal, read_usn_journal
+
+        info = query_usn_journal(drive)
+        if info is None:
+            return None
+        raw = list(read_usn_journal(drive, start_usn=cursor, max_records=max_records))
+        records = [
+            ChangeRecord(path=r.path, reason=r.reason, is_directory=r.is_directory)
+            for r in raw
+        ]
+        # Stopped at max_records: resume right after the last record returned,
+        # not at NextUsn, or everything between the two would be skipped.
+        if raw and len(raw) >= max_records:
+            return ChangeBatch(records=records, cursor=raw[-1].usn + 1)
+        return ChangeBatch(records=records, cursor=info["NextUsn"])
+
+
+class WindowsVolumeProbe(VolumeProbe):
+    """Logical-drive bitmask + drive type (no per-letter path probing); fixed drives only."""
+
+    DRIVE_FIXED = 3
+
+    def __init__(self, journal: ChangeJournal | None = None) -> None:
+        self.journal = journal or UsnChangeJournal()
+
+    def candidates(self) -> list[tuple[str, str]]:
+        import ctypes
+
+        kernel32 = ctypes.windll.kernel32
+        mask = kernel32.GetLogicalDrives()
+        result = []
+        for i in range(26):
+            if not mask & (1 << i):
+                continue
+            root = f"{chr(ord('A') + i)}:\\"
+            # Drive type comes from the mount manager; does not touch the media
+            if kernel32.GetDriveTypeW(root) == self.DRIVE_FIXED:
+                result.append((root[:2], root))
+        return result
+
+    def describe(self, drive: str, root: str) -> VolumeInfo | None:
+        import ctypes
+
+        fs_buf = ctypes.create_unicode_buffer(32)
+        ok = ctypes.windll.kernel32.GetVolumeInformationW(
+            root, None, 0, None, None, None, fs_buf, len(fs_buf)
+        )
+        if not ok:
+            return None
+        fs_type = fs_buf.value
+        usn = fs_type.upper() == "NTFS" and self.journal.available(drive)
+        return VolumeInfo(drive=drive, root=root, fs_type=fs_type, usn_available=usn)
+
+
+class ShellRecycleBin(RecycleBin):
+    """pywin32 SHFileOperation, one call per batch."""
+
+    def available(self) -> bool:
+        try:
+            import win32com.shell  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def send(self, paths: list[str]) -> list[str]:
+        from win32com.shell import shell, shellcon
+
+        flags = (
+            shellcon.FOF_ALLOWUNDO
+            | shellcon.FOF_NOCONFIRMATION
+            | shellcon.FOF_NOERRORUI
+            | shellcon.FOF_SILENT
+        )
+        try:
+            shell.SHFileOperation((0, shellcon.FO_DELETE, "\0".join(paths), None, flags, None, None))
+        except Exception:
+            pass
+        # One status for the whole batch: check each path instead
+        return [p for p in paths if not os.path.lexists(p)]
+
+
+class RunKeyAutostart(Autostart):
+    """HKCU ...\\CurrentVersion\\Run value."""
+
+    def enabled(self) -> bool:
+        try:
+            import winreg
+            key = winreg.OpenKey(winreg.HKEY_CURRENT_USER, RUN_KEY, 0, winreg.KEY_READ)
+            try:
+                winreg.QueryValueEx(key, APP_VALUE)
+                return True
+            except FileNotFoundError:
+                return False
+            finally:
+                winreg.CloseKey(key)
+        except Exception:
+            return False
+
+    def set_enabled(self, enabled: bool, command: str | None) -> None:
+        import winreg
+        key = winreg.OpenKey(
+            winreg.HKEY_CURRENT_USER,
+            RUN_KEY,
+            0,
+            winreg.KEY_SET_VALUE | winreg.KEY_QUERY_VALUE,
+        )
+        try:
+            if enabled and command:
+                winreg.SetValueEx(key, APP_VALUE, 0, winreg.REG_SZ, command)
+            else:
+                try:
+                    winreg.DeleteValue(key, APP_VALUE)
+                except FileNotFoundError:
+                    pass
+        finally:
+            winreg.CloseKey(key)
+
+
+class WindowsPlatform(Platform):
+    name = "windows"
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.change_journal = UsnChangeJournal()
+        self.recycle_bin = ShellRecycleBin()
+        self.autostart = RunKeyAutostart()
+
+    def volume_probe(self) -> VolumeProbe:
+        return WindowsVolumeProbe(self.change_journal)
+
+    def input_idle_seconds(self) -> float | None:
+        try:
+            import ctypes
+
+            class LASTINPUTINFO(ctypes.Structure):
+                _fields_ = [("cbSize", ctypes.c_uint), ("dwTime", ctypes.c_uint)]
+
+            info = LASTINPUTINFO()
+            info.cbSize = ctypes.sizeof(info)
+            if not ctypes.windll.user32.GetLastInputInfo(ctypes.byref(info)):
+                return None
+            millis = (ctypes.windll.kernel32.GetTickCount() - info.dwTime) & 0xFFFFFFFF
+            return millis / 1000.0
+        except Exception:
+            return None
@@ -0,0 +1,160 @@
+"""
+Cleanup executor: acts on a rule's matches (recycle, quarantine or delete)
+in batches on a small worker pool. Each file is re-validated (size and mtime
+against the index, or the scan result) right before acting, so files that
+changed since the scan are left alone. Dry-run only reports what would happen.
+"""
+import os
+import time
+import uuid
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+
+from backend.core.constants import CLEANUP_BATCH_SIZE, CLEANUP_WORKERS
+from backend.platform import get_platform
+from backend.platform.base import RecycleBin
+from backend.services.index_service import lookup_file_rows, remove_file_rows
+from backend.services.resource_guard import throttle_if_needed
+
+
+@dataclass
+class CleanupReport:
+    """Per-run summary: what was (or would be, for dry-run) removed."""
+
+    run_id: str
+    backend: str
+    dry_run: bool
+    files_acted: int = 0
+    bytes_freed: int = 0
+    skipped_changed: int = 0
+    errors: int = 0
+    elapsed_seconds: float = 0.0
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class CleanupBackend(ABC):
+    """Where removed files go. Subclasses implement dispose (one file)."""
+
+    name = "base"
+
+    @abstractmethod
+    def dispose(self, path: str, run_id: str) -> None:
+        """Remove one file; raise OSError on failure."""
+
+    def dispose_batch(self, paths: list[str], run_id: str) -> list[str]:
+        """Remove files; return the paths actually removed."""
+        done = []
+        for path in paths:
+            try:
+                self.dispose(path, run_id)
+                done.append(path)
+            except OSError:
+                pass
+        return done
+
+    def flush(self) -> None:
+        """Persist any buffered bookkeeping (called after each batch)."""
+
+
+class PermanentDeleteBackend(CleanupBackend):
+    """Delete files outright (no undo)."""
+
+    name = "delete"
+
+    def dispose(self, path: str, run_id: str) -> None:
+        os.remove(path)
+
+
+class RecycleBinBackend(CleanupBackend):
+    """Send files to the platform recycle bin (shell Recycle Bin / freedesktop trash), one call per batch."""
+
+    name = "recycle"
+
+    def __init__(self, bin: RecycleBin | None = None) -> None:
+        self.bin = bin or get_platform().recycle_bin
+
+    def dispose(self, path: str, run_id: str) -> None:
+        if not self.dispose_batch([path], run_id):
+            raise OSError(f"recycle failed: {path}")
+
+    def dispose_batch(self, paths: list[str], run_id: str) -> list[str]:
+        return self.bin.send(paths)
+
+
+def get_cleanup_backend(action: str) -> CleanupBackend:
+    """Backend for a rule's clean_action; recycle falls back to quarantine without a usable recycle bin."""
+    if action == "delete":
+        return PermanentDeleteBackend()
+    if action == "recycle":
+        bin = get_platform().recycle_bin
+        if bin.available():
+            return RecycleBinBackend(bin)
+    from backend.services.quarantine_service import get_quarantine_store
+    return get_quarantine_store()
+
+
+def _still_matches(path: str, expected: tuple[int, int]) -> bool:
+    """True if the file on disk still has the expected (size_bytes, mtime_ns)."""
+    try:
+        st = os.stat(path, follow_symlinks=False)
+    except OSError:
+        return False
+    return (st.st_size, st.st_mtime_ns) == expected
+
+
+def execute_cleanup(
+    matches: list[dict],
+    backend: CleanupBackend,
+    dry_run: bool = False,
+    batch_size: int = CLEANUP_BATCH_SIZE,
+    max_workers: int = CLEANUP_WORKERS,
+    run_id: str | None = None,
+) -> CleanupReport:
+    """
+    Act on matches ({path, size_bytes, mtime_ns}) in batches on a worker pool.
+    Files whose size/mtime no longer match the index row (or the scan result
+    when not indexed) are skipped. Index rows of removed files are deleted,
+    and their directories' rollups adjusted, in one transaction per batch.
+    """
+    report = CleanupReport(
+        run_id=run_id or time.strftime("%Y%m%d-%H%M%S-") + uuid.uuid4().hex[:6],
+        backend=backend.name,
+        dry_run=dry_run,
+    )
+    start = time.monotonic()
+
+    def run_batch(batch: list[dict]) -> tuple[int, int, int, int]:
+        throttle_if_needed()
+        paths = [m["path"] for m in batch]
+        indexed = lookup_file_rows(paths)
+        valid: list[str] = []
+        sizes: dict[str, int] = {}
+        skipped = 0
+        for m in batch:
+            path = m["path"]
+            expected = indexed.get(path) or (m.get("size_bytes"), m.get("mtime_ns"))
+            if _still_matches(path, expected):
+                valid.append(path)
+                sizes[path] = expected[0]
+            else:
+                skipped += 1
+        if dry_run:
+            return len(valid), sum(sizes.values()), skipped, 0
+        done = backend.dispose_batch(valid, report.run_id)
+        backend.flush()
+        remove_file_rows(done)
+        return len(done), sum(sizes[p] for p in done), skipped, len(valid) - len(done)
+
+    batches = [matches[i : i + batch_size] for i in range(0, len(matches), batch_size)]
+    if batches:
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+            for acted, freed, skipped, errors in pool.map(run_batch, batches):
+                report.files_acted += acted
+                report.bytes_freed += freed
+                report.skipped_changed += skipped
+                report.errors += errors
+    report.elapsed_seconds = round(time.monotonic() - start, 3)
+    return report
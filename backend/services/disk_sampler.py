@@ -0,0 +1,207 @@
+"""
+Disk usage sampler: polls every volume's usage at a fixed cadence into a
+fixed-size ring buffer per volume (array-backed, no per-sample objects).
+API, tray and threshold checks read the latest sample instead of calling
+shutil.disk_usage themselves; /api/disk/history downsamples the ring.
+"""
+import shutil
+import threading
+import time
+from array import array
+from typing import Callable
+
+from backend.core.constants import DISK_HISTORY_CAPACITY, DISK_SAMPLE_INTERVAL_SECONDS
+from backend.utils.disk import DriveUsage
+from backend.utils.volumes import VolumeRegistry, get_volume_registry
+
+# listener(drive, timestamp, free_bytes, total_bytes)
+SampleListener = Callable[[str, float, int, int], None]
+
+
+class UsageRing:
+    """Ring buffer of (timestamp, free_bytes, total_bytes) samples for one volume."""
+
+    __slots__ = ("capacity", "ts", "free", "total", "head", "count")
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.ts = array("d", bytes(8 * capacity))
+        self.free = array("q", bytes(8 * capacity))
+        self.total = array("q", bytes(8 * capacity))
+        self.head = 0  # next write position
+        self.count = 0
+
+    def append(self, ts: float, free: int, total: int) -> None:
+        i = self.head
+        self.ts[i] = ts
+        self.free[i] = free
+        self.total[i] = total
+        self.head = (i + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def latest(self) -> tuple[float, int, int] | None:
+        if not self.count:
+            return None
+        i = (self.head - 1) % self.capacity
+        return self.ts[i], self.free[i], self.total[i]
+
+    def _index(self, k: int) -> int:
+        """Buffer position of the k-th oldest sample."""
+        return (self.head - self.count + k) % self.capacity
+
+    def downsample(self, points: int, since: float = 0.0) -> dict:
+        """
+        Chronological series reduced to at most `points` buckets: bucket end
+        timestamp, mean and min free bytes, last total bytes.
+        """
+        start = 0
+        while start < self.count and self.ts[self._index(start)] < since:
+            start += 1
+        n = self.count - start
+        out: dict[str, list] = {"t": [], "free_bytes": [], "free_min": [], "total_bytes": []}
+        if n <= 0 or points <= 0:
+            return out
+        per = max(1, -(-n // points))  # ceil
+        for b in range(start, self.count, per):
+            acc = 0
+            low = None
+            end = min(b + per, self.count)
+            for k in range(b, end):
+                v = self.free[self._index(k)]
+                acc += v
+                low = v if low is None or v < low else low
+            last = self._index(end - 1)
+            out["t"].append(self.ts[last])
+            out["free_bytes"].append(acc // (end - b))
+            out["free_min"].append(low)
+            out["total_bytes"].append(self.total[last])
+        return out
+
+
+class DiskSampler:
+    """Fixed-cadence usage poller; one UsageRing per volume."""
+
+    def __init__(
+        self,
+        interval_seconds: float = DISK_SAMPLE_INTERVAL_SECONDS,
+        capacity: int = DISK_HISTORY_CAPACITY,
+        registry: VolumeRegistry | None = None,
+        usage_fn: Callable[[str], tuple[int, int, int]] = shutil.disk_usage,
+        clock: Callable[[], float] = time.time,
+    ) -> None:
+        self.interval_seconds = interval_seconds
+        self.capacity = capacity
+        self._registry = registry
+        self._usage_fn = usage_fn
+        self._clock = clock
+        self._rings: dict[str, UsageRing] = {}
+        self._lock = threading.Lock()
+        self._listeners: list[SampleListener] = []
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.last_sample_at = 0.0
+
+    @property
+    def registry(self) -> VolumeRegistry:
+        return self._registry or get_volume_registry()
+
+    def add_listener(self, fn: SampleListener) -> None:
+        """Call fn(drive, ts, free_bytes, total_bytes) after every new sample."""
+        self._listeners.append(fn)
+
+    def sample_once(self) -> None:
+        """Take one sample of every volume and notify listeners."""
+        now = self._clock()
+        taken = []
+        self.registry.check_devices()  # drive plugged in or removed: re-probe now, not at the next refresh
+        for v in self.registry.volumes():
+            try:
+                total, _used, free = self._usage_fn(v.root)
+            except OSError:
+                continue
+            taken.append((v.drive, total, free))
+        with self._lock:
+            for drive, total, free in taken:
+                ring = self._rings.get(drive)
+                if ring is None:
+                    ring = self._rings[drive] = UsageRing(self.capacity)
+                ring.append(now, free, total)
+            self.last_sample_at = now
+        for drive, total, free in taken:
+            for fn in self._listeners:
+                try:
+                    fn(drive, now, free, total)
+                except Exception:
+                    pass
+
+    def _ensure_sampled(self) -> None:
+        if not self.last_sample_at:
+            self.sample_once()
+
+    def latest(self, drive: str) -> DriveUsage | None:
+        """Latest sample for one drive ("C", "C:" or a mount point)."""
+        self._ensure_sampled()
+        key = drive if drive in self._rings else drive.rstrip(":\\").upper() + ":"
+        with self._lock:
+            ring = self._rings.get(key)
+            sample = ring.latest() if ring else None
+        if sample is None:
+            return None
+        _ts, free, total = sample
+        return DriveUsage(drive=key, total_bytes=total, used_bytes=total - free, free_bytes=free)
+
+    def latest_all(self) -> list[DriveUsage]:
+        """Latest sample for every volume seen in the last round."""
+        self._ensure_sampled()
+        result = []
+        with self._lock:
+            for drive, ring in self._rings.items():
+                sample = ring.latest()
+                if sample is not None and sample[0] == self.last_sample_at:
+                    _ts, free, total = sample
+                    result.append(DriveUsage(drive, total, total - free, free))
+        return result
+
+    def history(self, drive: str, points: int = 200, since: float = 0.0) -> dict | None:
+        """Downsampled series for one drive, or None if never sampled."""
+        key = drive if drive in self._rings else drive.rstrip(":\\").upper() + ":"
+        with self._lock:
+            ring = self._rings.get(key)
+            if ring is None:
+                return None
+            series = ring.downsample(points, since)
+        return {"drive": key, **series}
+
+    def start(self) -> None:
+        """Start the background sampling thread (idempotent)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+
+        def loop() -> None:
+            while not self._stop.is_set():
+                try:
+                    self.sample_once()
+                except Exception:
+                    pass
+                self._stop.wait(self.interval_seconds)
+
+        self._thread = threading.Thread(target=loop, daemon=True, name="disk-sampler")
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+_sampler: DiskSampler | None = None
+_sampler_lock = threading.Lock()
+
+
+def get_disk_sampler() -> DiskSampler:
+    """Process-wide sampler."""
+    global _sampler
+    with _sampler_lock:
+        if _sampler is None:
+            _sampler = DiskSampler()
+        return _sampler
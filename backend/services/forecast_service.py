@@ -0,0 +1,123 @@
+"""
+Disk-fill forecasting: per-volume Holt (level + trend) exponential smoothing
+over the usage samples, updated in O(1) per sample. Time constants instead of
+fixed alpha/beta handle irregular sample spacing; residuals are clipped to a
+few running mean-absolute-deviations so one large copy does not swing the
+trend. Used to alert before a volume crosses its free_percent_alert_below.
+"""
+import math
+import threading
+from dataclasses import dataclass
+
+from backend.core.constants import (
+    FORECAST_CLIP_MADS,
+    FORECAST_LEVEL_TAU_SECONDS,
+    FORECAST_MIN_HISTORY_SECONDS,
+    FORECAST_TREND_TAU_SECONDS,
+)
+
+MAD_FLOOR_FRACTION = 1e-4  # of volume size
+
+
+@dataclass
+class TrendState:
+    """Smoothed state for one volume."""
+
+    first_ts: float
+    last_ts: float
+    level: float  # free bytes
+    trend: float  # free bytes per second (negative = filling up)
+    total: int
+    mad: float = 0.0  # running mean absolute residual
+
+
+class DiskForecaster:
+    """Keeps one TrendState per drive; feed it with on_sample (sampler listener)."""
+
+    def __init__(
+        self,
+        level_tau: float = FORECAST_LEVEL_TAU_SECONDS,
+        trend_tau: float = FORECAST_TREND_TAU_SECONDS,
+        min_history: float = FORECAST_MIN_HISTORY_SECONDS,
+        clip_mads: float = FORECAST_CLIP_MADS,
+    ) -> None:
+        self.level_tau = level_tau
+        self.trend_tau = trend_tau
+        self.min_history = min_history
+        self.clip_mads = clip_mads
+        self._states: dict[str, TrendState] = {}
+        self._lock = threading.Lock()
+
+    def on_sample(self, drive: str, ts: float, free: int, total: int) -> None:
+        """O(1) update with one (timestamp, free bytes) sample."""
+        with self._lock:
+            st = self._states.get(drive)
+            if st is None or ts <= st.last_ts:
+                if st is None:
+                    self._states[drive] = TrendState(ts, ts, float(free), 0.0, total)
+                return
+            dt = ts - st.last_ts
+            predicted = st.level + st.trend * dt
+            residual = free - predicted
+            # Floor keeps a perfectly flat history from disabling the clip
+            bound = self.clip_mads * max(st.mad, total * MAD_FLOOR_FRACTION)
+            residual = max(-bound, min(bound, residual))
+            a = 1.0 - math.exp(-dt / self.level_tau)
+            b = 1.0 - math.exp(-dt / self.trend_tau)
+            level = predicted + a * residual
+            st.trend = b * (level - st.level) / dt + (1.0 - b) * st.trend
+            err = abs(free - predicted)
+            st.mad = err if st.mad == 0 else a * err + (1.0 - a) * st.mad
+            st.level = level
+            st.last_ts = ts
+            st.total = total
+
+    def state(self, drive: str) -> TrendState | None:
+        with self._lock:
+            return self._states.get(drive)
+
+    def seconds_until(self, drive: str, free_percent: float) -> float | None:
+        """
+        Estimated seconds until free space drops below free_percent of total;
+        0 if already below, None if not shrinking or not enough history yet.
+        """
+        st = self.state(drive)
+        if st is None or st.last_ts - st.first_ts < self.min_history:
+            return None
+        threshold = st.total * free_percent / 100.0
+        if st.level <= threshold:
+            return 0.0
+        if st.trend >= 0:
+            return None
+        return (st.level - threshold) / -st.trend
+
+    def summary(self) -> list[dict]:
+        """Per-drive trend for the API: level, bytes/day, history span."""
+        with self._lock:
+            states = list(self._states.items())
+        return [
+            {
+                "drive": drive,
+                "free_bytes": int(st.level),
+                "total_bytes": st.total,
+                "trend_bytes_per_day": int(st.trend * 86400),
+                "history_seconds": round(st.last_ts - st.first_ts),
+            }
+            for drive, st in states
+        ]
+
+
+def format_eta(seconds: float) -> str:
+    """Human-readable ETA for notifications (hours below two days, else days)."""
+    hours = seconds / 3600
+    if hours < 48:
+        return f"约 {max(1, round(hours))} 小时"
+    return f"约 {round(hours / 24)} 天"
+
+
+_forecaster = DiskForecaster()
+
+
+def get_disk_forecaster() -> DiskForecaster:
+    """Process-wide forecaster (registered as a disk sampler listener at startup)."""
+    return _forecaster
@@ -0,0 +1,263 @@
+"""
+Idle-aware job scheduler for heavy background work (rule scans, junk
+sizing, index refreshes). Due jobs wait in a queue until the machine has
+been idle for IDLE_SETTLE_SECONDS: low system CPU, low disk I/O and, where
+the OS exposes it, no recent keyboard/mouse input. Activity of this process
+is subtracted, so a running job does not count against itself. When the user
+comes back the running job is paused at its next pause_point() and resumed
+from the same place once the machine is idle again.
+
+Idle detection is pluggable (IdleProvider), so tests drive the scheduler
+with a fake provider and a fake clock by calling tick().
+"""
+import heapq
+import itertools
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Protocol
+
+from backend.core.constants import (
+    IDLE_CPU_PERCENT,
+    IDLE_DISK_BYTES_PER_SECOND,
+    IDLE_INPUT_SECONDS,
+    IDLE_MAX_DEFER_SECONDS,
+    IDLE_POLL_SECONDS,
+    IDLE_SETTLE_SECONDS,
+)
+from backend.core.metrics import QUEUE_DEPTH
+from backend.platform import get_platform
+from backend.services.resource_guard import PauseToken, pause_scope
+
+
+@dataclass
+class IdleState:
+    """One observation of system activity (this process excluded)."""
+
+    cpu_percent: float = 0.0
+    disk_bytes_per_second: float = 0.0
+    input_idle_seconds: float | None = None  # None: not detectable on this platform
+
+    def is_idle(self) -> bool:
+        if self.cpu_percent >= IDLE_CPU_PERCENT:
+            return False
+        if self.disk_bytes_per_second >= IDLE_DISK_BYTES_PER_SECOND:
+            return False
+        if self.input_idle_seconds is not None and self.input_idle_seconds < IDLE_INPUT_SECONDS:
+            return False
+        return True
+
+
+class IdleProvider(Protocol):
+    def snapshot(self) -> IdleState: ...
+
+
+class SystemIdleProvider:
+    """psutil CPU / disk counters (minus this process) plus last-input time."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self._clock = clock
+        self._last: tuple[float, int, int] | None = None  # (t, system io bytes, own io bytes)
+        self._psutil = None
+        self._proc = None
+        try:
+            import psutil
+            self._psutil = psutil
+            self._proc = psutil.Process()
+            psutil.cpu_percent(interval=None)  # prime the since-last-call counters
+            self._proc.cpu_percent(interval=None)
+        except Exception:
+            pass
+
+    def _io_bytes(self) -> tuple[int, int]:
+        disk = self._psutil.disk_io_counters()
+        system = (disk.read_bytes + disk.write_bytes) if disk else 0
+        try:
+            own_io = self._proc.io_counters()
+            own = own_io.read_bytes + own_io.write_bytes
+        except Exception:
+            own = 0
+        return system, own
+
+    def snapshot(self) -> IdleState:
+        state = IdleState(input_idle_seconds=get_platform().input_idle_seconds())
+        if self._psutil is None:
+            return state
+        try:
+            cpus = self._psutil.cpu_count() or 1
+            own_cpu = self._proc.cpu_percent(interval=None) / cpus
+            state.cpu_percent = max(0.0, self._psutil.cpu_percent(interval=None) - own_cpu)
+            now = self._clock()
+            system, own = self._io_bytes()
+            if self._last is not None and now > self._last[0]:
+                foreign = (system - self._last[1]) - (own - self._last[2])
+                state.disk_bytes_per_second = max(0.0, foreign / (now - self._last[0]))
+            self._last = (now, system, own)
+        except Exception:
+            pass
+        return state
+
+
+@dataclass(order=True)
+class _Entry:
+    due: float
+    seq: int
+    name: str = field(compare=False)
+    fn: Callable[[], None] = field(compare=False)
+    interval_seconds: float | None = field(compare=False, default=None)
+
+
+class IdleScheduler:
+    """
+    Runs one queued job at a time on a worker thread, only while idle.
+    submit() queues a one-off job, every() a recurring one; tick() observes
+    the provider once and starts, pauses or resumes work. start() calls
+    tick() every IDLE_POLL_SECONDS on a daemon thread.
+    """
+
+    def __init__(
+        self,
+        provider: IdleProvider | None = None,
+        clock: Callable[[], float] = time.monotonic,
+        settle_seconds: float = IDLE_SETTLE_SECONDS,
+        max_defer_seconds: float = IDLE_MAX_DEFER_SECONDS,
+        poll_seconds: float = IDLE_POLL_SECONDS,
+    ) -> None:
+        self._provider = provider
+        self._clock = clock
+        self.settle_seconds = settle_seconds
+        self.max_defer_seconds = max_defer_seconds
+        self.poll_seconds = poll_seconds
+        self._queue: list[_Entry] = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._idle_since: float | None = None
+        self._running: tuple[_Entry, PauseToken, threading.Thread, bool] | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.completed: list[str] = []
+
+    @property
+    def provider(self) -> IdleProvider:
+        if self._provider is None:
+            self._provider = SystemIdleProvider()
+        return self._provider
+
+    def submit(self, name: str, fn: Callable[[], None], delay_seconds: float = 0.0) -> bool:
+        """Queue a one-off job; False if a job with this name is already queued or running."""
+        return self._add(name, fn, delay_seconds, None)
+
+    def every(self, name: str, fn: Callable[[], None], interval_seconds: float, first_delay_seconds: float = 0.0) -> bool:
+        """Queue a recurring job, due again interval_seconds after each run finishes."""
+        return self._add(name, fn, first_delay_seconds, interval_seconds)
+
+    def _add(self, name: str, fn: Callable[[], None], delay: float, interval: float | None) -> bool:
+        with self._lock:
+            if any(e.name == name for e in self._queue) or (self._running and self._running[0].name == name):
+                return False
+            heapq.heappush(self._queue, _Entry(self._clock() + delay, next(self._seq), name, fn, interval))
+            return True
+
+    def status(self) -> dict:
+        with self._lock:
+            running = None
+            if self._running is not None:
+                entry, token, _t, forced = self._running
+                running = {"name": entry.name, "paused": token.paused, "pauses": token.pauses, "forced": forced}
+            return {
+                "idle_since": self._idle_since,
+                "running": running,
+                "queued": [{"name": e.name, "due": e.due} for e in sorted(self._queue)],
+            }
+
+    def tick(self) -> None:
+        """Observe idleness once; start, pause or resume the job accordingly."""
+        now = self._clock()
+        idle = self.provider.snapshot().is_idle()
+        with self._lock:
+            if not idle:
+                self._idle_since = None
+            elif self._idle_since is None:
+                self._idle_since = now
+            settled = self._idle_since is not None and now - self._idle_since >= self.settle_seconds
+            if self._running is not None:
+                entry, token, thread, forced = self._running
+                if thread.is_alive():
+                    if not idle and not forced:
+                        token.pause()
+                    elif settled or forced:
+                        token.resume()
+                    return
+                self._finish_locked(entry, now)
+            if not self._queue or self._queue[0].due > now:
+                return
+            overdue = now - self._queue[0].due >= self.max_defer_seconds
+            if not settled and not overdue:
+                return
+            entry = heapq.heappop(self._queue)
+            self._start_locked(entry, forced=not settled)
+
+    def _start_locked(self, entry: _Entry, forced: bool) -> None:
+        token = PauseToken()
+
+        def run() -> None:
+            with pause_scope(token):
+                try:
+                    entry.fn()
+                except Exception:
+                    try:
+                        from backend.core.logging_config import get_logger
+                        get_logger().warning("后台任务失败: %s", entry.name, exc_info=True)
+                    except Exception:
+                        pass
+
+        thread = threading.Thread(target=run, daemon=True, name=f"idle-job-{entry.name}")
+        self._running = (entry, token, thread, forced)
+        thread.start()
+
+    def _finish_locked(self, entry: _Entry, now: float) -> None:
+        self._running = None
+        self.completed.append(entry.name)
+        if entry.interval_seconds is not None:
+            heapq.heappush(
+                self._queue,
+                _Entry(now + entry.interval_seconds, next(self._seq), entry.name, entry.fn, entry.interval_seconds),
+            )
+
+    def start(self) -> None:
+        """Poll on a daemon thread (idempotent)."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+
+        def loop() -> None:
+            while not self._stop.is_set():
+                try:
+                    self.tick()
+                except Exception:
+                    pass
+                self._stop.wait(self.poll_seconds)
+
+        self._thread = threading.Thread(target=loop, daemon=True, name="idle-scheduler")
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop polling; a paused job is resumed so it can finish."""
+        self._stop.set()
+        with self._lock:
+            if self._running is not None:
+                self._running[1].resume()
+
+
+_scheduler: IdleScheduler | None = None
+_scheduler_lock = threading.Lock()
+
+
+def get_idle_scheduler() -> IdleScheduler:
+    """Process-wide idle scheduler (uses SystemIdleProvider)."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = IdleScheduler()
+            QUEUE_DEPTH.set_function(lambda: len(_scheduler._queue), "idle_jobs")
+        return _scheduler
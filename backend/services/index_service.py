@@ -1,22 +1,48 @@
 """
 File index: SQLite storage and full-scan with batching and low priority.
 Used for large-file and rule-based scans. USN used for incremental when available.
+
+Besides per-file rows, the index keeps per-directory rollups (dir_index): the
+directory mtime plus the largest / total size of its direct files and of its
+whole subtree. Rule scans use them to skip subtrees that cannot contain a match.
+
+Each volume scan is a numbered generation (scan_generation). Directories whose
+subtree size changed, and files whose size changed by at least
+GROWTH_FILE_MIN_DELTA_BYTES, are recorded as signed deltas against the
+previous generation (dir_growth / file_growth); summing deltas over a range of
+generations answers "where did the space go" without storing full snapshots.
+
+File names are also kept in an FTS5 trigram table (file_name_fts, rowid =
+file_index rowid) for substring and glob search. Every path that writes or
+deletes file rows updates it per directory in the same transaction; an index
+from before name search is filled in the background (backfill_name_search).
 """
+import base64
+import fnmatch
+import json
 import os
 import sqlite3
+import stat
 import threading
 import time
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import Iterator
 
 from backend.core.constants import (
     BATCH_DIRS_BEFORE_SLEEP,
     BATCH_SLEEP_SECONDS,
+    CANCEL_CHECK_INSTRUCTIONS,
+    GROWTH_FILE_MIN_DELTA_BYTES,
+    GROWTH_HISTORY_DAYS,
     INDEX_DB_DIR,
     INDEX_DB_NAME,
     MAX_RESULTS_PAGE,
+    NAME_SEARCH_BACKFILL_ROWS,
 )
-from backend.services.resource_guard import is_under_load, throttle_if_needed
+from backend.core.executors import WorkCancelled
+from backend.core.metrics import SCAN_DIRS_WALKED, SCAN_STAT_CALLS, SQLITE_QUERY_SECONDS
+from backend.services.resource_guard import is_under_load, pause_point, throttle_if_needed
 
 
 def _db_path() -> str:
@@ -24,8 +50,16 @@ def _db_path() -> str:
     return os.path.join(INDEX_DB_DIR, INDEX_DB_NAME)
 
 
+def _ensure_column(conn: sqlite3.Connection, table: str, column: str, decl: str) -> None:
+    """Add column to an existing table (schema upgrade for older index DBs)."""
+    cols = {r[1] for r in conn.execute(f"PRAGMA table_info({table})")}
+    if column not in cols:
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+
+
 def _get_connection() -> sqlite3.Connection:
     conn = sqlite3.connect(_db_path())
+    conn.create_function("casefold", 1, str.casefold, deterministic=True)
     conn.execute(
         """
         CREATE TABLE IF NOT EXISTS file_index (
@@ -37,21 +71,165 @@ def _get_connection() -> sqlite3.Connection:
         )
         """
     )
+    _ensure_column(conn, "file_index", "dir_path", "TEXT")
+    _ensure_column(conn, "file_index", "atime_ns", "INTEGER")
     conn.execute("CREATE INDEX IF NOT EXISTS idx_volume ON file_index(volume)")
     conn.execute("CREATE INDEX IF NOT EXISTS idx_size ON file_index(size_bytes)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_dir_path ON file_index(dir_path)")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS dir_index (
+            path TEXT PRIMARY KEY,
+            volume TEXT NOT NULL,
+            parent TEXT,
+            mtime_ns INTEGER NOT NULL,
+            file_count INTEGER NOT NULL,
+            file_max INTEGER NOT NULL,
+            file_total INTEGER NOT NULL,
+            subtree_count INTEGER NOT NULL,
+            subtree_max INTEGER NOT NULL,
+            subtree_total INTEGER NOT NULL
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_dir_parent ON dir_index(parent)")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS scan_generation (
+            gen INTEGER PRIMARY KEY AUTOINCREMENT,
+            volume TEXT NOT NULL,
+            root TEXT NOT NULL,
+            started_at REAL NOT NULL,
+            finished_at REAL,
+            baseline INTEGER NOT NULL
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS dir_growth (
+            gen INTEGER NOT NULL,
+            path TEXT NOT NULL,
+            delta_bytes INTEGER NOT NULL,
+            delta_files INTEGER NOT NULL
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_dir_growth_gen ON dir_growth(gen)")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS file_growth (
+            gen INTEGER NOT NULL,
+            path TEXT NOT NULL,
+            delta_bytes INTEGER NOT NULL
+        )
+        """
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_file_growth_gen ON file_growth(gen)")
+    # Names only (no positions / sizes): trigram LIKE / GLOB lookups need neither
+    conn.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS file_name_fts"
+        " USING fts5(name, tokenize='trigram', detail=none, columnsize=0)"
+    )
     return conn
 
 
-_lock = threading.Lock()
+# Case-folded last path component of file_index.path, as stored in file_name_fts
+_NAME_SQL = f"casefold(substr(path, length(rtrim(path, replace(path, '{os.sep}', ''))) + 1))"
+_SEARCH_SCHEMA_VERSION = 1  # PRAGMA user_version once file_name_fts covers every file row
+
+
+def _index_names(conn: sqlite3.Connection, where: str, params: tuple) -> None:
+    """Add search rows for the file rows matching where."""
+    conn.execute(
+        f"INSERT OR REPLACE INTO file_name_fts (rowid, name) SELECT rowid, {_NAME_SQL} FROM file_index WHERE {where}",
+        params,
+    )
+
+
+def _unindex_names(conn: sqlite3.Connection, where: str, params: tuple) -> None:
+    """Drop search rows for the file rows matching where (call before deleting them)."""
+    conn.execute(
+        f"DELETE FROM file_name_fts WHERE rowid IN (SELECT rowid FROM file_index WHERE {where})",
+        params,
+    )
+
+
+def _name_search_ready(conn: sqlite3.Connection) -> bool:
+    return conn.execute("PRAGMA user_version").fetchone()[0] >= _SEARCH_SCHEMA_VERSION
+
+
+_lock = threading.Lock()  # one index writer at a time; scans hold it only between pause points
+_scan_lock = threading.Lock()  # scans run one at a time (they drop _lock while parked)
+_generation = 0  # bumped on every index write; cheap "has anything changed" check
+
+
+def _bump_generation() -> None:
+    global _generation
+    _generation += 1
+
+
+def get_index_generation() -> int:
+    """In-process counter of index writes (for caches keyed on index contents)."""
+    return _generation
 
 
 def ensure_index_schema() -> None:
     """Create index table if not exists."""
     with _lock:
         conn = _get_connection()
+        try:
+            # A new (empty) index needs no name search backfill
+            if not _name_search_ready(conn) and conn.execute("SELECT 1 FROM file_index LIMIT 1").fetchone() is None:
+                conn.execute(f"PRAGMA user_version = {_SEARCH_SCHEMA_VERSION}")
+        finally:
+            conn.close()
+
+
+def name_search_ready() -> bool:
+    """False until file_name_fts covers an index written before name search existed (see backfill_name_search)."""
+    ensure_index_schema()
+    conn = _get_connection()
+    try:
+        return _name_search_ready(conn)
+    finally:
         conn.close()
 
 
+def backfill_name_search(batch_rows: int = NAME_SEARCH_BACKFILL_ROWS) -> int:
+    """
+    Fill file_name_fts from file_index for an index written before name
+    search existed, batch_rows file rows (by rowid) per transaction, with a
+    pause point between batches; run as a background job. Scans keep the
+    table in sync meanwhile (inserts are INSERT OR REPLACE, so rows a scan
+    already wrote are harmless). Returns the number of file rows covered.
+    """
+    ensure_index_schema()
+    after = 0
+    done = 0
+    while True:
+        with _lock:
+            conn = _get_connection()
+            try:
+                if _name_search_ready(conn):
+                    return done
+                row = conn.execute(
+                    "SELECT MAX(rowid), COUNT(*) FROM (SELECT rowid FROM file_index WHERE rowid > ? ORDER BY rowid LIMIT ?)",
+                    (after, batch_rows),
+                ).fetchone()
+                with SQLITE_QUERY_SECONDS.labels("name_backfill").time(), conn:
+                    if row[0] is None:
+                        conn.execute(f"PRAGMA user_version = {_SEARCH_SCHEMA_VERSION}")
+                        return done
+                    _index_names(conn, "rowid > ? AND rowid <= ?", (after, row[0]))
+                after = row[0]
+                done += row[1]
+            finally:
+                conn.close()
+        time.sleep(BATCH_SLEEP_SECONDS)
+        pause_point()
+
+
 def full_scan_directory(
     root_path: str,
     min_size_bytes: int = 0,
@@ -70,68 +248,793 @@ def full_scan_directory(
     ext_set = None
     if extensions:
         ext_set = {e.lower() if e.startswith(".") else "." + e.lower() for e in extensions}
-    for dirpath, _dirnames, filenames in os.walk(root_path, topdown=True):
+    stats = ScanStats()
+    try:
+        for dirpath, _dirnames, filenames in os.walk(root_path, topdown=True):
+            stats.dirs_listed += 1
+            if yield_batch:
+                count += 1
+                if count >= BATCH_DIRS_BEFORE_SLEEP:
+                    count = 0
+                    stats.publish("walk")
+                    time.sleep(BATCH_SLEEP_SECONDS)
+                    pause_point()
+                if is_under_load():
+                    throttle_if_needed()
+            stats.stat_calls += len(filenames)
+            for name in filenames:
+                try:
+                    full = os.path.join(dirpath, name)
+                    st = os.stat(full, follow_symlinks=False)
+                    if not hasattr(st, "st_file_attributes") or (st.st_file_attributes & 0x400 == 0):
+                        size = st.st_size
+                        if ext_set and Path(name).suffix.lower() not in ext_set:
+                            continue
+                        if size >= min_size_bytes:
+                            yield full, size, st.st_mtime_ns, False
+                except OSError:
+                    pass
+    finally:
+        stats.publish("walk")
+
+
+@dataclass
+class ScanStats:
+    """Counters for one walk; used to verify pruning and for diagnostics."""
+
+    stat_calls: int = 0
+    dirs_listed: int = 0
+    dirs_reused: int = 0  # unchanged dirs served from dir_index / file_index
+    dirs_pruned: int = 0  # whole subtrees skipped via rollups
+    _published: tuple[int, int] = field(default=(0, 0), repr=False, compare=False)
+
+    def publish(self, walker: str) -> None:
+        """Add progress since the last publish to the shared scan counters (once per batch)."""
+        dirs = self.dirs_listed + self.dirs_reused
+        SCAN_STAT_CALLS.labels(walker).inc(self.stat_calls - self._published[0])
+        SCAN_DIRS_WALKED.labels(walker).inc(dirs - self._published[1])
+        self._published = (self.stat_calls, dirs)
+
+
+def _is_reparse_point(entry: os.DirEntry) -> bool:
+    """True for junctions / symlinked dirs on Windows (attribute is free from scandir)."""
+    if os.name != "nt":
+        return False
+    try:
+        st = entry.stat(follow_symlinks=False)
+    except OSError:
+        return True
+    return bool(getattr(st, "st_file_attributes", 0) & 0x400)
+
+
+def _list_directory(
+    dirpath: str, stats: ScanStats
+) -> tuple[list[str], list[tuple[str, int, int, int]]] | None:
+    """
+    List one directory: return (subdir paths, [(file path, size_bytes, mtime_ns, atime_ns)]).
+    Files are stat'ed (reparse points skipped); returns None if unreadable.
+    """
+    try:
+        with os.scandir(dirpath) as it:
+            entries = list(it)
+    except OSError:
+        return None
+    stats.dirs_listed += 1
+    subdirs: list[str] = []
+    files: list[tuple[str, int, int, int]] = []
+    for entry in entries:
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                if not _is_reparse_point(entry):
+                    subdirs.append(entry.path)
+                continue
+            stats.stat_calls += 1
+            st = os.stat(entry.path, follow_symlinks=False)
+        except OSError:
+            continue
+        if hasattr(st, "st_file_attributes") and st.st_file_attributes & 0x400:
+            continue
+        files.append((entry.path, st.st_size, st.st_mtime_ns, st.st_atime_ns))
+    return subdirs, files
+
+
+def _prefix_range(path: str) -> tuple[str, str]:
+    """Half-open [lo, hi) range of paths strictly below path (for indexed prefix deletes)."""
+    lo = path if path.endswith(os.sep) else path + os.sep
+    return lo, lo[:-1] + chr(ord(os.sep) + 1)
+
+
+def _purge_subtree(conn: sqlite3.Connection, path: str, gen: int | None = None) -> None:
+    """Delete rows for a vanished directory and everything below it (recording the shrink under gen)."""
+    lo, hi = _prefix_range(path)
+    if gen is not None:
+        conn.execute(
+            "INSERT INTO dir_growth (gen, path, delta_bytes, delta_files)"
+            " SELECT ?, path, -subtree_total, -subtree_count FROM dir_index"
+            " WHERE (path = ? OR (path >= ? AND path < ?)) AND subtree_total > 0",
+            (gen, path, lo, hi),
+        )
+        conn.execute(
+            "INSERT INTO file_growth (gen, path, delta_bytes)"
+            " SELECT ?, path, -size_bytes FROM file_index"
+            " WHERE path >= ? AND path < ? AND size_bytes >= ?",
+            (gen, lo, hi, GROWTH_FILE_MIN_DELTA_BYTES),
+        )
+    conn.execute("DELETE FROM dir_index WHERE path = ? OR (path >= ? AND path < ?)", (path, lo, hi))
+    _unindex_names(conn, "path >= ? AND path < ?", (lo, hi))
+    conn.execute("DELETE FROM file_index WHERE path >= ? AND path < ?", (lo, hi))
+
+
+class _DirFrame:
+    """Post-order walk state for one directory."""
+
+    __slots__ = (
+        "path", "parent", "mtime_ns", "pending", "file_count", "file_max",
+        "file_total", "subtree_count", "subtree_max", "subtree_total", "stored",
+    )
+
+    def __init__(self, path: str, parent: str | None, mtime_ns: int) -> None:
+        self.path = path
+        self.stored: tuple | None = None  # dir_index row from the previous generation
+        self.parent = parent
+        self.mtime_ns = mtime_ns
+        self.pending: list[tuple[str, tuple | None]] = []  # (subdir, stored rollup)
+        self.file_count = 0
+        self.file_max = 0
+        self.file_total = 0
+        self.subtree_count = 0
+        self.subtree_max = 0
+        self.subtree_total = 0
+
+
+_UPSERT_FILE_SQL = """
+    INSERT OR REPLACE INTO file_index (path, volume, size_bytes, mtime_ns, is_dir, dir_path, atime_ns)
+    VALUES (?,?,?,?,?,?,?)
+"""
+_UPSERT_DIR_SQL = """
+    INSERT OR REPLACE INTO dir_index (
+        path, volume, parent, mtime_ns, file_count, file_max, file_total,
+        subtree_count, subtree_max, subtree_total
+    ) VALUES (?,?,?,?,?,?,?,?,?,?)
+"""
+# Stored rollup columns read back for each directory; growth compares against the last two
+_STORED_COLS = "mtime_ns, file_count, file_max, file_total, subtree_count, subtree_total"
+
+
+def _begin_generation(conn: sqlite3.Connection, volume: str, root: str) -> tuple[int, bool]:
+    """
+    Open a scan generation for root and expire generations older than
+    GROWTH_HISTORY_DAYS. Returns (gen, baseline); baseline is True when there
+    is no previous scan of root to diff against.
+    """
+    now = time.time()
+    cutoff = now - GROWTH_HISTORY_DAYS * 86400
+    old = [r[0] for r in conn.execute("SELECT gen FROM scan_generation WHERE started_at < ?", (cutoff,))]
+    if old:
+        marks = ",".join("?" for _ in old)
+        conn.execute(f"DELETE FROM dir_growth WHERE gen IN ({marks})", old)
+        conn.execute(f"DELETE FROM file_growth WHERE gen IN ({marks})", old)
+        conn.execute(f"DELETE FROM scan_generation WHERE gen IN ({marks})", old)
+    baseline = conn.execute("SELECT 1 FROM dir_index WHERE path = ?", (root,)).fetchone() is None
+    cur = conn.execute(
+        "INSERT INTO scan_generation (volume, root, started_at, baseline) VALUES (?,?,?,?)",
+        (volume, root, now, int(baseline)),
+    )
+    conn.commit()
+    return cur.lastrowid, baseline
+
+
+def _index_tree(
+    conn: sqlite3.Connection,
+    volume: str,
+    root: str,
+    stats: ScanStats,
+    yield_batch: bool = True,
+    incremental: bool = False,
+) -> int:
+    """
+    Walk root and write file rows plus per-directory rollups (post-order, so
+    subtree aggregates are complete when a directory row is written). Rows for
+    files and subdirectories that disappeared are removed. Returns number of
+    file rows written.
+
+    incremental: directories whose mtime matches their dir_index row are not
+    listed; their file rows and direct-file aggregates are kept and only their
+    known subdirectories are visited (one stat each). Adding, removing or
+    renaming an entry changes the parent's mtime, so creates and deletes are
+    still detected; a file rewritten in place is not.
+
+    Size changes against the previous scan of root are recorded as growth
+    deltas under a new scan generation (nothing is recorded for the first scan).
+    """
+    root = os.path.normpath(root)
+    try:
+        stats.stat_calls += 1
+        root_mtime = os.stat(root).st_mtime_ns
+    except OSError:
+        return 0
+    gen, baseline = _begin_generation(conn, volume, root)
+    track = None if baseline else gen
+    batch_size = 5000
+    file_batch: list[tuple] = []
+    dir_batch: list[tuple] = []
+    dir_growth: list[tuple] = []
+    file_growth: list[tuple] = []
+    name_dirs: list[str] = []  # directories whose file rows in file_batch need search rows
+    written = 0
+    dir_count = 0
+
+    def flush() -> None:
+        nonlocal written
+        stats.publish("index")
+        with SQLITE_QUERY_SECONDS.labels("index_write").time():
+            if file_batch:
+                conn.executemany(_UPSERT_FILE_SQL, file_batch)
+                written += len(file_batch)
+                file_batch.clear()
+            for listed in name_dirs:
+                _index_names(conn, "dir_path = ?", (listed,))
+            name_dirs.clear()
+            if dir_batch:
+                conn.executemany(_UPSERT_DIR_SQL, dir_batch)
+                dir_batch.clear()
+            if dir_growth:
+                conn.executemany("INSERT INTO dir_growth VALUES (?,?,?,?)", dir_growth)
+                dir_growth.clear()
+            if file_growth:
+                conn.executemany("INSERT INTO file_growth VALUES (?,?,?)", file_growth)
+                file_growth.clear()
+            conn.commit()
+        _bump_generation()
+
+    def enter(path: str, parent: str | None, mtime_ns: int, stored: tuple | None) -> _DirFrame:
+        nonlocal dir_count
         if yield_batch:
-            count += 1
-            if count >= BATCH_DIRS_BEFORE_SLEEP:
-                count = 0
-                time.sleep(BATCH_SLEEP_SECONDS)
+            dir_count += 1
+            if dir_count >= BATCH_DIRS_BEFORE_SLEEP:
+                dir_count = 0
+                flush()
+                # Batch committed: let other writers in while sleeping and while an
+                # idle-scheduled scan is parked (the caller holds _lock).
+                _lock.release()
+                try:
+                    time.sleep(BATCH_SLEEP_SECONDS)
+                    pause_point()
+                finally:
+                    _lock.acquire()
             if is_under_load():
                 throttle_if_needed()
-        for name in filenames:
+        frame = _DirFrame(path, parent, mtime_ns)
+        frame.stored = stored
+        known = {
+            r[0]: r[1:]
+            for r in conn.execute(
+                f"SELECT path, {_STORED_COLS} FROM dir_index WHERE parent = ?", (path,)
+            )
+        }
+        if incremental and stored is not None and stored[0] == mtime_ns:
+            stats.dirs_reused += 1
+            frame.file_count, frame.file_max, frame.file_total = stored[1:4]
+            subdirs = list(known)
+        else:
+            listing = _list_directory(path, stats)
+            subdirs, files = listing if listing is not None else ([], [])
+            if track is not None:
+                before = dict(
+                    conn.execute("SELECT path, size_bytes FROM file_index WHERE dir_path = ?", (path,))
+                )
+                for fpath, size, _m, _a in files:
+                    delta = size - before.pop(fpath, 0)
+                    if abs(delta) >= GROWTH_FILE_MIN_DELTA_BYTES:
+                        file_growth.append((track, fpath, delta))
+                for fpath, size in before.items():
+                    if size >= GROWTH_FILE_MIN_DELTA_BYTES:
+                        file_growth.append((track, fpath, -size))
+            _unindex_names(conn, "dir_path = ?", (path,))
+            conn.execute("DELETE FROM file_index WHERE dir_path = ?", (path,))
+            if files:
+                name_dirs.append(path)
+            for fpath, size, mtime, atime in files:
+                file_batch.append((fpath, volume, size, mtime, 0, path, atime))
+                frame.file_count += 1
+                frame.file_total += size
+                if size > frame.file_max:
+                    frame.file_max = size
+            current = set(subdirs)
+            for old in known:
+                if old not in current:
+                    _purge_subtree(conn, old, track)
+        frame.subtree_count = frame.file_count
+        frame.subtree_max = frame.file_max
+        frame.subtree_total = frame.file_total
+        frame.pending = [(d, known.get(d)) for d in subdirs]
+        if len(file_batch) >= batch_size:
+            flush()
+        return frame
+
+    # Drop rows from before rollups existed; this scan rewrites them with dir_path set.
+    _unindex_names(conn, "volume = ? AND dir_path IS NULL", (volume,))
+    conn.execute("DELETE FROM file_index WHERE volume = ? AND dir_path IS NULL", (volume,))
+    root_stored = conn.execute(
+        f"SELECT {_STORED_COLS} FROM dir_index WHERE path = ?", (root,)
+    ).fetchone()
+    stack = [enter(root, None, root_mtime, root_stored)]
+    while stack:
+        frame = stack[-1]
+        if frame.pending:
+            child, stored = frame.pending.pop()
             try:
-                full = os.path.join(dirpath, name)
-                st = os.stat(full, follow_symlinks=False)
-                if not hasattr(st, "st_file_attributes") or (st.st_file_attributes & 0x400 == 0):
-                    size = st.st_size
-                    if ext_set and Path(name).suffix.lower() not in ext_set:
-                        continue
-                    if size >= min_size_bytes:
-                        yield full, size, st.st_mtime_ns, False
+                stats.stat_calls += 1
+                child_mtime = os.stat(child, follow_symlinks=False).st_mtime_ns
             except OSError:
-                pass
+                # Vanished under an unchanged parent (or unreadable): drop its rows
+                _purge_subtree(conn, child, track)
+                continue
+            stack.append(enter(child, frame.path, child_mtime, stored))
+            continue
+        stack.pop()
+        dir_batch.append((
+            frame.path, volume, frame.parent, frame.mtime_ns, frame.file_count,
+            frame.file_max, frame.file_total, frame.subtree_count,
+            frame.subtree_max, frame.subtree_total,
+        ))
+        if track is not None:
+            prev_count, prev_total = frame.stored[4:6] if frame.stored else (0, 0)
+            if frame.subtree_total != prev_total or frame.subtree_count != prev_count:
+                dir_growth.append((
+                    track, frame.path, frame.subtree_total - prev_total,
+                    frame.subtree_count - prev_count,
+                ))
+        if stack:
+            parent = stack[-1]
+            parent.subtree_count += frame.subtree_count
+            parent.subtree_total += frame.subtree_total
+            if frame.subtree_max > parent.subtree_max:
+                parent.subtree_max = frame.subtree_max
+    flush()
+    conn.execute("UPDATE scan_generation SET finished_at = ? WHERE gen = ?", (time.time(), gen))
+    conn.commit()
+    return written
 
 
-def index_full_scan_volume(volume: str, root: str) -> int:
+def index_full_scan_volume(volume: str, root: str, stats: ScanStats | None = None) -> int:
     """
     Full scan one volume root and upsert into SQLite. Returns number of rows updated.
-    Uses batching and resource guard internally.
+    Uses batching and resource guard internally; also refreshes dir_index rollups.
     """
     ensure_index_schema()
-    updated = 0
-    batch = []
-    batch_size = 5000
+    stats = stats if stats is not None else ScanStats()
+    with _scan_lock, _lock:
+        conn = _get_connection()
+        try:
+            return _index_tree(conn, volume, root, stats, yield_batch=True)
+        finally:
+            conn.close()
+
+
+def index_incremental_rescan(volume: str, root: str, stats: ScanStats | None = None) -> int:
+    """
+    Directory-mtime incremental rescan (works on any filesystem, no admin).
+    Only directories whose mtime changed since the last scan are re-listed and
+    their files re-stat'ed; deletes are detected through the parent's mtime.
+    Returns number of file rows rewritten.
+    """
+    ensure_index_schema()
+    stats = stats if stats is not None else ScanStats()
+    with _scan_lock, _lock:
+        conn = _get_connection()
+        try:
+            return _index_tree(conn, volume, root, stats, yield_batch=True, incremental=True)
+        finally:
+            conn.close()
+
+
+def has_dir_rollups(root: str) -> bool:
+    """True if root has been indexed with directory rollups (incremental rescan possible)."""
+    ensure_index_schema()
+    conn = _get_connection()
+    try:
+        row = conn.execute(
+            "SELECT 1 FROM dir_index WHERE path = ?", (os.path.normpath(root),)
+        ).fetchone()
+        return row is not None
+    finally:
+        conn.close()
+
+
+def refresh_index_volume(volume: str, root: str, stats: ScanStats | None = None) -> int:
+    """
+    Bring the index for one volume up to date: directory-mtime incremental
+    rescan when rollups from a previous scan exist, else a full scan.
+    """
+    if has_dir_rollups(root):
+        return index_incremental_rescan(volume, root, stats)
+    return index_full_scan_volume(volume, root, stats)
+
+
+def pruned_scan_directory(
+    root_path: str,
+    min_size_bytes: int = 0,
+    extensions: list[str] | None = None,
+    stats: ScanStats | None = None,
+    yield_batch: bool = True,
+) -> Iterator[tuple[str, int, int, bool]]:
+    """
+    Like full_scan_directory, but uses dir_index rollups from a previous scan:
+    below an unchanged directory whose subtree_max is under min_size_bytes,
+    the known directories are only stat'ed (a directory's mtime changes with
+    its direct entries, not deeper ones), and just those whose mtime changed
+    are walked; an unchanged directory's files are read from file_index
+    instead of being stat'ed. Changed or unknown directories are listed
+    normally. Files that grow in place (no directory mtime change) are picked
+    up at the next index refresh.
+    """
+    root_path = os.path.normpath(root_path)
+    stats = stats if stats is not None else ScanStats()
+    try:
+        stats.stat_calls += 1
+        st = os.stat(root_path)
+    except OSError:
+        return
+    if not stat.S_ISDIR(st.st_mode):
+        return
+    root_mtime = st.st_mtime_ns
+    ext_set = None
+    if extensions:
+        ext_set = {e.lower() if e.startswith(".") else "." + e.lower() for e in extensions}
+
+    def wanted(path: str, size: int) -> bool:
+        if size < min_size_bytes:
+            return False
+        return not ext_set or Path(path).suffix.lower() in ext_set
+
+    ensure_index_schema()
+    conn = _get_connection()
+    try:
+        row = conn.execute(
+            "SELECT mtime_ns, file_max, subtree_max FROM dir_index WHERE path = ?",
+            (root_path,),
+        ).fetchone()
+        stack: list[tuple[str, int, tuple | None]] = [(root_path, root_mtime, row)]
+        count = 0
+        while stack:
+            path, mtime_ns, rollup = stack.pop()
+            if yield_batch:
+                count += 1
+                if count >= BATCH_DIRS_BEFORE_SLEEP:
+                    count = 0
+                    stats.publish("pruned")
+                    time.sleep(BATCH_SLEEP_SECONDS)
+                    pause_point()
+                if is_under_load():
+                    throttle_if_needed()
+            unchanged = rollup is not None and rollup[0] == mtime_ns
+            if unchanged and rollup[2] < min_size_bytes:
+                # Nothing big enough below here last time. A change further down
+                # does not touch this mtime, so stat every known directory in the
+                # subtree (one range query, nothing listed) and walk only those
+                # whose mtime moved.
+                stats.dirs_pruned += 1
+                lo, hi = _prefix_range(path)
+                # Ranges below changed or vanished directories. Sorting does not keep
+                # a subtree contiguous ("a/b c" sorts between "a/b" and "a/b/x"), so
+                # a range stays until the sorted paths have passed its end.
+                skipped: list[tuple[str, str]] = []
+                for dpath, dmtime, dfile_max, dsubtree_max in conn.execute(
+                    "SELECT path, mtime_ns, file_max, subtree_max FROM dir_index"
+                    " WHERE path >= ? AND path < ? ORDER BY path",
+                    (lo, hi),
+                ).fetchall():
+                    while skipped and dpath >= skipped[-1][1]:
+                        skipped.pop()
+                    if any(slo <= dpath < shi for slo, shi in skipped):
+                        continue  # below a changed directory: reached through its listing
+                    try:
+                        stats.stat_calls += 1
+                        current = os.stat(dpath, follow_symlinks=False).st_mtime_ns
+                    except OSError:
+                        skipped.append(_prefix_range(dpath))
+                        continue
+                    if current != dmtime:
+                        stack.append((dpath, current, (dmtime, dfile_max, dsubtree_max)))
+                        skipped.append(_prefix_range(dpath))
+                continue
+            children = {
+                r[0]: r[1:]
+                for r in conn.execute(
+                    "SELECT path, mtime_ns, file_max, subtree_max FROM dir_index WHERE parent = ?",
+                    (path,),
+                )
+            }
+            if unchanged:
+                stats.dirs_reused += 1
+                if rollup[1] >= min_size_bytes:
+                    rows = conn.execute(
+                        "SELECT path, size_bytes, mtime_ns FROM file_index WHERE dir_path = ? AND size_bytes >= ?",
+                        (path, min_size_bytes),
+                    ).fetchall()
+                    for fpath, size, fmtime in rows:
+                        if wanted(fpath, size):
+                            yield fpath, size, fmtime, False
+                subdirs = list(children)
+            else:
+                listing = _list_directory(path, stats)
+                if listing is None:
+                    continue
+                subdirs, files = listing
+                for fpath, size, fmtime, _atime in files:
+                    if wanted(fpath, size):
+                        yield fpath, size, fmtime, False
+            for child in subdirs:
+                try:
+                    stats.stat_calls += 1
+                    child_mtime = os.stat(child, follow_symlinks=False).st_mtime_ns
+                except OSError:
+                    continue
+                stack.append((child, child_mtime, children.get(child)))
+    finally:
+        stats.publish("pruned")
+        conn.close()
+
+
+def lookup_file_rows(paths: list[str]) -> dict[str, tuple[int, int]]:
+    """Return {path: (size_bytes, mtime_ns)} for the given paths that are indexed."""
+    if not paths:
+        return {}
+    ensure_index_schema()
+    conn = _get_connection()
+    try:
+        result: dict[str, tuple[int, int]] = {}
+        with SQLITE_QUERY_SECONDS.labels("lookup_rows").time():
+            for i in range(0, len(paths), 500):
+                chunk = paths[i : i + 500]
+                marks = ",".join("?" for _ in chunk)
+                for path, size, mtime in conn.execute(
+                    f"SELECT path, size_bytes, mtime_ns FROM file_index WHERE path IN ({marks})",
+                    chunk,
+                ):
+                    result[path] = (size, mtime)
+        return result
+    finally:
+        conn.close()
+
+
+def _remove_from_rollups(conn: sqlite3.Connection, removed: list[tuple[int, str | None]]) -> None:
+    """
+    Adjust dir_index for deleted file rows [(size_bytes, dir_path)]: the
+    directories' own file aggregates are recomputed from file_index, and
+    subtree counts / totals / max are updated up the parent chain (deepest
+    first, so each subtree_max sees its children's new values).
+    """
+    own: dict[str, list[int]] = {}
+    for size, dir_path in removed:
+        if dir_path is not None:
+            acc = own.setdefault(dir_path, [0, 0])
+            acc[0] += 1
+            acc[1] += size
+    subtree: dict[str, list[int]] = {}
+    parents: dict[str, str | None] = {}
+    for dir_path, (count, total) in own.items():
+        d: str | None = dir_path
+        while d is not None:
+            acc = subtree.setdefault(d, [0, 0])
+            acc[0] += count
+            acc[1] += total
+            if d not in parents:
+                row = conn.execute("SELECT parent FROM dir_index WHERE path = ?", (d,)).fetchone()
+                parents[d] = row[0] if row else None
+            d = parents[d]
+    conn.executemany(
+        "UPDATE dir_index SET (file_count, file_max, file_total) = ("
+        " SELECT COUNT(*), COALESCE(MAX(size_bytes), 0), COALESCE(SUM(size_bytes), 0)"
+        " FROM file_index WHERE dir_path = ?) WHERE path = ?",
+        [(d, d) for d in own],
+    )
+    conn.executemany(
+        "UPDATE dir_index SET subtree_count = subtree_count - ?, subtree_total = subtree_total - ?,"
+        " subtree_max = MAX(file_max, COALESCE((SELECT MAX(c.subtree_max) FROM dir_index c"
+        " WHERE c.parent = dir_index.path), 0)) WHERE path = ?",
+        [(subtree[d][0], subtree[d][1], d) for d in sorted(subtree, key=len, reverse=True)],
+    )
+
+
+def remove_file_rows(paths: list[str]) -> None:
+    """Delete index rows for removed files and adjust their directories' rollups, in one transaction."""
+    if not paths:
+        return
+    ensure_index_schema()
     with _lock:
         conn = _get_connection()
         try:
-            for path, size_bytes, mtime_ns, is_dir in full_scan_directory(
-                root, yield_batch=True
-            ):
-                batch.append((path, volume, size_bytes, mtime_ns, 0))
-                if len(batch) >= batch_size:
-                    conn.executemany(
-                        """
-                        INSERT OR REPLACE INTO file_index (path, volume, size_bytes, mtime_ns, is_dir)
-                        VALUES (?,?,?,?,?)
-                        """,
-                        batch,
-                    )
-                    conn.commit()
-                    updated += len(batch)
-                    batch = []
-            if batch:
+            with SQLITE_QUERY_SECONDS.labels("remove_rows").time(), conn:
+                removed: list[tuple[int, str | None]] = []
+                for i in range(0, len(paths), 500):
+                    chunk = paths[i : i + 500]
+                    marks = ",".join("?" for _ in chunk)
+                    removed += conn.execute(
+                        f"SELECT size_bytes, dir_path FROM file_index WHERE path IN ({marks})", chunk
+                    ).fetchall()
                 conn.executemany(
-                    """
-                    INSERT OR REPLACE INTO file_index (path, volume, size_bytes, mtime_ns, is_dir)
-                    VALUES (?,?,?,?,?)
-                    """,
-                    batch,
+                    "DELETE FROM file_name_fts WHERE rowid = (SELECT rowid FROM file_index WHERE path = ?)",
+                    [(p,) for p in paths],
                 )
-                conn.commit()
-                updated += len(batch)
+                conn.executemany("DELETE FROM file_index WHERE path = ?", [(p,) for p in paths])
+                _remove_from_rollups(conn, removed)
+            _bump_generation()
         finally:
             conn.close()
-    return updated
+
+
+def iter_rows_under(root: str) -> Iterator[tuple[str, int, int, int]]:
+    """
+    Yield (path, size_bytes, mtime_ns, atime_ns) for indexed files below root.
+    root is resolved with realpath, as get_junk_roots() resolves the roots it
+    dedupes, so a symlinked or short-name root still matches indexed paths.
+    """
+    ensure_index_schema()
+    lo, hi = _prefix_range(os.path.realpath(root))
+    conn = _get_connection()
+    db_ns = 0
+    try:
+        start = time.perf_counter_ns()
+        cur = conn.execute(
+            "SELECT path, size_bytes, mtime_ns, COALESCE(atime_ns, mtime_ns) FROM file_index"
+            " WHERE path >= ? AND path < ? AND is_dir = 0",
+            (lo, hi),
+        )
+        while True:
+            rows = cur.fetchmany(10000)
+            db_ns += time.perf_counter_ns() - start
+            if not rows:
+                break
+            yield from rows
+            start = time.perf_counter_ns()
+    finally:
+        # Time spent in SQLite only, not in the consumer between fetches
+        SQLITE_QUERY_SECONDS.labels("rows_under").record_ns(db_ns)
+        conn.close()
+
+
+def growth_report(
+    volume: str | None = None,
+    since: float | None = None,
+    limit: int = 20,
+) -> dict:
+    """
+    Directories and files that grew the most, summed over scan generations
+    started at or after `since` (epoch seconds); default is the latest
+    generation only, i.e. growth since the scan before it.
+    Returns {generations, from, to, directories: [{path, delta_bytes,
+    delta_files}], files: [{path, delta_bytes}]}, largest growth first.
+    """
+    ensure_index_schema()
+    conn = _get_connection()
+    try:
+        with SQLITE_QUERY_SECONDS.labels("growth").time():
+            where = "baseline = 0"
+            params: list = []
+            if volume:
+                where += " AND volume = ?"
+                params.append(volume)
+            if since is not None:
+                where += " AND started_at >= ?"
+                params.append(since)
+                sql = f"SELECT gen, started_at, finished_at FROM scan_generation WHERE {where} ORDER BY gen"
+            else:
+                sql = f"SELECT gen, started_at, finished_at FROM scan_generation WHERE {where} ORDER BY gen DESC LIMIT 1"
+            gens = conn.execute(sql, params).fetchall()
+            report: dict = {
+                "generations": [g[0] for g in gens],
+                "from": min((g[1] for g in gens), default=None),
+                "to": max((g[2] or g[1] for g in gens), default=None),
+                "directories": [],
+                "files": [],
+            }
+            if not gens:
+                return report
+            ids = report["generations"]
+            marks = ",".join("?" for _ in ids)
+            report["directories"] = [
+                {"path": r[0], "delta_bytes": r[1], "delta_files": r[2]}
+                for r in conn.execute(
+                    f"SELECT path, SUM(delta_bytes) AS d, SUM(delta_files) FROM dir_growth"
+                    f" WHERE gen IN ({marks}) GROUP BY path HAVING d > 0 ORDER BY d DESC LIMIT ?",
+                    [*ids, limit],
+                )
+            ]
+            report["files"] = [
+                {"path": r[0], "delta_bytes": r[1]}
+                for r in conn.execute(
+                    f"SELECT path, SUM(delta_bytes) AS d FROM file_growth"
+                    f" WHERE gen IN ({marks}) GROUP BY path HAVING d > 0 ORDER BY d DESC LIMIT ?",
+                    [*ids, limit],
+                )
+            ]
+            return report
+    finally:
+        conn.close()
+
+
+# Large-file sort keys: column and its position in a (path, size_bytes, mtime_ns) row.
+# Ties are broken by path, so (key, path) of the last row is a stable keyset cursor.
+LARGE_FILE_SORTS = {"size": ("size_bytes", 1), "mtime": ("mtime_ns", 2), "path": ("path", 0)}
+
+
+def encode_large_files_cursor(row: tuple[str, int, int], sort: str = "size") -> str:
+    """Opaque cursor for the page after row (the last row of the current page)."""
+    raw = json.dumps([sort, row[LARGE_FILE_SORTS[sort][1]], row[0]], ensure_ascii=False)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_large_files_cursor(cursor: str, sort: str = "size") -> tuple:
+    """(sort key, path) from encode_large_files_cursor; ValueError if malformed or for another sort."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_sort, key, path = json.loads(raw)
+    except (ValueError, TypeError) as e:
+        raise ValueError("malformed cursor") from e
+    if cursor_sort != sort or not isinstance(path, str) or not isinstance(key, (int, str)):
+        raise ValueError("cursor does not match sort")
+    return key, path
+
+
+def _large_files_where(
+    volume: str | None,
+    min_size_bytes: int,
+    extensions: list[str] | None,
+    name_contains: str | None = None,
+) -> tuple[str, list]:
+    if volume:
+        sql = " FROM file_index WHERE volume = ? AND is_dir = 0 AND size_bytes >= ?"
+        params: list = [volume, min_size_bytes]
+    else:
+        sql = " FROM file_index WHERE is_dir = 0 AND size_bytes >= ?"
+        params = [min_size_bytes]
+    if extensions:
+        # Match path ending with extension (case-insensitive via LIKE)
+        like_parts = " OR ".join("path LIKE ?" for _ in extensions)
+        sql += f" AND ({like_parts})"
+        for e in extensions:
+            ext = e if e.startswith(".") else "." + e
+            params.append("%" + ext.lower())
+    if name_contains:
+        escaped = name_contains.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        sql += " AND path LIKE ? ESCAPE '\\'"
+        params.append(f"%{escaped}%")
+    return sql, params
+
+
+def _large_files_sql(
+    volume: str | None,
+    min_size_bytes: int,
+    extensions: list[str] | None,
+    limit: int,
+    offset: int,
+    sort: str = "size",
+    descending: bool = True,
+    after: tuple | None = None,
+    name_contains: str | None = None,
+) -> tuple[str, list]:
+    where, params = _large_files_where(volume, min_size_bytes, extensions, name_contains)
+    sql = "SELECT path, size_bytes, mtime_ns" + where
+    column = LARGE_FILE_SORTS[sort][0]
+    op, direction = ("<", "DESC") if descending else (">", "ASC")
+    if after is not None:
+        key, path = after
+        if column == "path":
+            sql += f" AND path {op} ?"
+            params.append(path)
+        else:
+            # Expanded row-value comparison so the size index still bounds the range
+            sql += f" AND {column} {op}= ? AND ({column} {op} ? OR path {op} ?)"
+            params.extend([key, key, path])
+    if column == "path":
+        sql += f" ORDER BY path {direction}"
+    else:
+        sql += f" ORDER BY {column} {direction}, path {direction}"
+    sql += " LIMIT ? OFFSET ?"
+    params.extend([limit, offset])
+    return sql, params
 
 
 def query_large_files(
@@ -149,25 +1052,203 @@ def query_large_files(
     with _lock:
         conn = _get_connection()
         try:
-            if volume:
-                sql = "SELECT path, size_bytes, mtime_ns FROM file_index WHERE volume = ? AND is_dir = 0 AND size_bytes >= ?"
-                params: list = [volume, min_size_bytes]
-            else:
-                sql = "SELECT path, size_bytes, mtime_ns FROM file_index WHERE is_dir = 0 AND size_bytes >= ?"
-                params = [min_size_bytes]
-            if extensions:
-                # Match path ending with extension (case-insensitive via LIKE)
-                like_parts = " OR ".join("path LIKE ?" for _ in extensions)
-                sql += f" AND ({like_parts})"
-                for e in extensions:
-                    ext = e if e.startswith(".") else "." + e
-                    params.append("%" + ext.lower())
-            sql += " ORDER BY size_bytes DESC LIMIT ? OFFSET ?"
-            params.extend([limit, offset])
-            cur = conn.execute(sql, params)
+            with SQLITE_QUERY_SECONDS.labels("large_files").time():
+                rows = conn.execute(*_large_files_sql(volume, min_size_bytes, extensions, limit, offset)).fetchall()
             return [
                 {"path": r[0], "size_bytes": r[1], "mtime_ns": r[2]}
-                for r in cur.fetchall()
+                for r in rows
             ]
         finally:
             conn.close()
+
+
+def _watch_cancel(conn: sqlite3.Connection, cancelled: threading.Event | None) -> None:
+    """Abort the connection's running statement once cancelled is set (and refuse to start if already set)."""
+    if cancelled is None:
+        return
+    if cancelled.is_set():
+        raise WorkCancelled()
+    conn.set_progress_handler(cancelled.is_set, CANCEL_CHECK_INSTRUCTIONS)
+
+
+def count_large_files(
+    volume: str | None,
+    min_size_bytes: int,
+    extensions: list[str] | None = None,
+    name_contains: str | None = None,
+    cancelled: threading.Event | None = None,
+) -> int:
+    """Number of rows the large-files query matches (for sizing a virtual table)."""
+    ensure_index_schema()
+    where, params = _large_files_where(volume, min_size_bytes, extensions, name_contains)
+    conn = _get_connection()
+    try:
+        _watch_cancel(conn, cancelled)
+        with SQLITE_QUERY_SECONDS.labels("large_files_count").time():
+            return conn.execute("SELECT COUNT(*)" + where, params).fetchone()[0]
+    except sqlite3.OperationalError:
+        if cancelled is not None and cancelled.is_set():
+            raise WorkCancelled() from None
+        raise
+    finally:
+        conn.close()
+
+
+def iter_large_files(
+    volume: str | None,
+    min_size_bytes: int,
+    extensions: list[str] | None = None,
+    limit: int = MAX_RESULTS_PAGE,
+    offset: int = 0,
+    sort: str = "size",
+    descending: bool = True,
+    after: tuple | None = None,
+    name_contains: str | None = None,
+    cancelled: threading.Event | None = None,
+) -> Iterator[tuple[str, int, int]]:
+    """
+    Same query as query_large_files, yielding (path, size_bytes, mtime_ns) tuples
+    straight from the cursor. sort / descending pick the order (ties by path);
+    after is the (sort key, path) of the previous page's last row, so deep pages
+    cost the same as the first. Setting cancelled interrupts the query
+    (WorkCancelled).
+    """
+    ensure_index_schema()
+    conn = _get_connection()
+    db_ns = 0
+    sql = _large_files_sql(volume, min_size_bytes, extensions, limit, offset, sort, descending, after, name_contains)
+    try:
+        _watch_cancel(conn, cancelled)
+        start = time.perf_counter_ns()
+        cur = conn.execute(*sql)
+        while True:
+            rows = cur.fetchmany(256)
+            db_ns += time.perf_counter_ns() - start
+            if not rows:
+                break
+            yield from rows
+            start = time.perf_counter_ns()
+    except sqlite3.OperationalError:
+        if cancelled is not None and cancelled.is_set():
+            raise WorkCancelled() from None
+        raise
+    finally:
+        SQLITE_QUERY_SECONDS.labels("large_files").record_ns(db_ns)
+        conn.close()
+
+
+def _literal_runs(pattern: str, glob: bool) -> list[str]:
+    """Literal stretches of a glob (outside * ? and [...]), or the whole substring."""
+    if not glob:
+        return [pattern]
+    runs, current, i = [], [], 0
+    while i < len(pattern):
+        c = pattern[i]
+        end = pattern.find("]", i + 2) if c == "[" else -1
+        if c in "*?" or end != -1:
+            runs.append("".join(current))
+            current = []
+            i = end if end != -1 else i
+        else:
+            current.append(c)
+        i += 1
+    runs.append("".join(current))
+    return [r for r in runs if r]
+
+
+def _escape_glob(literal: str) -> str:
+    """GLOB-quote a literal run (only [ is special once * and ? are excluded)."""
+    return literal.replace("[", "[[]")
+
+
+def _sqlite_glob(pattern: str) -> str:
+    """fnmatch-style glob to SQLite GLOB syntax ([!...] negation is [^...])."""
+    return pattern.replace("[!", "[^")
+
+
+def is_glob(query: str) -> bool:
+    """True if query is a glob pattern rather than a plain substring."""
+    return any(c in query for c in "*?[")
+
+
+def iter_name_search(
+    query: str,
+    volume: str | None = None,
+    limit: int = MAX_RESULTS_PAGE,
+    after: int = 0,
+    cancelled: threading.Event | None = None,
+) -> Iterator[tuple[int, str, int, int]]:
+    """
+    Files whose name contains query (case-insensitive), or matches it as a glob
+    when it has * ? or [...] (whole name, e.g. "*.iso", "IMG_20??*"). Yields
+    (rowid, path, size_bytes, mtime_ns) in rowid order after rowid `after`, so
+    the last rowid continues the search.
+
+    The trigram table is only given the literal runs of 3+ characters (a
+    superset match; shorter runs cannot use trigrams, and SQLite's trigram
+    tokenizer mishandles short multi-byte runs), and every candidate is
+    re-checked here. A query without such a run scans the stored names
+    (file_name_fts_content, the table's own copy of its column). Until an
+    older index has been backfilled (name_search_ready), every file row is
+    scanned instead.
+    """
+    ready = name_search_ready()
+    folded = query.casefold()
+    glob = is_glob(query)
+    runs = [r for r in _literal_runs(folded, glob) if len(r) >= 3]
+
+    def matches(path: str) -> bool:
+        name = os.path.basename(path).casefold()
+        return fnmatch.fnmatchcase(name, folded) if glob else folded in name
+
+    if not ready:
+        # Older index whose names are still being backfilled: check every file row here
+        sql = "SELECT rowid, path, size_bytes, mtime_ns FROM file_index f WHERE is_dir = 0 AND rowid > ?"
+        params: list = [after]
+        order = "rowid"
+    else:
+        if runs:
+            # Trigram lookup on the literal runs
+            pattern = "*" + "*".join(_escape_glob(r) for r in runs) + "*"
+            table, key, name = "file_name_fts", "rowid", "name"
+        else:
+            # No usable trigram: plain GLOB over the stored (folded) names, still in C
+            pattern = _sqlite_glob(folded) if glob else "*" + _escape_glob(folded) + "*"
+            table, key, name = "file_name_fts_content", "id", "c0"
+        sql = (
+            f"SELECT f.rowid, f.path, f.size_bytes, f.mtime_ns FROM {table} s"
+            f" JOIN file_index f ON f.rowid = s.{key} WHERE s.{name} GLOB ? AND s.{key} > ?"
+        )
+        params = [pattern, after]
+        order = f"s.{key}"
+    if volume:
+        sql += " AND f.volume = ?"
+        params.append(volume)
+    sql += f" ORDER BY {order}"
+    conn = _get_connection()
+    db_ns = 0
+    found = 0
+    try:
+        _watch_cancel(conn, cancelled)
+        start = time.perf_counter_ns()
+        cur = conn.execute(sql, params)
+        while found < limit:
+            rows = cur.fetchmany(256)
+            db_ns += time.perf_counter_ns() - start
+            if not rows:
+                break
+            for row in rows:
+                if matches(row[1]):
+                    yield row
+                    found += 1
+                    if found == limit:
+                        break
+            start = time.perf_counter_ns()
+    except sqlite3.OperationalError:
+        if cancelled is not None and cancelled.is_set():
+            raise WorkCancelled() from None
+        raise
+    finally:
+        SQLITE_QUERY_SECONDS.labels("name_search").record_ns(db_ns)
+        conn.close()
+
@@ -0,0 +1,199 @@
+"""
+Junk policy engine: selects junk files by age (modification or last access),
+size and category from file_index. Rows under the junk roots are loaded once
+per index generation into columnar arrays (array module; NumPy used for the
+vectorized predicates when installed), so age reports and candidate selection
+do not go back to SQLite or walk the disk.
+"""
+import bisect
+import threading
+import time
+from array import array
+from dataclasses import dataclass, field
+
+from backend.services.index_service import get_index_generation, iter_rows_under
+from backend.services.junk_service import get_junk_roots
+
+# NumPy is optional (pure-Python fallback below) and costs ~70 ms to import,
+# so it is loaded on the first report rather than at server startup.
+_NUMPY_UNSET = object()
+np = _NUMPY_UNSET
+
+
+def _numpy():
+    """The numpy module, or None when it is not installed (imported on first call)."""
+    global np
+    if np is _NUMPY_UNSET:
+        try:
+            import numpy
+            np = numpy
+        except ImportError:
+            np = None
+    return np
+
+
+NS_PER_DAY = 86400 * 1_000_000_000
+DEFAULT_AGE_CUTOFFS_DAYS = (7, 30, 90)
+HISTOGRAM_EDGES_DAYS = (1, 7, 30, 90, 180, 365)
+
+
+@dataclass
+class JunkPolicy:
+    """Predicate for the junk rule type."""
+
+    min_age_days: float = 30.0
+    age_basis: str = "mtime"  # mtime | atime
+    min_size_bytes: int = 0
+    categories: list[str] = field(default_factory=list)  # empty = all
+
+
+@dataclass
+class JunkColumns:
+    """Columnar view of indexed files under the junk roots."""
+
+    paths: list[str]
+    sizes: array
+    mtimes: array
+    atimes: array
+    categories: array  # index into category_names
+    category_names: list[str]
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+
+_columns_lock = threading.Lock()
+_columns_cache: tuple[tuple, JunkColumns] | None = None
+
+
+def load_junk_columns(roots: list[tuple[str, str]] | None = None) -> JunkColumns:
+    """Load (or reuse, while the index generation is unchanged) columns for the junk roots."""
+    global _columns_cache
+    roots = get_junk_roots() if roots is None else roots
+    key = (get_index_generation(), tuple(roots))
+    with _columns_lock:
+        if _columns_cache is not None and _columns_cache[0] == key:
+            return _columns_cache[1]
+    names: list[str] = []
+    cols = JunkColumns([], array("q"), array("q"), array("q"), array("b"), names)
+    for root, category in roots:
+        if category not in names:
+            names.append(category)
+        code = names.index(category)
+        for path, size, mtime, atime in iter_rows_under(root):
+            cols.paths.append(path)
+            cols.sizes.append(size)
+            cols.mtimes.append(mtime)
+            cols.atimes.append(atime)
+            cols.categories.append(code)
+    with _columns_lock:
+        _columns_cache = (key, cols)
+    return cols
+
+
+def _ages_days(cols: JunkColumns, basis: str, now_ns: int):
+    times = cols.atimes if basis == "atime" else cols.mtimes
+    np = _numpy()
+    if np is not None:
+        return (now_ns - np.frombuffer(times, dtype=np.int64)) / NS_PER_DAY
+    return [(now_ns - t) / NS_PER_DAY for t in times]
+
+
+def _category_codes(cols: JunkColumns, categories: list[str]) -> set[int]:
+    return {i for i, name in enumerate(cols.category_names) if name in categories}
+
+
+def select_candidates(
+    policy: JunkPolicy,
+    cols: JunkColumns | None = None,
+    now: float | None = None,
+    limit: int | None = None,
+) -> list[dict]:
+    """Files matching policy, largest first: [{path, size_bytes, mtime_ns}]."""
+    cols = load_junk_columns() if cols is None else cols
+    now_ns = int((time.time() if now is None else now) * 1_000_000_000)
+    ages = _ages_days(cols, policy.age_basis, now_ns)
+    codes = _category_codes(cols, policy.categories) if policy.categories else None
+    np = _numpy()
+    if np is not None:
+        sizes = np.frombuffer(cols.sizes, dtype=np.int64)
+        mask = (ages >= policy.min_age_days) & (sizes >= policy.min_size_bytes)
+        if codes is not None:
+            mask &= np.isin(np.frombuffer(cols.categories, dtype=np.int8), list(codes))
+        idx = np.flatnonzero(mask)
+        idx = idx[np.argsort(-sizes[idx], kind="stable")].tolist()
+    else:
+        idx = [
+            i for i, age in enumerate(ages)
+            if age >= policy.min_age_days
+            and cols.sizes[i] >= policy.min_size_bytes
+            and (codes is None or cols.categories[i] in codes)
+        ]
+        idx.sort(key=lambda i: -cols.sizes[i])
+    if limit is not None:
+        idx = idx[:limit]
+    return [
+        {"path": cols.paths[i], "size_bytes": cols.sizes[i], "mtime_ns": cols.mtimes[i]}
+        for i in idx
+    ]
+
+
+def age_report(
+    cutoffs_days: list[float] | tuple[float, ...] = DEFAULT_AGE_CUTOFFS_DAYS,
+    age_basis: str = "mtime",
+    cols: JunkColumns | None = None,
+    now: float | None = None,
+) -> dict:
+    """
+    Bytes / files that a junk rule would free at each age cutoff, plus a
+    byte-weighted age histogram and age percentiles (days).
+    """
+    start = time.perf_counter()
+    cols = load_junk_columns() if cols is None else cols
+    now_ns = int((time.time() if now is None else now) * 1_000_000_000)
+    ages = _ages_days(cols, age_basis, now_ns)
+    cutoffs = sorted(float(c) for c in cutoffs_days)
+    edges = list(HISTOGRAM_EDGES_DAYS)
+    np = _numpy()
+    if np is not None:
+        sizes = np.frombuffer(cols.sizes, dtype=np.int64)
+        n = len(sizes)
+        total = int(sizes.sum())
+        at_cutoff = []
+        for c in cutoffs:
+            mask = ages >= c
+            at_cutoff.append((int(np.count_nonzero(mask)), int(sizes[mask].sum())))
+        hist, _ = np.histogram(ages, bins=[-np.inf, *edges, np.inf], weights=sizes)
+        hist_bytes = [int(b) for b in hist]
+        pcts = [float(x) for x in np.percentile(ages, [50, 90])] if n else [0.0, 0.0]
+    else:
+        pairs = sorted(zip(ages, cols.sizes))
+        sorted_ages = [a for a, _ in pairs]
+        cum = [0]
+        for _, size in pairs:
+            cum.append(cum[-1] + size)
+        n = len(pairs)
+        total = cum[-1]
+        at_cutoff = []
+        for c in cutoffs:
+            pos = bisect.bisect_left(sorted_ages, c)
+            at_cutoff.append((n - pos, total - cum[pos]))
+        hist_bytes = [0] * (len(edges) + 1)
+        for age, size in pairs:
+            hist_bytes[bisect.bisect_right(edges, age)] += size
+        pcts = [sorted_ages[min(n - 1, int(q * (n - 1) + 0.5))] for q in (0.5, 0.9)] if n else [0.0, 0.0]
+    return {
+        "age_basis": age_basis,
+        "total_files": n,
+        "total_bytes": total,
+        "cutoffs": [
+            {"days": c, "files": files, "bytes": freed}
+            for c, (files, freed) in zip(cutoffs, at_cutoff)
+        ],
+        "histogram": [
+            {"days_max": edge, "bytes": b}
+            for edge, b in zip([*edges, None], hist_bytes)
+        ],
+        "percentile_days": {"p50": round(pcts[0], 1), "p90": round(pcts[1], 1)},
+        "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+    }
@@ -0,0 +1,248 @@
+"""
+Junk analyzer: sizes the junk roots (LOCALAPPDATA caches, TEMP/TMP) to full
+depth, one worker per root with a per-root time budget, and breaks totals
+down by category. Per-directory results are cached by directory mtime, so a
+refresh of an unchanged tree costs one stat per directory. Listeners get
+every new report, so consumers (the tray tooltip) never walk on their own.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from typing import Callable
+
+from backend.core.constants import (
+    BATCH_DIRS_BEFORE_SLEEP,
+    JUNK_ROOT_TIME_BUDGET_SECONDS,
+    JUNK_SUBPATHS,
+    JUNK_WORKERS,
+)
+from backend.core.metrics import SCAN_DIRS_WALKED, SCAN_STAT_CALLS
+from backend.services.resource_guard import current_pause_token, pause_point, pause_scope, throttle_if_needed
+
+CATEGORY_TEMP = "temp"
+CATEGORY_INETCACHE = "inetcache"
+CATEGORY_BROWSER_CACHE = "browser_cache"
+
+# JUNK_SUBPATHS entry -> category
+_SUBPATH_CATEGORIES = {
+    "Temp": CATEGORY_TEMP,
+    "Microsoft\\Windows\\INetCache": CATEGORY_INETCACHE,
+    "Google\\Chrome\\User Data\\Default\\Cache": CATEGORY_BROWSER_CACHE,
+    "Microsoft\\Edge\\User Data\\Default\\Cache": CATEGORY_BROWSER_CACHE,
+}
+
+
+@dataclass
+class JunkRootResult:
+    """Size of one junk root."""
+
+    path: str
+    category: str
+    total_bytes: int = 0
+    file_count: int = 0
+    dirs_listed: int = 0
+    dirs_cached: int = 0
+    partial: bool = False  # time budget ran out
+
+
+@dataclass
+class JunkReport:
+    """Totals over all junk roots, with per-category breakdown."""
+
+    total_bytes: int = 0
+    by_category: dict[str, int] = field(default_factory=dict)
+    roots: list[JunkRootResult] = field(default_factory=list)
+    elapsed_seconds: float = 0.0
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def _root_key(path: str) -> str:
+    return os.path.normcase(os.path.realpath(path))
+
+
+def get_junk_roots() -> list[tuple[str, str]]:
+    """
+    Existing junk roots as (resolved path, category). Roots resolving to the
+    same directory (TEMP and TMP usually do) or nested inside another root
+    are dropped so nothing is counted twice.
+    """
+    candidates: list[tuple[str, str]] = []
+    local = os.environ.get("LOCALAPPDATA", "")
+    if local:
+        for sub in JUNK_SUBPATHS:
+            parts = sub.split("\\")
+            candidates.append((os.path.join(local, *parts), _SUBPATH_CATEGORIES.get(sub, CATEGORY_TEMP)))
+    for key in ["TEMP", "TMP"]:
+        val = os.environ.get(key, "")
+        if val:
+            candidates.append((val, CATEGORY_TEMP))
+    keyed = [(_root_key(p), p, c) for p, c in candidates if os.path.isdir(p)]
+    roots: list[tuple[str, str]] = []
+    kept: list[str] = []
+    # Shortest first so an outer root wins over anything nested in it
+    for key, path, category in sorted(keyed, key=lambda k: len(k[0])):
+        if any(key == k or key.startswith(k.rstrip(os.sep) + os.sep) for k in kept):
+            continue
+        kept.append(key)
+        roots.append((os.path.realpath(path), category))
+    return roots
+
+
+def _is_link(entry: os.DirEntry) -> bool:
+    """Symlink or junction (is_junction() is Python 3.12+; before that, the reparse attribute on Windows)."""
+    if entry.is_symlink():
+        return True
+    is_junction = getattr(entry, "is_junction", None)
+    if is_junction is not None:
+        return is_junction()
+    if os.name != "nt":
+        return False
+    try:
+        return bool(getattr(entry.stat(follow_symlinks=False), "st_file_attributes", 0) & 0x400)
+    except OSError:
+        return True
+
+
+def categorize_path(path: str) -> str:
+    """Category of the junk root containing path (temp when outside all roots)."""
+    key = _root_key(path)
+    for root, category in get_junk_roots():
+        root_key = _root_key(root)
+        if key == root_key or key.startswith(root_key.rstrip(os.sep) + os.sep):
+            return category
+    return CATEGORY_TEMP
+
+
+class JunkAnalyzer:
+    """Walks junk roots concurrently, reusing per-directory results while mtime is unchanged."""
+
+    def __init__(
+        self,
+        time_budget_seconds: float = JUNK_ROOT_TIME_BUDGET_SECONDS,
+        max_workers: int = JUNK_WORKERS,
+    ) -> None:
+        self.time_budget_seconds = time_budget_seconds
+        self.max_workers = max_workers
+        # root key -> {dir path: (mtime_ns, direct file bytes, direct file count, subdirs)}
+        self._cache: dict[str, dict[str, tuple[int, int, int, tuple[str, ...]]]] = {}
+        self._lock = threading.Lock()
+        self._last: JunkReport | None = None
+        self._listeners: list[Callable[[JunkReport], None]] = []
+
+    def add_listener(self, fn: Callable[[JunkReport], None]) -> None:
+        """Call fn(report) after every analyze()."""
+        self._listeners.append(fn)
+
+    def _walk_root(self, path: str, category: str) -> JunkRootResult:
+        key = _root_key(path)
+        with self._lock:
+            old = self._cache.get(key, {})
+        new: dict[str, tuple[int, int, int, tuple[str, ...]]] = {}
+        result = JunkRootResult(path=path, category=category)
+        deadline = time.monotonic() + self.time_budget_seconds
+        stack = [path]
+        visited = 0
+        stat_calls = 0
+        while stack:
+            if time.monotonic() > deadline:
+                result.partial = True
+                break
+            current = stack.pop()
+            visited += 1
+            if visited % BATCH_DIRS_BEFORE_SLEEP == 0:
+                SCAN_DIRS_WALKED.labels("junk").inc(BATCH_DIRS_BEFORE_SLEEP)
+                SCAN_STAT_CALLS.labels("junk").inc(stat_calls)
+                stat_calls = 0
+                throttle_if_needed()
+                pause_point()
+            stat_calls += 1
+            try:
+                mtime_ns = os.stat(current).st_mtime_ns
+            except OSError:
+                continue
+            cached = old.get(current)
+            if cached is not None and cached[0] == mtime_ns:
+                entry = cached
+                result.dirs_cached += 1
+            else:
+                size = count = 0
+                subdirs = []
+                try:
+                    with os.scandir(current) as it:
+                        for e in it:
+                            try:
+                                if _is_link(e):
+                                    continue  # never leave the root through a link (the index walker skips them too)
+                                if e.is_dir(follow_symlinks=False):
+                                    subdirs.append(e.path)
+                                else:
+                                    size += e.stat(follow_symlinks=False).st_size
+                                    count += 1
+                            except OSError:
+                                pass
+                except OSError:
+                    continue
+                entry = (mtime_ns, size, count, tuple(subdirs))
+                stat_calls += count
+                result.dirs_listed += 1
+            new[current] = entry
+            result.total_bytes += entry[1]
+            result.file_count += entry[2]
+            stack.extend(entry[3])
+        SCAN_DIRS_WALKED.labels("junk").inc(visited % BATCH_DIRS_BEFORE_SLEEP)
+        SCAN_STAT_CALLS.labels("junk").inc(stat_calls)
+        if result.partial:
+            # Keep what was not revisited so the next run can resume cheaply
+            for k, v in old.items():
+                new.setdefault(k, v)
+        with self._lock:
+            self._cache[key] = new
+        return result
+
+    def analyze(self) -> JunkReport:
+        """Size all junk roots (concurrently) and return the report."""
+        start = time.monotonic()
+        roots = get_junk_roots()
+        report = JunkReport()
+        if roots:
+            workers = max(1, min(self.max_workers, len(roots)))
+            token = current_pause_token()  # idle-scheduled runs pause their workers too
+
+            def walk(root: tuple[str, str]) -> JunkRootResult:
+                with pause_scope(token):
+                    return self._walk_root(*root)
+
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                report.roots = list(pool.map(walk, roots))
+        for r in report.roots:
+            report.total_bytes += r.total_bytes
+            report.by_category[r.category] = report.by_category.get(r.category, 0) + r.total_bytes
+        with self._lock:
+            live = {_root_key(p) for p, _ in roots}
+            for key in list(self._cache):
+                if key not in live:
+                    del self._cache[key]
+        report.elapsed_seconds = round(time.monotonic() - start, 3)
+        self._last = report
+        for fn in self._listeners:
+            try:
+                fn(report)
+            except Exception:
+                pass
+        return report
+
+    def last_report(self) -> JunkReport | None:
+        """Most recent report without walking again."""
+        return self._last
+
+
+_analyzer = JunkAnalyzer()
+
+
+def get_junk_analyzer() -> JunkAnalyzer:
+    """Shared analyzer (its cache is what makes periodic refreshes cheap)."""
+    return _analyzer
@@ -5,28 +5,41 @@ internal schedule; consults resource_guard before heavy work.
 import os
 import threading
 import time
+from itertools import islice
 from typing import Callable
 
 from backend.core.config import load_config
+from backend.core.profiler import profile_job
 from backend.core.constants import (
+    ALERT_REARM_MARGIN_PERCENT,
     DISK_CHECK_INTERVAL_MINUTES,
-    JUNK_SUBPATHS,
+    FORECAST_ALERT_HORIZON_HOURS,
     LARGE_FILE_JUNK_SCAN_INTERVAL_HOURS,
+    STARTUP_HEAVY_WORK_DELAY_SECONDS,
 )
-from backend.services.notification_service import notify_alert
-from backend.services.resource_guard import is_under_load, throttle_if_needed
-from backend.services.index_service import (
-    full_scan_directory,
-    index_full_scan_volume,
-    query_large_files,
+from backend.services.cleanup_service import (
+    CleanupReport,
+    execute_cleanup,
+    get_cleanup_backend,
 )
-from backend.utils.disk import get_all_disk_usage, get_disk_usage, get_directory_size
+from backend.services.disk_sampler import get_disk_sampler
+from backend.services.forecast_service import format_eta, get_disk_forecaster
+from backend.services.idle_scheduler import get_idle_scheduler
+from backend.services.junk_policy import JunkPolicy, load_junk_columns, select_candidates
+from backend.services.junk_service import categorize_path, get_junk_analyzer, get_junk_roots
+from backend.services.notification_service import get_alert_pipeline, notify_alert
+from backend.services.quarantine_service import get_quarantine_store
+from backend.services.resource_guard import is_under_load, throttle_if_needed
+from backend.services.index_service import backfill_name_search, name_search_ready, pruned_scan_directory
 
 
 def check_disk_thresholds() -> None:
     """
     Check all drives against user-configured thresholds; notify if free
-    percent is below threshold. Lightweight (only disk_usage).
+    percent is below threshold. Lightweight (reads the latest usage sample).
+    Each drive alerts once per crossing: the alert re-arms only after free
+    space recovers ALERT_REARM_MARGIN_PERCENT above the threshold (forecast
+    alerts once the ETA moves back out past twice the horizon).
     """
     if is_under_load():
         return
@@ -34,75 +47,108 @@ def check_disk_thresholds() -> None:
     thresholds = getattr(cfg, "disk_thresholds", []) or []
     if not thresholds:
         return
-    usages = get_all_disk_usage()
+    usages = get_disk_sampler().latest_all()
+    forecaster = get_disk_forecaster()
+    pipeline = get_alert_pipeline()
+    horizon = FORECAST_ALERT_HORIZON_HOURS * 3600
     for u in usages:
         for t in thresholds:
             drive_letter = (getattr(t, "drive_letter", None) or "").strip().upper()
             if drive_letter and not u.drive.upper().startswith(drive_letter.rstrip(":")):
                 continue
             alert_below = getattr(t, "free_percent_alert_below", 10)
+            key = f"disk:{u.drive}:{alert_below}"
             if u.free_percent < alert_below:
                 notify_alert(
                     "磁盘空间不足",
                     f"{u.drive} 剩余 {u.free_percent:.1f}%，低于 {alert_below}%。请及时清理。",
+                    key=key,
+                )
+                continue
+            if u.free_percent >= alert_below + ALERT_REARM_MARGIN_PERCENT:
+                pipeline.rearm(key)
+            eta = forecaster.seconds_until(u.drive, alert_below)
+            if eta is not None and eta <= horizon:
+                notify_alert(
+                    "磁盘空间预警",
+                    f"{u.drive} 按当前趋势将在{format_eta(eta)}后低于 {alert_below}%（现剩余 {u.free_percent:.1f}%）。",
+                    key="forecast:" + key,
                 )
-                return  # One notification per run to avoid spam
+            elif eta is None or eta > 2 * horizon:
+                pipeline.rearm("forecast:" + key)
 
 
 def get_junk_dirs() -> list[str]:
-    """Return list of junk directory paths (existing only)."""
-    dirs = []
-    local = os.environ.get("LOCALAPPDATA", "")
-    if local:
-        for sub in JUNK_SUBPATHS:
-            p = os.path.join(local, sub)
-            if os.path.isdir(p):
-                dirs.append(p)
-    for key in ["TEMP", "TMP"]:
-        val = os.environ.get(key, "")
-        if val and os.path.isdir(val):
-            dirs.append(val)
-    return dirs
+    """Return list of junk directory paths (existing only, deduplicated)."""
+    return [path for path, _category in get_junk_roots()]
 
 
 def run_junk_scan() -> tuple[int, int]:
     """
-    Sum approximate size of junk dirs (lightweight). Returns (total_bytes, dir_count).
+    Size junk dirs to full depth (cached by directory mtime, so repeated runs
+    on an unchanged tree are cheap). Returns (total_bytes, dir_count).
     """
     if is_under_load():
         return 0, 0
-    junk = get_junk_dirs()
-    total = 0
-    for path in junk:
-        throttle_if_needed()
-        total += get_directory_size(path)
-    return total, len(junk)
+    report = get_junk_analyzer().analyze()
+    return report.total_bytes, len(report.roots)
 
 
-def run_rule_scan(rule: dict) -> list[dict]:
+def run_junk_rule_scan(rule: dict, limit: int | None = None) -> list[dict]:
+    """
+    junk rule: select files under the junk roots (or only under target_path,
+    if set) by age, size and category from the index, largest first.
+    """
+    policy = JunkPolicy(
+        min_age_days=float(rule.get("min_age_days", 30)),
+        age_basis=rule.get("age_basis", "mtime"),
+        min_size_bytes=int(float(rule.get("junk_min_size_kb", 0)) * 1024),
+        categories=rule.get("categories") or [],
+    )
+    path = (rule.get("target_path") or "").strip()
+    roots = [(path, categorize_path(path))] if path else get_junk_roots()
+    return select_candidates(policy, load_junk_columns(roots), limit=limit)
+
+
+def run_rule_scan(rule: dict, limit: int | None = None) -> list[dict]:
     """
     Run one cleanup rule: scan target_path and return list of matching files
-    {path, size_bytes}. Uses full_scan_directory with batching; respects resource_guard.
+    {path, size_bytes, mtime_ns}. Uses pruned_scan_directory (dir rollups from the index
+    let unchanged subtrees be skipped) with batching; respects resource_guard.
+    limit caps the list for previews; cleanup and notifications need every match.
     """
     path = (rule.get("target_path") or "").strip()
+    rule_type = rule.get("rule_type", "large_file")
+    if rule_type == "junk":
+        return run_junk_rule_scan(rule, limit)
     if not path or not os.path.isdir(path):
         return []
-    rule_type = rule.get("rule_type", "large_file")
     min_mb = float(rule.get("size_mb_min", 500))
     min_bytes = int(min_mb * 1024 * 1024)
     extensions = rule.get("extensions") or []
     if rule_type == "large_file":
-        items = list(
-            full_scan_directory(path, min_size_bytes=min_bytes, extensions=None, yield_batch=True)
-        )
+        items = pruned_scan_directory(path, min_size_bytes=min_bytes, extensions=None, yield_batch=True)
     elif rule_type == "by_extension":
-        items = list(
-            full_scan_directory(path, min_size_bytes=0, extensions=extensions, yield_batch=True)
-        )
+        items = pruned_scan_directory(path, min_size_bytes=0, extensions=extensions, yield_batch=True)
     else:
-        # junk: treat as size-only hint per dir
-        items = []
-    return [{"path": p, "size_bytes": s} for (p, s, _, _) in items[:100]]
+        return []
+    return [{"path": p, "size_bytes": s, "mtime_ns": m} for (p, s, m, _) in islice(items, limit)]
+
+
+def find_rule(rule_id: str) -> dict | None:
+    """Return the configured rule with this id (as a dict), or None."""
+    cfg = load_config()
+    for rule in getattr(cfg, "cleanup_rules", []) or []:
+        if rule.id == rule_id:
+            return rule.model_dump()
+    return None
+
+
+def run_rule_cleanup(rule: dict, dry_run: bool = False) -> CleanupReport:
+    """Scan one rule and remove its matches with the rule's clean_action backend."""
+    matches = run_rule_scan(rule)
+    backend = get_cleanup_backend(rule.get("clean_action", "recycle"))
+    return execute_cleanup(matches, backend, dry_run=dry_run)
 
 
 def run_scheduled_rules() -> None:
@@ -110,36 +156,61 @@ def run_scheduled_rules() -> None:
     if is_under_load():
         return
     cfg = load_config()
-    rules = getattr(cfg, "cleanup_rules", []) or []
+    rules = [r.model_dump() for r in (getattr(cfg, "cleanup_rules", []) or [])]
     for rule in rules:
         if not rule.get("enabled", True):
             continue
         throttle_if_needed()
+        path = rule.get("target_path", "")
+        if rule.get("auto_clean"):
+            report = run_rule_cleanup(rule)
+            if report.files_acted:
+                notify_alert(
+                    "清理规则已自动清理",
+                    f"{path} 下已清理 {report.files_acted} 个文件，释放 {report.bytes_freed / (1024 * 1024):.1f} MB"
+                    f"（{report.backend}，跳过已变化文件 {report.skipped_changed} 个）。",
+                )
+            continue
+        key = f"rule:{rule.get('id') or path}"
         matches = run_rule_scan(rule)
         if not matches:
+            get_alert_pipeline().rearm(key)
             continue
         total_mb = sum(m["size_bytes"] for m in matches) / (1024 * 1024)
-        path = rule.get("target_path", "")
-        if rule.get("auto_clean"):
-            # Optional: move to recycle or delete (plan: suggest recycle)
-            notify_alert(
-                "清理规则可自动清理",
-                f"{path} 下发现 {len(matches)} 个匹配文件，共 {total_mb:.1f} MB。已设为自动清理时可执行清理。",
-            )
-        else:
-            notify_alert(
-                "清理提醒",
-                f"{path} 下发现 {len(matches)} 个匹配文件，共 {total_mb:.1f} MB。建议清理。",
-            )
+        notify_alert(
+            "清理提醒",
+            f"{path} 下发现 {len(matches)} 个匹配文件，共 {total_mb:.1f} MB。建议清理。",
+            key=key,
+        )
 
 
 def start_background_scheduler(on_disk_check: Callable[[], None] | None = None) -> None:
     """
-    Start a background thread that runs disk check and (less often) rule/junk
-    scans at fixed intervals. Internal intervals only; resource_guard applied.
+    Start a background thread that runs the (cheap) disk check at a fixed
+    interval and delivers batched alerts. The heavy rules/junk pass is queued
+    on the idle scheduler: it becomes due every LARGE_FILE_JUNK_SCAN_INTERVAL_HOURS
+    (first STARTUP_HEAVY_WORK_DELAY_SECONDS after launch) and runs only while
+    the machine is idle, pausing when the user is active. An index from before
+    name search gets its one-off backfill queued the same way.
     """
     last_disk = [0.0]
-    last_rules = [0.0]
+
+    def heavy_pass() -> None:
+        with profile_job("rules_junk"):
+            run_scheduled_rules()
+            run_junk_scan()
+            get_quarantine_store().enforce_retention()
+
+    idle = get_idle_scheduler()
+    idle.every(
+        "rules_junk",
+        heavy_pass,
+        interval_seconds=LARGE_FILE_JUNK_SCAN_INTERVAL_HOURS * 3600,
+        first_delay_seconds=STARTUP_HEAVY_WORK_DELAY_SECONDS,
+    )
+    if not name_search_ready():
+        idle.submit("name_search_backfill", backfill_name_search)
+    idle.start()
 
     def loop() -> None:
         while True:
@@ -151,11 +222,11 @@ def start_background_scheduler(on_disk_check: Callable[[], None] | None = None)
                     check_disk_thresholds()
                     if on_disk_check:
                         on_disk_check()
-                # Rules + junk every LARGE_FILE_JUNK_SCAN_INTERVAL_HOURS
-                if (now - last_rules[0]) >= LARGE_FILE_JUNK_SCAN_INTERVAL_HOURS * 3600:
-                    last_rules[0] = now
-                    run_scheduled_rules()
-                    run_junk_scan()
+            except Exception:
+                pass
+            try:
+                # Deliver alerts batched during this and earlier ticks
+                get_alert_pipeline().flush()
             except Exception:
                 pass
             time.sleep(60)
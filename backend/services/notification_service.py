@@ -1,57 +1,409 @@
 """
 Notifications: Windows toast and email. Used by monitor when thresholds
 or cleanup rules trigger alerts.
+
+Alerts go through an AlertPipeline: keyed alerts latch until the caller
+re-arms the key (hysteresis lives in the caller, which knows the recovery
+level), alerts arriving within a short window are merged into one digest,
+and digests are rate limited per hour. Channels only deliver.
+
+Delivery runs on a NotificationDispatcher worker thread with a bounded queue,
+so a slow or unreachable SMTP server never blocks the scheduler. The worker
+keeps one notifier and one SMTP session (closed after an idle timeout) and
+retries failed channels with exponential backoff.
 """
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable
+
 from backend.core.config import load_config
+from backend.core.constants import (
+    ALERT_BATCH_WINDOW_SECONDS,
+    ALERT_MAX_PER_HOUR,
+    NOTIFY_MAX_RETRIES,
+    NOTIFY_QUEUE_SIZE,
+    NOTIFY_RETRY_BACKOFF_SECONDS,
+    SMTP_IDLE_TIMEOUT_SECONDS,
+    SMTP_TIMEOUT_SECONDS,
+)
+from backend.core.logging_config import get_logger
+from backend.core.metrics import NOTIFY_DELIVERY_SECONDS, QUEUE_DEPTH
 
 
-def send_windows_toast(title: str, message: str) -> None:
-    """Show Windows notification (toast). No-op if disabled or import fails."""
+def _default_notifier() -> object:
+    """desktop_notifier instance with a synchronous send(title=, message=)."""
     try:
+        from desktop_notifier.sync import DesktopNotifierSync
+        return DesktopNotifierSync(app_name="Windows Cleaner")
+    except ImportError:
+        from desktop_notifier import DesktopNotifier
+        import asyncio
+
+        class _LoopNotifier:
+            """Older desktop_notifier (async only): one event loop for all sends."""
+
+            def __init__(self) -> None:
+                self._notifier = DesktopNotifier(app_name="Windows Cleaner")
+                self._loop = asyncio.new_event_loop()
+
+            def send(self, title: str, message: str) -> None:
+                self._loop.run_until_complete(self._notifier.send(title=title, message=message))
+
+        return _LoopNotifier()
+
+
+class ToastChannel:
+    """Windows notification (toast). No-op if disabled; the notifier is created once and reused."""
+
+    name = "toast"
+
+    def __init__(self, notifier_factory: Callable[[], object] | None = None) -> None:
+        self._notifier_factory = notifier_factory or _default_notifier
+        self._notifier: object | None = None
+
+    def send(self, title: str, message: str) -> None:
         cfg = load_config()
         if not getattr(cfg.notification, "use_windows_toast", True):
             return
-        try:
-            from desktop_notifier.sync import DesktopNotifierSync
-            notifier = DesktopNotifierSync(app_name="Windows Cleaner")
-            notifier.send(title=title, message=message)
-        except ImportError:
-            from desktop_notifier import DesktopNotifier
-            import asyncio
-            notifier = DesktopNotifier(app_name="Windows Cleaner")
-            asyncio.run(notifier.send(title=title, message=message))
-    except Exception:
+        if self._notifier is None:
+            self._notifier = self._notifier_factory()
+        self._notifier.send(title=title, message=message)
+
+    def close_idle(self, now: float) -> None:
         pass
 
 
-def send_email(subject: str, body: str) -> None:
-    """Send email to configured address. No-op if disabled or config missing."""
-    try:
-        cfg = load_config()
-        n = cfg.notification
+class EmailChannel:
+    """
+    Email to the configured address. No-op if disabled or config missing.
+    The SMTP session is kept open between sends and closed by close_idle()
+    after SMTP_IDLE_TIMEOUT_SECONDS, or when the SMTP settings change.
+    """
+
+    name = "email"
+
+    def __init__(
+        self,
+        idle_timeout: float = SMTP_IDLE_TIMEOUT_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.idle_timeout = idle_timeout
+        self._clock = clock
+        self._smtp = None
+        self._smtp_key: tuple | None = None
+        self._last_used = 0.0
+
+    def _session(self, n):
+        import smtplib
+        key = (
+            n.smtp_host, n.smtp_port, n.smtp_use_tls, n.smtp_user, n.smtp_password,
+            getattr(n, "smtp_allow_plain_login", False),
+        )
+        if self._smtp is not None and self._smtp_key != key:
+            self.close()
+        if self._smtp is None:
+            port = getattr(n, "smtp_port", 465)
+            if n.smtp_use_tls:
+                s = smtplib.SMTP_SSL(n.smtp_host, port, timeout=SMTP_TIMEOUT_SECONDS)
+            else:
+                s = smtplib.SMTP(n.smtp_host, port, timeout=SMTP_TIMEOUT_SECONDS)
+                s.ehlo()
+                # Plain-port servers without STARTTLS (e.g. a local relay) are used as-is,
+                # but never with a password unless cleartext login is explicitly allowed
+                if s.has_extn("starttls"):
+                    s.starttls()
+                    s.ehlo()
+                elif n.smtp_user and not getattr(n, "smtp_allow_plain_login", False):
+                    s.close()
+                    raise smtplib.SMTPNotSupportedError(
+                        "SMTP 服务器不支持 STARTTLS，拒绝以明文发送密码（如确需如此，请开启 smtp_allow_plain_login）"
+                    )
+            if n.smtp_user:
+                s.login(n.smtp_user, n.smtp_password)
+            self._smtp, self._smtp_key = s, key
+        return self._smtp
+
+    def send(self, title: str, message: str) -> None:
+        n = load_config().notification
         if not getattr(n, "email_enabled", False) or not getattr(n, "notify_email_to", ""):
             return
-        to_addr = n.notify_email_to
-        import smtplib
         from email.mime.text import MIMEText
         from email.mime.multipart import MIMEMultipart
         msg = MIMEMultipart()
-        msg["Subject"] = subject
+        msg["Subject"] = title
         msg["From"] = getattr(n, "smtp_user", "") or "windows-cleaner@local"
-        msg["To"] = to_addr
-        msg.attach(MIMEText(body, "plain", "utf-8"))
-        port = getattr(n, "smtp_port", 465)
-        use_tls = getattr(n, "smtp_use_tls", True)
-        with smtplib.SMTP_SSL(n.smtp_host, port) if use_tls else smtplib.SMTP(n.smtp_host, port) as s:
-            if not use_tls:
-                s.starttls()
-            s.login(n.smtp_user, n.smtp_password)
-            s.send_message(msg)
+        msg["To"] = n.notify_email_to
+        msg.attach(MIMEText(message, "plain", "utf-8"))
+        try:
+            self._session(n).send_message(msg)
+        except Exception:
+            self.close()  # server may have dropped a kept-open session; next attempt reconnects
+            raise
+        self._last_used = self._clock()
+
+    def close_idle(self, now: float) -> None:
+        if self._smtp is not None and now - self._last_used >= self.idle_timeout:
+            self.close()
+
+    def close(self) -> None:
+        s, self._smtp, self._smtp_key = self._smtp, None, None
+        if s is not None:
+            try:
+                s.quit()
+            except Exception:
+                try:
+                    s.close()
+                except Exception:
+                    pass
+
+
+class NotificationDispatcher:
+    """
+    Delivers (title, message) to the channels on one worker thread. send()
+    only enqueues, so it can be used as a channel by the AlertPipeline. When
+    the queue is full the new message is merged into the newest queued one
+    instead of blocking. A failing channel is retried with backoff without
+    re-sending to channels that already succeeded.
+    """
+
+    name = "dispatcher"
+
+    def __init__(
+        self,
+        channels: list | None = None,
+        maxsize: int = NOTIFY_QUEUE_SIZE,
+        max_retries: int = NOTIFY_MAX_RETRIES,
+        backoff_seconds: float = NOTIFY_RETRY_BACKOFF_SECONDS,
+        idle_check_seconds: float = 5.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.channels = channels if channels is not None else [ToastChannel(), EmailChannel()]
+        self.maxsize = maxsize
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.idle_check_seconds = idle_check_seconds
+        self._clock = clock
+        self._queue: deque[list] = deque()  # [title, message, perf_counter at enqueue]
+        self._cond = threading.Condition()
+        self._busy = False
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self.merged = 0  # messages folded into another because the queue was full
+
+    def send(self, title: str, message: str) -> None:
+        """Queue a message for delivery; never blocks on the network."""
+        with self._cond:
+            if len(self._queue) >= self.maxsize:
+                tail = self._queue[-1]
+                tail[1] = f"{tail[1]}\n【{title}】{message}"
+                self.merged += 1
+            else:
+                self._queue.append([title, message, time.perf_counter()])
+            self._cond.notify()
+        self.start()
+
+    def start(self) -> None:
+        """Start the worker thread (idempotent; send() starts it on demand)."""
+        with self._cond:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, daemon=True, name="notify-dispatch")
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        with self._cond:
+            self._cond.notify_all()
+
+    def join(self, timeout: float = 5.0) -> bool:
+        """Wait until the queue is drained (for tests and shutdown). True if drained."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._queue or self._busy:
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    return False
+                self._cond.wait(left)
+        return True
+
+    def _deliver(self, channel, title: str, message: str) -> bool:
+        for attempt in range(self.max_retries + 1):
+            try:
+                channel.send(title, message)
+                return True
+            except Exception as e:
+                if attempt == self.max_retries or self._stop.is_set():
+                    get_logger().warning("通知发送失败 (%s): %s", getattr(channel, "name", channel), e)
+                    return False
+                self._stop.wait(self.backoff_seconds * (2 ** attempt))
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            with self._cond:
+                if not self._queue:
+                    self._cond.wait(self.idle_check_seconds)
+                if not self._queue:
+                    item = None
+                else:
+                    item = self._queue.popleft()
+                    self._busy = True
+            if item is None:
+                now = self._clock()
+                for channel in self.channels:
+                    try:
+                        channel.close_idle(now)
+                    except Exception:
+                        pass
+                continue
+            try:
+                for channel in self.channels:
+                    if self._deliver(channel, item[0], item[1]):
+                        # Queue wait plus retries, from the (first merged) send() to this channel
+                        NOTIFY_DELIVERY_SECONDS.labels(getattr(channel, "name", "channel")).observe(
+                            time.perf_counter() - item[2]
+                        )
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
+
+
+@dataclass
+class Alert:
+    """One pending alert."""
+
+    title: str
+    message: str
+    key: str | None = None
+
+
+class AlertPipeline:
+    """
+    De-duplicates, batches and rate limits alerts before handing them to the
+    channels. flush() is called from the scheduler tick (and by submit when
+    batching is disabled); a digest goes out once the oldest pending alert
+    has waited batch_window seconds and the hourly budget allows it.
+    """
+
+    def __init__(
+        self,
+        channels: list | None = None,
+        batch_window: float = ALERT_BATCH_WINDOW_SECONDS,
+        max_per_hour: int = ALERT_MAX_PER_HOUR,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.channels = channels if channels is not None else [get_notification_dispatcher()]
+        self.batch_window = batch_window
+        self.max_per_hour = max_per_hour
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._latched: set[str] = set()
+        self._pending: list[Alert] = []
+        self._pending_since = 0.0
+        self._sent_at: deque[float] = deque()
+
+    def submit(self, title: str, message: str, key: str | None = None) -> bool:
+        """
+        Queue an alert. A keyed alert is dropped while its key is latched
+        (already alerted and not re-armed). Returns True if queued.
+        """
+        with self._lock:
+            if key is not None:
+                if key in self._latched:
+                    return False
+                self._latched.add(key)
+            if not self._pending:
+                self._pending_since = self._clock()
+            self._pending.append(Alert(title, message, key))
+        if self.batch_window <= 0:
+            self.flush()
+        return True
+
+    def rearm(self, key: str) -> None:
+        """Allow key to alert again (call once the condition has recovered past its margin)."""
+        with self._lock:
+            self._latched.discard(key)
+
+    def is_latched(self, key: str) -> bool:
+        with self._lock:
+            return key in self._latched
+
+    def flush(self, force: bool = False) -> int:
+        """
+        Deliver pending alerts as one digest if the batch window has elapsed
+        (or force) and the rate limit allows. Returns the number of alerts sent.
+        """
+        now = self._clock()
+        with self._lock:
+            if not self._pending:
+                return 0
+            if not force and now - self._pending_since < self.batch_window:
+                return 0
+            while self._sent_at and now - self._sent_at[0] >= 3600:
+                self._sent_at.popleft()
+            if len(self._sent_at) >= self.max_per_hour:
+                return 0  # keep pending; they merge into the next allowed digest
+            batch = self._pending
+            self._pending = []
+            self._sent_at.append(now)
+        title, message = digest(batch)
+        for channel in self.channels:
+            try:
+                channel.send(title, message)
+            except Exception:
+                pass
+        return len(batch)
+
+
+def digest(alerts: list[Alert]) -> tuple[str, str]:
+    """One (title, message) for a batch: unchanged for a single alert, one line each otherwise."""
+    if len(alerts) == 1:
+        return alerts[0].title, alerts[0].message
+    lines = [f"【{a.title}】{a.message}" for a in alerts]
+    return f"Windows Cleaner：{len(alerts)} 条提醒", "\n".join(lines)
+
+
+_dispatcher: NotificationDispatcher | None = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_notification_dispatcher() -> NotificationDispatcher:
+    """Process-wide dispatcher (owns the reused notifier and SMTP session)."""
+    global _dispatcher
+    with _dispatcher_lock:
+        if _dispatcher is None:
+            _dispatcher = NotificationDispatcher()
+            QUEUE_DEPTH.set_function(lambda: len(_dispatcher._queue), "notifications")
+        return _dispatcher
+
+
+_pipeline = AlertPipeline()
+
+
+def get_alert_pipeline() -> AlertPipeline:
+    """Process-wide pipeline (latched keys and the rate limit are shared)."""
+    return _pipeline
+
+
+def send_windows_toast(title: str, message: str) -> None:
+    """Show Windows notification (toast) immediately. No-op if disabled or import fails."""
+    try:
+        ToastChannel().send(title, message)
+    except Exception:
+        pass
+
+
+def send_email(subject: str, body: str) -> None:
+    """Send email to configured address immediately. No-op if disabled or config missing."""
+    try:
+        EmailChannel().send(subject, body)
     except Exception:
         pass
 
 
-def notify_alert(title: str, message: str) -> None:
-    """Send both Windows toast and email (if configured)."""
-    send_windows_toast(title, message)
-    send_email(title, message)
+def notify_alert(title: str, message: str, key: str | None = None) -> bool:
+    """Queue an alert for toast and email (batched; keyed alerts de-duplicated until re-armed)."""
+    return get_alert_pipeline().submit(title, message, key=key)
@@ -0,0 +1,394 @@
+"""
+Quarantine store: safety net for auto-clean. Files are moved into
+<store root>/<run_id>/<seq>, where the store root is <root> for files on its
+volume and <mount>/QUARANTINE_VOLUME_DIR_NAME for files on other volumes, so
+quarantining is a rename (copy + delete only when a volume has no writable
+store root). Every entry is recorded in one SQLite manifest under <root>: an 'add' row per quarantined file, 'restore' /
+'purge' rows referencing it later. seq is assigned by the database, and the
+row is committed as 'pending' before the file is moved; flush() turns moved
+files' rows into 'add'. recover() settles rows left 'pending' by a crash, so
+a moved file is never without its manifest row. Supports bulk restore by run
+ID and retention by age and total size.
+"""
+import errno
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass
+
+from backend.core.constants import (
+    QUARANTINE_DIR,
+    QUARANTINE_MAX_AGE_DAYS,
+    QUARANTINE_MAX_BYTES,
+    QUARANTINE_VOLUME_DIR_NAME,
+)
+from backend.services.cleanup_service import CleanupBackend
+
+MANIFEST_NAME = "manifest.db"
+_ERROR_NOT_SAME_DEVICE = 17  # winerror for cross-volume rename
+
+
+@dataclass
+class RestoreReport:
+    """Result of restoring one run."""
+
+    run_id: str
+    restored: int = 0
+    skipped_exists: int = 0
+    errors: int = 0
+    elapsed_seconds: float = 0.0
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+def _move(src: str, dest: str) -> None:
+    """Rename when possible; copy + delete when src and dest are on different volumes."""
+    try:
+        os.replace(src, dest)
+    except OSError as e:
+        if e.errno != errno.EXDEV and getattr(e, "winerror", None) != _ERROR_NOT_SAME_DEVICE:
+            raise
+        shutil.copy2(src, dest)
+        os.remove(src)
+
+
+class QuarantineStore(CleanupBackend):
+    """Quarantine directory plus manifest; also usable as a cleanup backend."""
+
+    name = "quarantine"
+
+    def __init__(self, root: str = QUARANTINE_DIR) -> None:
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self._lock = threading.Lock()
+        self._moved: list[int] = []  # seqs of 'pending' rows whose file is now in the store
+        self._failed: list[int] = []  # seqs of 'pending' rows whose move failed
+        self._run_dirs: set[str] = set()
+        self._root_device = self._device(root)
+        self._volume_roots: dict[int, str | None] = {}  # device -> store root on it (None: use root)
+        self._dir_roots: dict[str, str | None] = {}  # source directory -> store root for its files
+        self._schema_ready = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(os.path.join(self.root, MANIFEST_NAME))
+        if self._schema_ready:
+            return conn
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS manifest (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                op TEXT NOT NULL,
+                ref INTEGER,
+                run_id TEXT NOT NULL,
+                original_path TEXT,
+                size_bytes INTEGER,
+                mtime_ns INTEGER,
+                at REAL NOT NULL,
+                store_root TEXT
+            )
+            """
+        )
+        if "store_root" not in {r[1] for r in conn.execute("PRAGMA table_info(manifest)")}:
+            conn.execute("ALTER TABLE manifest ADD COLUMN store_root TEXT")  # manifests from before per-volume roots
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_manifest_run ON manifest(run_id, op)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_manifest_ref ON manifest(ref)")
+        conn.commit()
+        self._schema_ready = True
+        return conn
+
+    def _stored_path(self, run_id: str, seq: int, store_root: str | None = None) -> str:
+        return os.path.join(store_root or self.root, run_id, format(seq, "x"))
+
+    # --- Per-volume store roots ---
+
+    def _device(self, path: str) -> int:
+        return os.lstat(path).st_dev
+
+    def _mount_point(self, path: str, device: int) -> str:
+        """Topmost directory above path that is still on device."""
+        current = os.path.dirname(os.path.abspath(path))
+        while True:
+            parent = os.path.dirname(current)
+            if parent == current or self._device(parent) != device:
+                return current
+            current = parent
+
+    def _volume_root(self, device: int, mount: str) -> str | None:
+        """mount/QUARANTINE_VOLUME_DIR_NAME if it can be used, else None (files go to root, copied)."""
+        candidate = os.path.join(mount, QUARANTINE_VOLUME_DIR_NAME)
+        try:
+            os.makedirs(candidate, exist_ok=True)
+            if os.path.isdir(candidate) and not os.path.islink(candidate) and self._device(candidate) == device:
+                return candidate
+        except OSError:
+            pass
+        return None
+
+    def _store_root_for(self, path: str) -> str | None:
+        """Store root on path's volume; None for root itself. Cached per source directory."""
+        parent = os.path.dirname(os.path.abspath(path))
+        if parent not in self._dir_roots:
+            try:
+                device = self._device(parent)
+            except OSError:
+                return None
+            if len(self._dir_roots) >= 4096:
+                self._dir_roots.clear()
+            if device == self._root_device:
+                self._dir_roots[parent] = None
+            else:
+                if device not in self._volume_roots:
+                    self._volume_roots[device] = self._volume_root(device, self._mount_point(path, device))
+                self._dir_roots[parent] = self._volume_roots[device]
+        return self._dir_roots[parent]
+
+    def _append(self, rows: list[tuple]) -> None:
+        """Insert (op, ref, run_id, original_path, size_bytes, mtime_ns, at) rows; seq comes from the database."""
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT INTO manifest (op, ref, run_id, original_path, size_bytes, mtime_ns, at)"
+                    " VALUES (?,?,?,?,?,?,?)",
+                    rows,
+                )
+        finally:
+            conn.close()
+
+    def _reserve(self, run_id: str, entries: list[tuple[str, os.stat_result, str | None]]) -> list[int]:
+        """Commit a 'pending' row per (path, stat, store root) before anything is moved; returns their seqs."""
+        now = time.time()
+        conn = self._connect()
+        try:
+            with conn:
+                return [
+                    conn.execute(
+                        "INSERT INTO manifest (op, run_id, original_path, size_bytes, mtime_ns, at, store_root)"
+                        " VALUES ('pending',?,?,?,?,?,?)",
+                        (run_id, path, st.st_size, st.st_mtime_ns, now, store_root),
+                    ).lastrowid
+                    for path, st, store_root in entries
+                ]
+        finally:
+            conn.close()
+
+    def _move_in(self, path: str, run_id: str, seq: int, store_root: str | None) -> None:
+        """Move one reserved file into the store; raise OSError on failure."""
+        run_dir = os.path.join(store_root or self.root, run_id)
+        if run_dir not in self._run_dirs:
+            os.makedirs(run_dir, exist_ok=True)
+            self._run_dirs.add(run_dir)
+        stored = self._stored_path(run_id, seq, store_root)
+        try:
+            _move(path, stored)
+        except OSError:
+            if os.path.lexists(path):
+                try:  # partial cross-volume copy
+                    os.remove(stored)
+                except OSError:
+                    pass
+            with self._lock:
+                self._failed.append(seq)
+            raise
+        with self._lock:
+            self._moved.append(seq)
+
+    # --- CleanupBackend ---
+
+    def dispose(self, path: str, run_id: str) -> None:
+        """Move one file into the store; its row is 'pending' until flush()."""
+        st = os.stat(path, follow_symlinks=False)
+        store_root = self._store_root_for(path)
+        (seq,) = self._reserve(run_id, [(path, st, store_root)])
+        self._move_in(path, run_id, seq, store_root)
+
+    def dispose_batch(self, paths: list[str], run_id: str) -> list[str]:
+        """Reserve rows for the whole batch in one transaction, then move the files."""
+        entries = []
+        for path in paths:
+            try:
+                entries.append((path, os.stat(path, follow_symlinks=False), self._store_root_for(path)))
+            except OSError:
+                pass
+        done = []
+        for (path, _st, store_root), seq in zip(entries, self._reserve(run_id, entries) if entries else []):
+            try:
+                self._move_in(path, run_id, seq, store_root)
+                done.append(path)
+            except OSError:
+                pass
+        return done
+
+    def flush(self) -> None:
+        """Mark moved files' rows 'add' and drop rows of failed moves, in one transaction."""
+        with self._lock:
+            moved, self._moved = self._moved, []
+            failed, self._failed = self._failed, []
+        if not moved and not failed:
+            return
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany("UPDATE manifest SET op = 'add' WHERE seq = ?", [(s,) for s in moved])
+                conn.executemany("DELETE FROM manifest WHERE seq = ? AND op = 'pending'", [(s,) for s in failed])
+        finally:
+            conn.close()
+
+    def recover(self) -> int:
+        """
+        Settle 'pending' rows left by a crash between reserve and flush(): the
+        row becomes 'add' if the file reached the store, and is dropped (with
+        any partial copy) if the original is still in place. Call only while
+        no other store instance on this root is mid-batch (get_quarantine_store
+        runs it once at startup). Returns the number of files kept.
+        """
+        self.flush()
+        conn = self._connect()
+        try:
+            pending = conn.execute(
+                "SELECT seq, run_id, original_path, store_root FROM manifest WHERE op = 'pending'"
+            ).fetchall()
+            kept, dropped = [], []
+            for seq, run_id, original, store_root in pending:
+                stored = self._stored_path(run_id, seq, store_root)
+                if os.path.lexists(stored) and not os.path.lexists(original):
+                    kept.append((seq,))
+                    continue
+                try:
+                    os.remove(stored)
+                except OSError:
+                    pass
+                dropped.append((seq,))
+            with conn:
+                conn.executemany("UPDATE manifest SET op = 'add' WHERE seq = ?", kept)
+                conn.executemany("DELETE FROM manifest WHERE seq = ?", dropped)
+            return len(kept)
+        finally:
+            conn.close()
+
+    # --- Queries ---
+
+    def _active(self, conn: sqlite3.Connection, where: str = "", params: tuple = ()) -> list[tuple]:
+        """(seq, run_id, original_path, size_bytes, at, store_root) of entries not restored or purged."""
+        sql = (
+            "SELECT a.seq, a.run_id, a.original_path, a.size_bytes, a.at, a.store_root FROM manifest a"
+            " WHERE a.op = 'add' AND NOT EXISTS (SELECT 1 FROM manifest b WHERE b.ref = a.seq)"
+        )
+        if where:
+            sql += " AND " + where
+        return conn.execute(sql + " ORDER BY a.seq", params).fetchall()
+
+    def list_runs(self) -> list[dict]:
+        """Runs with entries still in quarantine: {run_id, files, bytes, first_at}."""
+        self.flush()
+        conn = self._connect()
+        try:
+            runs: dict[str, dict] = {}
+            for _seq, run_id, _path, size, at, _store_root in self._active(conn):
+                r = runs.setdefault(run_id, {"run_id": run_id, "files": 0, "bytes": 0, "first_at": at})
+                r["files"] += 1
+                r["bytes"] += size or 0
+            return list(runs.values())
+        finally:
+            conn.close()
+
+    # --- Restore / retention ---
+
+    def restore_run(self, run_id: str, overwrite: bool = False) -> RestoreReport:
+        """Move every active entry of run_id back to its original path."""
+        self.flush()
+        report = RestoreReport(run_id=run_id)
+        start = time.monotonic()
+        conn = self._connect()
+        try:
+            entries = self._active(conn, "a.run_id = ?", (run_id,))
+        finally:
+            conn.close()
+        rows: list[tuple] = []
+        made: set[str] = set()
+        store_roots: set[str | None] = set()
+        for seq, _run, original, size, _at, store_root in entries:
+            if not overwrite and os.path.lexists(original):
+                report.skipped_exists += 1
+                continue
+            parent = os.path.dirname(original)
+            try:
+                if parent not in made:
+                    os.makedirs(parent, exist_ok=True)
+                    made.add(parent)
+                _move(self._stored_path(run_id, seq, store_root), original)
+            except OSError:
+                report.errors += 1
+                continue
+            rows.append(("restore", seq, run_id, None, size, None, time.time()))
+            store_roots.add(store_root)
+            report.restored += 1
+        if rows:
+            self._append(rows)
+        for store_root in store_roots:
+            self._remove_run_dir_if_empty(run_id, store_root)
+        report.elapsed_seconds = round(time.monotonic() - start, 3)
+        return report
+
+    def enforce_retention(
+        self,
+        max_age_days: float = QUARANTINE_MAX_AGE_DAYS,
+        max_total_bytes: int = QUARANTINE_MAX_BYTES,
+        now: float | None = None,
+    ) -> int:
+        """Purge entries older than max_age_days, then oldest first until under max_total_bytes."""
+        self.flush()
+        now = time.time() if now is None else now
+        conn = self._connect()
+        try:
+            entries = self._active(conn)
+        finally:
+            conn.close()
+        cutoff = now - max_age_days * 86400
+        total = sum(e[3] or 0 for e in entries)
+        victims = []
+        for entry in entries:  # seq order == oldest first
+            if entry[4] < cutoff or total > max_total_bytes:
+                victims.append(entry)
+                total -= entry[3] or 0
+        rows: list[tuple] = []
+        runs: set[tuple[str, str | None]] = set()
+        for seq, run_id, _original, size, _at, store_root in victims:
+            try:
+                os.remove(self._stored_path(run_id, seq, store_root))
+            except FileNotFoundError:
+                pass
+            except OSError:
+                continue
+            rows.append(("purge", seq, run_id, None, size, None, now))
+            runs.add((run_id, store_root))
+        if rows:
+            self._append(rows)
+        for run_id, store_root in runs:
+            self._remove_run_dir_if_empty(run_id, store_root)
+        return len(rows)
+
+    def _remove_run_dir_if_empty(self, run_id: str, store_root: str | None = None) -> None:
+        run_dir = os.path.join(store_root or self.root, run_id)
+        try:
+            os.rmdir(run_dir)
+            self._run_dirs.discard(run_dir)
+        except OSError:
+            pass
+
+
+_store: QuarantineStore | None = None
+_store_lock = threading.Lock()
+
+
+def get_quarantine_store() -> QuarantineStore:
+    """Process-wide store on QUARANTINE_DIR; pending rows from a previous run are recovered on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = QuarantineStore()
+            _store.recover()
+        return _store
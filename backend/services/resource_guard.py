@@ -2,10 +2,16 @@
 Resource self-monitoring and automatic throttling. Internal thresholds
 are not exposed to user config. Scans and scheduler consult this module
 to decide whether to sleep, reduce batch size, or defer work.
+
+Background jobs started by the idle scheduler run with a PauseToken bound to
+their thread; walkers call pause_point() at batch boundaries (after a
+commit), where the job blocks while the user is active and then carries on
+from the same directory.
 """
 import threading
 import time
-from typing import Callable
+from contextlib import contextmanager
+from typing import Callable, Iterator
 
 from backend.core.constants import (
     CPU_PERCENT_THRESHOLD,
@@ -13,6 +19,8 @@ from backend.core.constants import (
     MEMORY_MB_THRESHOLD,
     RESOURCE_CHECK_INTERVAL_SECONDS,
 )
+from backend.core.metrics import THROTTLE_SLEEP_SECONDS, THROTTLE_SLEEPS
+from backend.core.profiler import checkpoint as profiler_checkpoint
 
 _guard_lock = threading.Lock()
 _last_check_time = 0.0
@@ -80,6 +88,8 @@ def throttle_if_needed() -> None:
     to automatically back off.
     """
     if is_under_load():
+        THROTTLE_SLEEPS.inc()
+        THROTTLE_SLEEP_SECONDS.inc(HIGH_LOAD_SLEEP_SECONDS)
         time.sleep(HIGH_LOAD_SLEEP_SECONDS)
 
 
@@ -95,3 +105,71 @@ def run_if_idle(fn: Callable[[], None], max_wait_sec: float = 60.0) -> bool:
             return True
         time.sleep(RESOURCE_CHECK_INTERVAL_SECONDS)
     return False
+
+
+class PauseToken:
+    """Cooperative pause switch for one background job."""
+
+    def __init__(self) -> None:
+        self._running = threading.Event()
+        self._running.set()
+        self._waiting = threading.Event()
+        self.pauses = 0
+
+    def pause(self) -> None:
+        if self._running.is_set():
+            self.pauses += 1
+            self._running.clear()
+
+    def resume(self) -> None:
+        self._running.set()
+
+    @property
+    def paused(self) -> bool:
+        return not self._running.is_set()
+
+    @property
+    def parked(self) -> bool:
+        """True while the job is actually blocked in pause_point()."""
+        return self._waiting.is_set()
+
+    def wait(self) -> None:
+        if self._running.is_set():
+            return
+        self._waiting.set()
+        try:
+            self._running.wait()
+        finally:
+            self._waiting.clear()
+
+
+_pause_context = threading.local()
+
+
+def current_pause_token() -> PauseToken | None:
+    """Token of the background job running on this thread, if any."""
+    return getattr(_pause_context, "token", None)
+
+
+@contextmanager
+def pause_scope(token: PauseToken | None) -> Iterator[None]:
+    """Bind token to this thread (also used to carry it into worker-pool threads)."""
+    previous = current_pause_token()
+    _pause_context.token = token
+    try:
+        yield
+    finally:
+        _pause_context.token = previous
+
+
+def pause_point() -> None:
+    """
+    Block while this thread's background job is paused. No-op for work not
+    started by the idle scheduler (API requests, user-triggered rebuilds).
+    Call only where no write transaction is open. Also the point where an
+    opt-in cProfile session stops once past its time limit.
+    """
+    profiler_checkpoint()
+    token = current_pause_token()
+    if token is not None:
+        token.wait()
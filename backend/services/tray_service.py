@@ -1,6 +1,9 @@
 """
 System tray icon: tooltip with disk summary, menu (open, exit), and
 optional PyWebView window. Close behavior (minimize to tray vs quit) from config.
+The tooltip is pushed: disk sampler and junk analyzer listeners feed
+TrayTooltip, which sets the icon title only when the rendered text changes,
+so the idle tray has no timer of its own.
 """
 import os
 import sys
@@ -8,12 +11,94 @@ import threading
 import webbrowser
 from typing import Callable
 
-# Cache for tooltip text (updated by monitor callback)
-_tooltip_lines: list[str] = []
-_tooltip_lock = threading.Lock()
+from backend.core.constants import DISK_SAMPLE_INTERVAL_SECONDS
+
+DEFAULT_TOOLTIP = "Windows Cleaner"
 _current_icon: "object | None" = None  # pystray.Icon ref for updating title
 
 
+class TrayTooltip:
+    """
+    Tooltip text built incrementally from change events: on_sample (disk
+    sampler listener) and on_junk_report (junk analyzer listener). The sink
+    (the icon title setter) is called only when the text differs from the
+    last text pushed; rendered values are rounded (0.1 %, whole GB / MB), so
+    ordinary sample-to-sample noise does not reach the icon.
+    """
+
+    def __init__(self, stale_after_seconds: float = 2 * DISK_SAMPLE_INTERVAL_SECONDS) -> None:
+        self.stale_after_seconds = stale_after_seconds
+        self._lock = threading.Lock()
+        self._drives: dict[str, tuple[float, int, int]] = {}  # drive -> (ts, free, total)
+        self._junk_bytes: int | None = None
+        self._text = DEFAULT_TOOLTIP
+        self._sink: Callable[[str], None] | None = None
+        self.pushes = 0  # sink calls (icon title updates)
+
+    def attach(self, sink: Callable[[str], None]) -> None:
+        """Push updates to sink(text), starting with the current text."""
+        with self._lock:
+            self._sink = sink
+            text = self._text
+        self._push(sink, text)
+
+    def detach(self) -> None:
+        with self._lock:
+            self._sink = None
+
+    def text(self) -> str:
+        with self._lock:
+            return self._text
+
+    def on_sample(self, drive: str, ts: float, free_bytes: int, total_bytes: int) -> None:
+        """Disk sampler listener."""
+        with self._lock:
+            self._drives[drive] = (ts, free_bytes, total_bytes)
+            # Volumes that stopped reporting (unplugged) drop out after a couple of rounds
+            for d in [d for d, v in self._drives.items() if v[0] < ts - self.stale_after_seconds]:
+                del self._drives[d]
+            self._refresh_locked()
+
+    def on_junk_report(self, report: object) -> None:
+        """Junk analyzer listener; reads the total from the report, never walks."""
+        with self._lock:
+            self._junk_bytes = report.total_bytes if getattr(report, "roots", None) else None
+            self._refresh_locked()
+
+    def _render_locked(self) -> str:
+        lines = []
+        for drive in sorted(self._drives):
+            _ts, free, total = self._drives[drive]
+            pct = free / total * 100 if total else 0.0
+            lines.append(f"{drive} 剩余 {pct:.1f}% ({free // (1024**3)} GB)")
+        if self._junk_bytes is not None:
+            lines.append(f"垃圾目录约 {self._junk_bytes // (1024**2)} MB")
+        return "\n".join(lines) or DEFAULT_TOOLTIP
+
+    def _refresh_locked(self) -> None:
+        text = self._render_locked()
+        if text == self._text:
+            return
+        self._text = text
+        if self._sink is not None:
+            self._push(self._sink, text)
+
+    def _push(self, sink: Callable[[str], None], text: str) -> None:
+        self.pushes += 1
+        try:
+            sink(text)
+        except Exception:
+            pass
+
+
+_tooltip = TrayTooltip()
+
+
+def get_tray_tooltip() -> TrayTooltip:
+    """Process-wide tooltip model (listeners are registered in run_server)."""
+    return _tooltip
+
+
 def _get_icon_path() -> str | None:
     """Get the path to app_icon.ico, handling both dev and frozen modes."""
     if getattr(sys, "frozen", False):
@@ -36,19 +121,9 @@ def _get_icon_path() -> str | None:
     return None
 
 
-def set_tooltip_lines(lines: list[str]) -> None:
-    """Update tooltip content (e.g. from disk check callback)."""
-    with _tooltip_lock:
-        _tooltip_lines.clear()
-        _tooltip_lines.extend(lines)
-
-
 def get_tooltip_text() -> str:
     """Current tooltip string."""
-    with _tooltip_lock:
-        if not _tooltip_lines:
-            return "Windows Cleaner"
-        return "\n".join(_tooltip_lines)
+    return _tooltip.text()
 
 
 def _write_tray_error(msg: str, exc_text: str | None, bootstrap_log_path: str | None) -> None:
@@ -148,17 +223,11 @@ def run_tray(
             make_menu(),
         )
         _current_icon = icon
-        # Refresh tooltip periodically
-        def tick() -> None:
-            import time
-            while getattr(icon, "visible", True):
-                try:
-                    icon.title = get_tooltip_text()
-                except Exception:
-                    pass
-                time.sleep(30)
-
-        threading.Thread(target=tick, daemon=True).start()
+
+        def set_title(text: str) -> None:
+            icon.title = text
+
+        _tooltip.attach(set_title)
         icon.run()
     except Exception:
         _write_tray_error(
@@ -168,6 +237,7 @@ def run_tray(
         )
         raise
     finally:
+        _tooltip.detach()
         _current_icon = None
 
 
@@ -0,0 +1,176 @@
+"""
+Load test: /api/health and /api/config latency stays flat while the slow
+endpoints (folder dialog, index queries) are saturated well past the size
+of Starlette's threadpool, and index queries whose client has gone are
+dropped instead of occupying the DB pool.
+"""
+import asyncio
+import statistics
+import threading
+import time
+
+import httpx
+import pytest
+
+import backend.api.routes as routes_mod
+from backend.main import app
+
+
+def _p95(samples: list[float]) -> float:
+    return statistics.quantiles(samples, n=20)[-1]
+
+
+async def _probe(client: httpx.AsyncClient, path: str, rounds: int) -> list[float]:
+    latencies = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        r = await client.get(path)
+        latencies.append(time.perf_counter() - start)
+        assert r.status_code == 200
+        await asyncio.sleep(0.005)
+    return latencies
+
+
+@pytest.fixture
+def slow_backends(monkeypatch):
+    """Dialog that stays open and an index query that takes a second; released at teardown."""
+    release = threading.Event()
+
+    def dialog(initial_dir):
+        release.wait(10)
+        return ""
+
+    def slow_query(**kwargs):
+        release.wait(1)
+        return []
+
+    monkeypatch.setattr(routes_mod, "_pick_folder_dialog", dialog)
+    monkeypatch.setattr(routes_mod, "iter_large_files", slow_query)
+    yield
+    release.set()
+
+
+def test_health_and_config_stay_fast_under_slow_endpoint_load(slow_backends):
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            baseline = await _probe(client, "/api/health", 20)
+            # An open dialog (further pick-folder calls get 409) + 60 slow queries:
+            # more than the default 40-thread pool
+            slow = [asyncio.create_task(client.get("/api/pick-folder")) for _ in range(60)]
+            slow += [asyncio.create_task(client.get("/api/scan/large-files")) for _ in range(60)]
+            await asyncio.sleep(0.1)
+            health = await _probe(client, "/api/health", 40)
+            config = await _probe(client, "/api/config", 40)
+            for t in slow:
+                t.cancel()
+            await asyncio.gather(*slow, return_exceptions=True)
+        return baseline, health, config
+
+    baseline, health, config = asyncio.run(scenario())
+    assert _p95(health) < max(0.05, 10 * _p95(baseline))
+    assert _p95(config) < 0.1
+
+
+def test_large_files_pages_by_cursor(monkeypatch, tmp_path):
+    import backend.services.index_service as index_mod
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setattr(index_mod, "INDEX_DB_DIR", str(tmp_path / "db"))
+    tree = tmp_path / "tree"
+    tree.mkdir()
+    for i in range(12):
+        (tree / f"f{i:02d}.bin").write_bytes(b"x" * (1000 + i))
+    index_mod.index_full_scan_volume("T:", str(tree))
+    client = TestClient(app)
+    params = {"drive": "T", "min_size_mb": 0, "limit": 5, "format": "columns", "sort": "size", "order": "asc"}
+    first = client.get("/api/scan/large-files", params={**params, "total": "true"}).json()
+    assert first["total"] == 12
+    sizes, cursor = first["sizes"], first["next_cursor"]
+    while cursor:
+        page = client.get("/api/scan/large-files", params={**params, "cursor": cursor}).json()
+        sizes, cursor = sizes + page["sizes"], page["next_cursor"]
+    assert sizes == [1000 + i for i in range(12)]
+    bad = client.get("/api/scan/large-files", params={**params, "sort": "path", "cursor": first["next_cursor"]})
+    assert bad.status_code == 400
+
+
+def test_watched_db_work_stops_for_disconnected_client():
+    from backend.core.executors import DB, WorkCancelled, get_executor, run_blocking_watched
+
+    release = threading.Event()
+    ran = []
+
+    def blocker(cancelled):
+        release.wait(5)
+
+    def leaves(cancelled):
+        ran.append("queued")
+
+    def waits_for_cancel(cancelled):
+        ran.append(cancelled.wait(5))
+
+    async def here():
+        return False
+
+    async def gone():
+        return True
+
+    async def scenario():
+        # Fill the DB pool so the next call is still queued when its client leaves
+        busy = [asyncio.ensure_future(run_blocking_watched(DB, here, blocker)) for _ in range(get_executor(DB)._max_workers)]
+        await asyncio.sleep(0.05)
+        with pytest.raises(WorkCancelled):
+            await run_blocking_watched(DB, gone, leaves)
+        release.set()
+        await asyncio.gather(*busy)
+        # A running call sees its cancel event set
+        with pytest.raises(WorkCancelled):
+            await run_blocking_watched(DB, gone, waits_for_cancel)
+
+    asyncio.run(scenario())
+    time.sleep(0.1)
+    assert ran == [True]  # the queued call never ran
+
+
+def test_search_endpoint(monkeypatch, tmp_path):
+    import backend.services.index_service as index_mod
+    from fastapi.testclient import TestClient
+
+    monkeypatch.setattr(index_mod, "INDEX_DB_DIR", str(tmp_path / "db"))
+    tree = tmp_path / "tree"
+    tree.mkdir()
+    for i in range(5):
+        (tree / f"clip_{i}.mp4").write_bytes(b"x")
+    (tree / "notes.txt").write_bytes(b"x")
+    index_mod.index_full_scan_volume("T:", str(tree))
+    client = TestClient(app)
+    page = client.get("/api/search", params={"q": "*.MP4", "drive": "T", "limit": 3}).json()
+    assert len(page["items"]) == 3 and page["next_cursor"]
+    rest = client.get("/api/search", params={"q": "*.MP4", "drive": "T", "cursor": page["next_cursor"]}).json()
+    assert len(rest["items"]) == 2 and rest["next_cursor"] is None
+    assert client.get("/api/search", params={"q": "note"}).json()["items"][0]["path"] == str(tree / "notes.txt")
+    assert client.get("/api/search", params={"q": " "}).status_code == 400
+
+
+def test_pick_folder_allows_one_dialog_and_keeps_late_choice(monkeypatch):
+    release = threading.Event()
+
+    def dialog(initial_dir):
+        release.wait(5)
+        return "/picked"
+
+    monkeypatch.setattr(routes_mod, "_pick_folder_dialog", dialog)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = asyncio.create_task(client.get("/api/pick-folder"))
+            await asyncio.sleep(0.05)
+            second = await client.get("/api/pick-folder")
+            release.set()
+            return second, await first
+
+    second, first = asyncio.run(scenario())
+    assert second.status_code == 409
+    assert first.json() == {"path": "/picked"}
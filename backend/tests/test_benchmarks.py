@@ -0,0 +1,61 @@
+"""
+Tests for the benchmark suite: the synthetic tree is deterministic, compare
+mode flags regressions by metric direction, and a tiny end-to-end run works
+without Windows APIs and leaves the environment as it found it.
+"""
+import os
+import shutil
+
+from benchmarks.runner import compare, run_suite
+from benchmarks.synthetic_fs import PRESETS, generate
+
+
+def test_synthetic_tree_is_deterministic(tmp_path):
+    spec = PRESETS["tiny"]
+    a = generate(spec, str(tmp_path))
+    b = generate(spec, str(tmp_path))
+    try:
+        assert a.fingerprint == b.fingerprint
+        assert (a.dirs, a.files, a.total_bytes) == (b.dirs, b.files, b.total_bytes)
+        walked = sum(len(files) for _root, _dirs, files in os.walk(a.root))
+        assert walked == a.files
+        names = [n for _root, dirs, files in os.walk(a.root) for n in dirs + files]
+        assert any(not n.isascii() for n in names)
+        assert sum(os.path.getsize(p) for p in a.large_paths) >= a.large_files * spec.large_file_min_bytes
+    finally:
+        shutil.rmtree(a.root)
+        shutil.rmtree(b.root)
+
+
+def test_compare_uses_metric_direction_and_noise_floor():
+    base = {"results": {"walk": {
+        "walk_seconds": 0.100, "walk_files_per_second": 1000.0, "walk_files": 10,
+        "tiny_seconds": 0.0002, "walk_seconds_median": 0.1,
+    }}}
+    cur = {"results": {"walk": {
+        "walk_seconds": 0.130, "walk_files_per_second": 800.0, "walk_files": 99,
+        "tiny_seconds": 0.0004, "walk_seconds_median": 0.5,
+    }}}
+    changes = {c.metric: c for c in compare(base, cur, threshold=0.15)}
+    assert set(changes) == {"walk_seconds", "walk_files_per_second", "tiny_seconds"}
+    assert changes["walk_seconds"].regression and changes["walk_files_per_second"].regression
+    assert not changes["tiny_seconds"].regression  # +100 % but only 0.2 ms
+    assert not compare(base, base)[0].regression
+
+
+def test_tiny_suite_runs_and_restores_environment(tmp_path):
+    temp_before = os.environ.get("TEMP")
+    doc = run_suite(
+        PRESETS["tiny"],
+        cases=["walk", "large_files", "junk_scan"],
+        repeat=1,
+        base_dir=str(tmp_path),
+        log=lambda _msg: None,
+    )
+    results = doc["results"]
+    assert results["walk"]["walk_files"] > 0
+    assert results["large_files"]["large_files_offset_0_seconds"] > 0
+    assert results["junk_scan"]["junk_bytes"] > 0
+    assert doc["meta"]["tree"]["fingerprint"]
+    assert os.environ.get("TEMP") == temp_before
+    assert os.listdir(tmp_path) == []  # tree and scratch index removed
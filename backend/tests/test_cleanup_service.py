@@ -0,0 +1,227 @@
+"""
+Unit tests for cleanup_service and quarantine_service: batched execution with
+a local quarantine store in place of the Recycle Bin, dry-run, TOCTOU
+re-validation, restore by run ID and retention.
+"""
+import os
+import time
+import pytest
+from backend.services.cleanup_service import PermanentDeleteBackend, execute_cleanup
+from backend.services.quarantine_service import QuarantineStore
+
+
+@pytest.fixture
+def temp_index_db(monkeypatch, tmp_path):
+    import backend.services.index_service as index_mod
+    monkeypatch.setattr(index_mod, "INDEX_DB_DIR", str(tmp_path / "db"))
+
+
+def _matches(root, count=5, size=100):
+    root.mkdir(parents=True, exist_ok=True)
+    result = []
+    for i in range(count):
+        p = root / f"f{i}.tmp"
+        p.write_bytes(b"x" * size)
+        st = p.stat()
+        result.append({"path": str(p), "size_bytes": st.st_size, "mtime_ns": st.st_mtime_ns})
+    return result
+
+
+def test_execute_cleanup_dry_run_keeps_files(temp_index_db, tmp_path):
+    matches = _matches(tmp_path / "src")
+    report = execute_cleanup(matches, PermanentDeleteBackend(), dry_run=True, batch_size=2)
+    assert report.dry_run is True
+    assert report.files_acted == 5
+    assert report.bytes_freed == 500
+    assert all(os.path.exists(m["path"]) for m in matches)
+
+
+def test_execute_cleanup_quarantine_and_restore(temp_index_db, tmp_path):
+    matches = _matches(tmp_path / "src")
+    store = QuarantineStore(str(tmp_path / "quarantine"))
+    report = execute_cleanup(matches, store, batch_size=2, max_workers=2, run_id="run1")
+    assert report.files_acted == 5
+    assert report.bytes_freed == 500
+    assert report.errors == 0
+    assert not any(os.path.exists(m["path"]) for m in matches)
+    assert store.list_runs() == [
+        {"run_id": "run1", "files": 5, "bytes": 500, "first_at": store.list_runs()[0]["first_at"]}
+    ]
+
+    # Manifest survives reopening; restore puts everything back
+    reopened = QuarantineStore(str(tmp_path / "quarantine"))
+    restored = reopened.restore_run("run1")
+    assert restored.restored == 5
+    assert all(os.path.getsize(m["path"]) == 100 for m in matches)
+    assert reopened.list_runs() == []
+    assert reopened.restore_run("run1").restored == 0
+
+
+def test_quarantine_retention_by_age_and_size(tmp_path):
+    store = QuarantineStore(str(tmp_path / "quarantine"))
+    for run_id in ("old", "new"):
+        for m in _matches(tmp_path / run_id, count=3, size=1000):
+            store.dispose(m["path"], run_id)
+        store.flush()
+    # Nothing old enough, but only 4000 bytes allowed: the oldest two go first
+    assert store.enforce_retention(max_age_days=30, max_total_bytes=4000) == 2
+    assert {r["run_id"]: r["files"] for r in store.list_runs()} == {"old": 1, "new": 3}
+    # Everything is older than 0 days from a minute in the future
+    assert store.enforce_retention(max_age_days=0, max_total_bytes=10**9, now=time.time() + 60) == 4
+    assert store.list_runs() == []
+    assert not os.path.exists(tmp_path / "quarantine" / "old")
+
+
+def test_execute_cleanup_skips_changed_files(temp_index_db, tmp_path):
+    from backend.services.index_service import index_full_scan_volume, lookup_file_rows
+
+    matches = _matches(tmp_path / "src", count=3)
+    index_full_scan_volume("T:", str(tmp_path / "src"))
+    with open(matches[0]["path"], "ab") as f:
+        f.write(b"grown")
+    report = execute_cleanup(matches, PermanentDeleteBackend())
+    assert report.files_acted == 2
+    assert report.skipped_changed == 1
+    assert os.path.exists(matches[0]["path"])
+    remaining = lookup_file_rows([m["path"] for m in matches])
+    assert list(remaining) == [matches[0]["path"]]
+
+
+def test_quarantine_two_instances_share_sequence(tmp_path):
+    root = str(tmp_path / "quarantine")
+    first, second = QuarantineStore(root), QuarantineStore(root)
+    a = _matches(tmp_path / "a", count=2)
+    b = _matches(tmp_path / "b", count=2)
+    assert first.dispose_batch([m["path"] for m in a], "r1") == [m["path"] for m in a]
+    assert second.dispose_batch([m["path"] for m in b], "r2") == [m["path"] for m in b]
+    first.flush()
+    second.flush()
+    assert {r["run_id"]: r["files"] for r in first.list_runs()} == {"r1": 2, "r2": 2}
+    assert second.restore_run("r1").restored == 2
+    assert first.restore_run("r2").restored == 2
+    assert all(os.path.exists(m["path"]) for m in a + b)
+
+
+def test_quarantine_recovers_pending_rows_after_crash(tmp_path):
+    root = str(tmp_path / "quarantine")
+    moved, untouched = _matches(tmp_path / "src", count=2)
+    crashed = QuarantineStore(root)
+    crashed.dispose(moved["path"], "run1")  # moved, never flushed
+    crashed._reserve("run1", [(untouched["path"], os.stat(untouched["path"]), None)])  # reserved, never moved
+    del crashed
+
+    store = QuarantineStore(root)
+    assert store.list_runs() == []
+    assert store.recover() == 1
+    assert [(r["run_id"], r["files"]) for r in store.list_runs()] == [("run1", 1)]
+    assert store.restore_run("run1").restored == 1
+    assert os.path.exists(moved["path"]) and os.path.exists(untouched["path"])
+    assert store.recover() == 0
+
+
+class _TwoDeviceStore(QuarantineStore):
+    """Everything under one of `mounts` counts as its own device."""
+
+    def __init__(self, root, mounts):
+        self.mounts = [str(m) for m in mounts]
+        super().__init__(root)
+
+    def _device(self, path):
+        for i, mount in enumerate(self.mounts, 2):
+            if path == mount or path.startswith(mount + os.sep):
+                return i
+        return 1
+
+
+def test_quarantine_keeps_a_store_root_per_volume(tmp_path):
+    vol, bad = tmp_path / "vol", tmp_path / "bad"
+    local = _matches(tmp_path / "src", count=1)
+    other = _matches(vol / "data", count=2)
+    stuck = _matches(bad / "data", count=1)
+    (bad / ".wc_quarantine").write_text("not a directory")
+    store = _TwoDeviceStore(str(tmp_path / "quarantine"), [vol, bad])
+    paths = [m["path"] for m in local + other + stuck]
+    assert store.dispose_batch(paths, "run1") == paths
+    store.flush()
+
+    assert len(os.listdir(tmp_path / "quarantine" / "run1")) == 2  # local file + fallback for bad
+    assert len(os.listdir(vol / ".wc_quarantine" / "run1")) == 2
+    assert store.list_runs()[0]["files"] == 4
+    # Reopened: the manifest remembers where each file went
+    reopened = _TwoDeviceStore(str(tmp_path / "quarantine"), [vol, bad])
+    assert reopened.restore_run("run1").restored == 4
+    assert all(os.path.exists(p) for p in paths)
+    assert not (vol / ".wc_quarantine" / "run1").exists()
+
+
+def test_quarantine_opens_manifest_without_store_root(tmp_path):
+    import sqlite3
+
+    root = tmp_path / "quarantine"
+    (root / "old").mkdir(parents=True)
+    (root / "old" / "1").write_bytes(b"x" * 10)
+    conn = sqlite3.connect(str(root / "manifest.db"))
+    conn.execute(
+        "CREATE TABLE manifest (seq INTEGER PRIMARY KEY AUTOINCREMENT, op TEXT NOT NULL, ref INTEGER,"
+        " run_id TEXT NOT NULL, original_path TEXT, size_bytes INTEGER, mtime_ns INTEGER, at REAL NOT NULL)"
+    )
+    conn.execute("INSERT INTO manifest VALUES (1, 'add', NULL, 'old', ?, 10, 0, 0)", (str(tmp_path / "a.bin"),))
+    conn.commit()
+    conn.close()
+    store = QuarantineStore(str(root))
+    assert store.list_runs()[0]["files"] == 1
+    assert store.restore_run("old").restored == 1
+    assert (tmp_path / "a.bin").read_bytes() == b"x" * 10
+
+
+def test_rule_cleanup_is_not_capped_at_preview_size(temp_index_db, tmp_path):
+    from backend.services.monitor_service import run_rule_cleanup, run_rule_scan
+
+    _matches(tmp_path / "src", count=150)
+    rule = {"rule_type": "by_extension", "target_path": str(tmp_path / "src"), "extensions": [".tmp"]}
+    assert len(run_rule_scan(rule, limit=100)) == 100
+    report = run_rule_cleanup(dict(rule, clean_action="delete"))
+    assert report.files_acted == 150
+    assert os.listdir(tmp_path / "src") == []
+
+
+def test_cleanup_updates_dir_rollups(temp_index_db, tmp_path):
+    from backend.services.index_service import _get_connection, index_full_scan_volume
+
+    root = tmp_path / "tree"
+    small = _matches(root / "a" / "b", count=3, size=100)
+    big = _matches(root / "a" / "c", count=2, size=50_000)
+    index_full_scan_volume("T:", str(root))
+
+    def rollups():
+        conn = _get_connection()
+        try:
+            return conn.execute(
+                "SELECT path, file_count, file_max, file_total, subtree_count, subtree_max, subtree_total"
+                " FROM dir_index ORDER BY path"
+            ).fetchall()
+        finally:
+            conn.close()
+
+    report = execute_cleanup(big + small[:1], PermanentDeleteBackend())
+    assert report.files_acted == 3
+    after_cleanup = rollups()
+    index_full_scan_volume("T:", str(root))
+    assert after_cleanup == rollups()
+    assert after_cleanup[0][4:] == (2, 100, 200)  # tree/: two small files left
+
+
+def test_quarantine_restore_route(temp_index_db, monkeypatch, tmp_path):
+    from fastapi.testclient import TestClient
+    import backend.services.quarantine_service as quarantine_mod
+    from backend.main import app
+
+    matches = _matches(tmp_path / "src", count=2)
+    store = QuarantineStore(str(tmp_path / "quarantine"))
+    monkeypatch.setattr(quarantine_mod, "_store", store)
+    execute_cleanup(matches, store, run_id="run1")
+    client = TestClient(app)
+    assert [r["run_id"] for r in client.get("/api/quarantine/runs").json()] == ["run1"]
+    r = client.post("/api/quarantine/restore", json={"run_id": "run1"})
+    assert r.json()["restored"] == 2 and r.json()["errors"] == 0
+    assert all(os.path.exists(m["path"]) for m in matches)
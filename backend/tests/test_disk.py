@@ -16,7 +16,11 @@ from backend.utils.disk import (
 def test_get_fixed_drives_returns_list():
     drives = get_fixed_drives()
     assert isinstance(drives, list)
-    assert all(isinstance(d, str) and len(d) == 2 and d.endswith(":") for d in drives)
+    if os.name == "nt":
+        assert all(isinstance(d, str) and len(d) == 2 and d.endswith(":") for d in drives)
+    else:
+        # POSIX volumes are mount points
+        assert all(isinstance(d, str) and os.path.isabs(d) for d in drives)
 
 
 def test_get_disk_usage_c():
@@ -0,0 +1,67 @@
+"""
+Unit tests for disk_sampler: ring buffer wrap-around, latest-sample reads
+without extra usage calls, listeners and downsampled history.
+"""
+import pytest
+from backend.services.disk_sampler import DiskSampler, UsageRing
+from backend.utils.volumes import MountPointProbe, VolumeRegistry
+
+
+class FakeUsage:
+    """shutil.disk_usage stand-in: free space drops by 1 GB per call."""
+
+    def __init__(self, total=100 * 2**30, free=50 * 2**30):
+        self.total = total
+        self.free = free
+        self.calls = 0
+
+    def __call__(self, root):
+        self.calls += 1
+        self.free -= 2**30
+        return self.total, self.total - self.free, self.free
+
+
+@pytest.fixture
+def sampler(tmp_path):
+    (tmp_path / "vol").mkdir()
+    registry = VolumeRegistry(MountPointProbe(mounts=[(str(tmp_path / "vol"), "ext4")]))
+    now = [1000.0]
+    s = DiskSampler(capacity=4, registry=registry, usage_fn=FakeUsage(), clock=lambda: now[0])
+    s.now = now
+    s.drive = str(tmp_path / "vol")
+    return s
+
+
+def test_usage_ring_wraps():
+    ring = UsageRing(3)
+    for i in range(5):
+        ring.append(float(i), i * 10, 100)
+    assert ring.count == 3
+    assert ring.latest() == (4.0, 40, 100)
+    assert ring.downsample(10)["free_bytes"] == [20, 30, 40]
+    assert ring.downsample(1) == {"t": [4.0], "free_bytes": [30], "free_min": [20], "total_bytes": [100]}
+    assert ring.downsample(10, since=3.5)["t"] == [4.0]
+
+
+def test_latest_reads_do_not_resample(sampler):
+    usage = sampler._usage_fn
+    sampler.sample_once()
+    for _ in range(5):
+        latest = sampler.latest(sampler.drive)
+        sampler.latest_all()
+    assert usage.calls == 1
+    assert latest.free_bytes == 49 * 2**30
+    assert [u.drive for u in sampler.latest_all()] == [sampler.drive]
+
+
+def test_history_and_listeners(sampler):
+    seen = []
+    sampler.add_listener(lambda drive, ts, free, total: seen.append((ts, free)))
+    for _ in range(6):
+        sampler.now[0] += 60
+        sampler.sample_once()
+    assert len(seen) == 6
+    history = sampler.history(sampler.drive, points=2)
+    assert history["t"] == [1240.0, 1360.0]  # only the last 4 samples are kept
+    assert history["free_bytes"] == [(47 + 46) * 2**30 // 2, (45 + 44) * 2**30 // 2]
+    assert sampler.history("Z:") is None
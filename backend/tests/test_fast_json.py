@@ -0,0 +1,37 @@
+"""
+Unit tests for fast_json: row and columnar layouts match the stdlib
+encoding of the equivalent dicts, including non-ASCII and lone-surrogate paths.
+"""
+import json
+
+from backend.api.fast_json import COLUMN_FORMAT, encode_file_rows
+
+ROWS = [
+    ("C:\\视频\\电影 (2024)\\\"quoted\"\\a.mkv", 5 * 2**30, 1_700_000_000_000_000_000),
+    ("D:\\backup\\tab\there.vhdx", 2**40, 0),
+    ("C:\\odd\\\udc80name.bin", 1, 2),  # lone surrogate from a Windows file name
+]
+
+
+def test_row_format_matches_dicts():
+    body = encode_file_rows(iter(ROWS), extra={"limit": 100, "offset": 0})
+    assert json.loads(body) == {
+        "items": [{"path": p, "size_bytes": s, "mtime_ns": m} for p, s, m in ROWS],
+        "limit": 100,
+        "offset": 0,
+    }
+
+
+def test_column_format():
+    body = encode_file_rows(iter(ROWS), COLUMN_FORMAT, {"limit": 3})
+    assert json.loads(body) == {
+        "paths": [r[0] for r in ROWS],
+        "sizes": [r[1] for r in ROWS],
+        "mtimes": [r[2] for r in ROWS],
+        "limit": 3,
+    }
+
+
+def test_empty_pages():
+    assert json.loads(encode_file_rows(iter([]))) == {"items": []}
+    assert json.loads(encode_file_rows(iter([]), COLUMN_FORMAT)) == {"paths": [], "sizes": [], "mtimes": []}
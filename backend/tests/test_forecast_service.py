@@ -0,0 +1,51 @@
+"""
+Unit tests for forecast_service: trend tracking, ETA to threshold,
+robustness to one-off jumps and warm-up.
+"""
+from backend.services.forecast_service import DiskForecaster, format_eta
+
+GB = 2**30
+TOTAL = 1000 * GB
+
+
+def _feed(forecaster, hours, free_at, start=0.0, step=600):
+    t = start
+    while t <= start + hours * 3600:
+        forecaster.on_sample("C:", t, int(free_at(t)), TOTAL)
+        t += step
+    return t
+
+
+def test_linear_fill_eta():
+    f = DiskForecaster()
+    rate = 10 * GB / 86400  # 10 GB/day
+    _feed(f, 72, lambda t: 300 * GB - rate * t)
+    # At t=72h free is 270 GB; 10% threshold = 100 GB -> ~17 days left
+    eta = f.seconds_until("C:", 10)
+    assert eta is not None
+    assert abs(eta / 86400 - 17) < 1.5
+    assert abs(f.summary()[0]["trend_bytes_per_day"] / GB + 10) < 1
+
+
+def test_needs_history_and_shrinking_trend():
+    f = DiskForecaster(min_history=6 * 3600)
+    _feed(f, 2, lambda t: 300 * GB - t * 1000)
+    assert f.seconds_until("C:", 10) is None  # not enough history
+    g = DiskForecaster()
+    _feed(g, 24, lambda t: 300 * GB)
+    assert g.seconds_until("C:", 10) is None  # flat
+    assert g.seconds_until("C:", 50) == 0.0  # already below
+
+
+def test_single_jump_is_damped():
+    f = DiskForecaster()
+    end = _feed(f, 24, lambda t: 300 * GB)
+    # One 50 GB drop (e.g. a download) followed by a flat series
+    f.on_sample("C:", end, 250 * GB, TOTAL)
+    trend_after_jump = f.state("C:").trend * 86400
+    assert trend_after_jump > -10 * GB
+
+
+def test_format_eta():
+    assert format_eta(3 * 3600) == "约 3 小时"
+    assert format_eta(3 * 86400) == "约 3 天"
@@ -0,0 +1,76 @@
+"""
+Tests for http_cache: ETag / 304 handling on /api/config and
+/api/scan/large-files, invalidation on config save and index writes,
+and LRU eviction.
+"""
+import os
+import tempfile
+
+import pytest
+from fastapi.testclient import TestClient
+
+import backend.core.config as config_mod
+import backend.services.index_service as index_mod
+from backend.api.http_cache import ResponseCache
+from backend.core import constants
+from backend.main import app
+
+
+@pytest.fixture
+def temp_config_dir(monkeypatch):
+    """Point config to a temp directory for the test."""
+    with tempfile.TemporaryDirectory() as d:
+        config_file = os.path.join(d, "config.json")
+        monkeypatch.setattr(constants, "CONFIG_DIR", d)
+        monkeypatch.setattr(constants, "CONFIG_FILE", config_file)
+        monkeypatch.setattr(config_mod, "CONFIG_DIR", d)
+        monkeypatch.setattr(config_mod, "CONFIG_FILE", config_file)
+        yield d
+
+
+def test_config_etag_304_and_invalidation(temp_config_dir):
+    client = TestClient(app)
+    first = client.get("/api/config")
+    etag = first.headers["etag"]
+    again = client.get("/api/config", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+
+    client.post("/api/config", json={"on_close": "quit"})
+    changed = client.get("/api/config", headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.headers["etag"] != etag
+    assert changed.json()["on_close"] == "quit"
+
+
+def test_large_files_etag_follows_index_generation(monkeypatch, tmp_path):
+    monkeypatch.setattr(index_mod, "INDEX_DB_DIR", str(tmp_path / "db"))
+    tree = tmp_path / "tree"
+    tree.mkdir()
+    (tree / "big.bin").write_bytes(b"x" * 2048)
+    index_mod.index_full_scan_volume("T:", str(tree))
+    client = TestClient(app)
+    params = {"drive": "T", "min_size_mb": 0.001}
+    first = client.get("/api/scan/large-files", params=params)
+    assert [i["path"] for i in first.json()["items"]] == [str(tree / "big.bin")]
+    etag = first.headers["etag"]
+    assert client.get("/api/scan/large-files", params=params, headers={"If-None-Match": etag}).status_code == 304
+    # Different query parameters have their own ETag
+    other = client.get("/api/scan/large-files", params={**params, "limit": 5})
+    assert other.headers["etag"] != etag
+
+    index_mod.remove_file_rows([str(tree / "big.bin")])
+    after = client.get("/api/scan/large-files", params=params, headers={"If-None-Match": etag})
+    assert after.status_code == 200
+    assert after.json()["items"] == []
+
+
+def test_response_cache_lru_and_versions():
+    cache = ResponseCache(maxsize=2)
+    cache.put(("a",), (1,), "ea", b"A")
+    cache.put(("b",), (1,), "eb", b"B")
+    assert cache.get(("a",), (1,)) == ("ea", b"A")
+    cache.put(("c",), (1,), "ec", b"C")  # evicts b (least recently used)
+    assert cache.get(("b",), (1,)) is None
+    assert cache.get(("a",), (2,)) is None  # stale version
+    assert cache.get(("c",), (1,)) == ("ec", b"C")
@@ -0,0 +1,136 @@
+"""
+Unit tests for idle_scheduler: jobs wait for a settled idle period, are
+paused at pause_point() when activity resumes and continue where they
+stopped; recurring jobs are re-queued. Idleness comes from a fake provider
+and time from a fake clock.
+"""
+import threading
+import time
+
+import pytest
+
+from backend.services.idle_scheduler import IdleScheduler, IdleState
+from backend.services.resource_guard import pause_point
+
+
+class FakeIdleProvider:
+    def __init__(self):
+        self.state = IdleState(cpu_percent=90.0)
+
+    def busy(self):
+        self.state = IdleState(cpu_percent=5.0, input_idle_seconds=2.0)  # user typing
+
+    def idle(self):
+        self.state = IdleState(cpu_percent=3.0, disk_bytes_per_second=1024.0, input_idle_seconds=600.0)
+
+    def snapshot(self):
+        return self.state
+
+
+class Walker:
+    """Processes items one at a time, with a pause point between items."""
+
+    def __init__(self, items=50):
+        self.items = items
+        self.done = []
+        self.step = threading.Semaphore(0)  # test hands out steps so progress is deterministic
+
+    def __call__(self):
+        for i in range(self.items):
+            self.step.acquire()
+            pause_point()
+            self.done.append(i)
+
+
+def _wait(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not reached")
+        time.sleep(0.005)
+
+
+@pytest.fixture
+def sched():
+    now = [0.0]
+    provider = FakeIdleProvider()
+    s = IdleScheduler(provider=provider, clock=lambda: now[0], settle_seconds=60, max_defer_seconds=3600)
+    s.now = now
+    s.fake = provider
+    yield s
+    s.stop()
+
+
+def test_job_waits_for_settled_idle(sched):
+    ran = threading.Event()
+    sched.submit("job", ran.set)
+    sched.tick()  # busy
+    sched.fake.idle()
+    sched.tick()  # idle, not yet settled
+    sched.now[0] += 30
+    sched.tick()
+    assert sched.status()["running"] is None
+    sched.now[0] += 30
+    sched.tick()
+    assert ran.wait(2)
+
+
+def test_preempted_job_resumes_without_losing_progress(sched):
+    walker = Walker(items=10)
+    sched.submit("walk", walker)
+    sched.fake.idle()
+    sched.tick()
+    sched.now[0] += 60
+    sched.tick()
+    for _ in range(4):
+        walker.step.release()
+    _wait(lambda: len(walker.done) == 4)
+
+    sched.fake.busy()
+    sched.tick()
+    status = sched.status()["running"]
+    assert status["paused"] and status["pauses"] == 1
+    walker.step.release()
+    time.sleep(0.05)
+    assert walker.done == [0, 1, 2, 3]  # parked at the pause point
+
+    sched.fake.idle()
+    sched.now[0] += 10
+    sched.tick()  # idle again, but not for settle_seconds yet
+    time.sleep(0.05)
+    assert len(walker.done) == 4
+    sched.now[0] += 60
+    sched.tick()
+    for _ in range(5):
+        walker.step.release()
+    _wait(lambda: len(walker.done) == 10)
+    assert walker.done == list(range(10))  # each item exactly once
+    _wait(lambda: not sched._running[2].is_alive())
+    sched.tick()
+    assert sched.completed == ["walk"]
+
+
+def test_recurring_job_requeued_and_overdue_job_forced(sched):
+    runs = []
+    sched.every("pass", lambda: runs.append(sched.now[0]), interval_seconds=3600, first_delay_seconds=120)
+    assert not sched.every("pass", lambda: None, interval_seconds=1)  # de-duplicated by name
+    sched.now[0] = 120
+    sched.tick()
+    assert runs == []  # due, but the machine is busy
+    sched.now[0] = 120 + 3600  # busy past max_defer_seconds: runs anyway, never paused
+    sched.tick()
+    _wait(lambda: runs == [3720])
+    assert sched.status()["running"]["forced"]
+    _wait(lambda: not sched._running[2].is_alive())
+    sched.tick()
+    queued = sched.status()["queued"]
+    assert [q["name"] for q in queued] == ["pass"]
+    assert queued[0]["due"] == 3720 + 3600
+
+
+def test_idle_state_thresholds():
+    assert IdleState().is_idle()
+    assert not IdleState(cpu_percent=80).is_idle()
+    assert not IdleState(disk_bytes_per_second=100 * 2**20).is_idle()
+    assert not IdleState(input_idle_seconds=5).is_idle()
+    assert IdleState(input_idle_seconds=None).is_idle()
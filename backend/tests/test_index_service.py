@@ -3,6 +3,7 @@ Unit tests for index_service: ensure_index_schema, query_large_files (empty),
 full_scan_directory with mock path.
 """
 import os
+import shutil
 import tempfile
 import pytest
 from backend.services.index_service import (
@@ -32,3 +33,356 @@ def test_full_scan_directory_yields(tmp_path):
     assert os.path.isfile(path)
     assert size >= 500
     assert is_dir is False
+
+
+@pytest.fixture
+def temp_index_db(monkeypatch, tmp_path):
+    """Point the index DB to a temp directory for the test."""
+    import backend.services.index_service as index_mod
+    db_dir = tmp_path / "db"
+    monkeypatch.setattr(index_mod, "INDEX_DB_DIR", str(db_dir))
+    return db_dir
+
+
+def _make_tree(root, dirs=10, files_per_dir=30, small=100):
+    for i in range(dirs):
+        sub = root / f"d{i}" / "nested"
+        sub.mkdir(parents=True)
+        for j in range(files_per_dir):
+            (sub / f"f{j}.bin").write_bytes(b"x" * small)
+    (root / "d0" / "nested" / "big.bin").write_bytes(b"y" * 50_000)
+
+
+def test_index_full_scan_volume_writes_rollups(temp_index_db, tmp_path):
+    from backend.services.index_service import _get_connection, index_full_scan_volume
+
+    tree = tmp_path / "tree"
+    _make_tree(tree, dirs=2, files_per_dir=3)
+    written = index_full_scan_volume("T:", str(tree))
+    assert written == 7
+    conn = _get_connection()
+    try:
+        row = conn.execute(
+            "SELECT subtree_count, subtree_max, subtree_total FROM dir_index WHERE path = ?",
+            (str(tree),),
+        ).fetchone()
+    finally:
+        conn.close()
+    assert row == (7, 50_000, 6 * 100 + 50_000)
+
+
+def test_pruned_scan_directory_skips_unchanged_subtrees(temp_index_db, tmp_path):
+    from backend.services.index_service import (
+        ScanStats,
+        index_full_scan_volume,
+        pruned_scan_directory,
+    )
+
+    tree = tmp_path / "tree"
+    _make_tree(tree)
+    cold = ScanStats()
+    cold_items = list(pruned_scan_directory(str(tree), 10_000, stats=cold, yield_batch=False))
+    index_full_scan_volume("T:", str(tree))
+    warm = ScanStats()
+    warm_items = list(pruned_scan_directory(str(tree), 10_000, stats=warm, yield_batch=False))
+    assert [p for p, *_ in warm_items] == [p for p, *_ in cold_items]
+    assert len(warm_items) == 1
+    assert warm.stat_calls * 10 <= cold.stat_calls
+    assert warm.dirs_pruned >= 9
+
+    # A new large file changes its directory mtime, so that directory is re-listed
+    (tree / "new.bin").write_bytes(b"z" * 20_000)
+    found = {os.path.basename(p) for p, *_ in pruned_scan_directory(str(tree), 10_000, yield_batch=False)}
+    assert found == {"big.bin", "new.bin"}
+
+
+def test_pruned_scan_directory_sees_changes_below_unchanged_dirs(temp_index_db, tmp_path):
+    from backend.services.index_service import index_full_scan_volume, pruned_scan_directory
+
+    tree = tmp_path / "tree"
+    _make_tree(tree, dirs=3, files_per_dir=2)
+    os.remove(tree / "d0" / "nested" / "big.bin")
+    index_full_scan_volume("T:", str(tree))
+    assert list(pruned_scan_directory(str(tree), 10_000, yield_batch=False)) == []
+
+    # Two levels down: neither tree/ nor tree/d1 changes mtime
+    deep = tree / "d1" / "nested" / "deeper"
+    deep.mkdir()
+    (deep / "late.bin").write_bytes(b"z" * 20_000)
+    (tree / "d2" / "nested" / "grown.bin").write_bytes(b"z" * 30_000)
+    expected = sorted(p for p, *_ in full_scan_directory(str(tree), 10_000, yield_batch=False))
+    found = sorted(p for p, *_ in pruned_scan_directory(str(tree), 10_000, yield_batch=False))
+    assert found == expected
+    assert [os.path.basename(p) for p in found] == ["late.bin", "grown.bin"]
+
+
+def test_pruned_scan_directory_sibling_sorting_inside_changed_subtree(temp_index_db, tmp_path):
+    from backend.services.index_service import index_full_scan_volume, pruned_scan_directory
+
+    tree = tmp_path / "tree"
+    for sub in ("a/b/x", "a/b c"):
+        (tree / sub).mkdir(parents=True)
+    index_full_scan_volume("T:", str(tree))
+    # a/b, "a/b c" and a/b/x all change; "a/b c" sorts between a/b and a/b/x
+    (tree / "a" / "b" / "x" / "big.bin").write_bytes(b"z" * 20_000)
+    (tree / "a" / "b" / "new.bin").write_bytes(b"z" * 20_000)
+    (tree / "a" / "b c" / "small.txt").write_bytes(b"z")
+    found = [os.path.relpath(p, tree) for p, *_ in pruned_scan_directory(str(tree), 10_000, yield_batch=False)]
+    assert sorted(found) == [os.path.join("a", "b", "new.bin"), os.path.join("a", "b", "x", "big.bin")]
+
+
+def test_index_incremental_rescan_restats_only_changed_dirs(temp_index_db, tmp_path):
+    from backend.services.index_service import (
+        ScanStats,
+        _get_connection,
+        index_full_scan_volume,
+        index_incremental_rescan,
+    )
+
+    tree = tmp_path / "tree"
+    _make_tree(tree, dirs=10, files_per_dir=30)
+    index_full_scan_volume("T:", str(tree))
+
+    # Untouched tree: one stat per directory, nothing re-listed
+    quiet = ScanStats()
+    assert index_incremental_rescan("T:", str(tree), stats=quiet) == 0
+    assert quiet.stat_calls == 21  # root + 10 dirs + 10 nested
+    assert quiet.dirs_listed == 0
+
+    # One create, one delete, one removed subtree
+    (tree / "d1" / "nested" / "added.bin").write_bytes(b"a" * 10)
+    (tree / "d2" / "nested" / "f0.bin").unlink()
+    shutil.rmtree(tree / "d3")
+    stats = ScanStats()
+    index_incremental_rescan("T:", str(tree), stats=stats)
+    assert stats.dirs_listed == 3  # root, d1/nested, d2/nested
+    assert stats.stat_calls == 19 + 31 + 29  # dirs + files of the two changed dirs
+
+    conn = _get_connection()
+    try:
+        paths = {r[0] for r in conn.execute("SELECT path FROM file_index")}
+        root_row = conn.execute(
+            "SELECT subtree_count FROM dir_index WHERE path = ?", (str(tree),)
+        ).fetchone()
+        d3_rows = conn.execute(
+            "SELECT COUNT(*) FROM dir_index WHERE path LIKE ?", (str(tree / "d3") + "%",)
+        ).fetchone()[0]
+    finally:
+        conn.close()
+    assert str(tree / "d1" / "nested" / "added.bin") in paths
+    assert str(tree / "d2" / "nested" / "f0.bin") not in paths
+    assert not any(p.startswith(str(tree / "d3")) for p in paths)
+    assert d3_rows == 0
+    assert root_row == (len(paths),)
+
+
+def test_growth_report_diffs_generations(temp_index_db, tmp_path, monkeypatch):
+    import backend.services.index_service as index_mod
+    from backend.services.index_service import (
+        _get_connection,
+        growth_report,
+        index_full_scan_volume,
+        index_incremental_rescan,
+    )
+
+    monkeypatch.setattr(index_mod, "GROWTH_FILE_MIN_DELTA_BYTES", 10_000)
+    tree = tmp_path / "tree"
+    _make_tree(tree, dirs=4, files_per_dir=5)
+    index_full_scan_volume("T:", str(tree))
+    assert growth_report("T:")["generations"] == []  # first scan is the baseline
+
+    (tree / "d1" / "nested" / "grown.bin").write_bytes(b"g" * 30_000)
+    shutil.rmtree(tree / "d3")
+    index_incremental_rescan("T:", str(tree))
+    report = growth_report("T:", limit=5)
+    dirs = {d["path"]: d["delta_bytes"] for d in report["directories"]}
+    assert dirs[str(tree / "d1" / "nested")] == 30_000
+    assert dirs[str(tree / "d1")] == 30_000
+    assert dirs[str(tree)] == 30_000 - 500  # d3 held 5 x 100 bytes
+    assert str(tree / "d3") not in dirs
+    assert report["files"] == [{"path": str(tree / "d1" / "nested" / "grown.bin"), "delta_bytes": 30_000}]
+
+    # Unchanged rescan records a generation but no deltas; a range sums both
+    index_incremental_rescan("T:", str(tree))
+    assert growth_report("T:")["directories"] == []
+    assert growth_report("T:", since=0)["directories"][0]["delta_bytes"] == 30_000
+    conn = _get_connection()
+    try:
+        rows = conn.execute("SELECT COUNT(*) FROM dir_growth").fetchone()[0]
+    finally:
+        conn.close()
+    assert rows == 5  # root, d1, d1/nested, d3, d3/nested: only changed dirs are stored
+
+
+def test_large_files_keyset_pages_match_single_query(temp_index_db, tmp_path):
+    from backend.services.index_service import (
+        decode_large_files_cursor,
+        encode_large_files_cursor,
+        index_full_scan_volume,
+        iter_large_files,
+    )
+
+    tree = tmp_path / "tree"
+    tree.mkdir()
+    for i in range(23):
+        (tree / f"f{i:02d}_{'a%b' if i == 7 else 'x'}.bin").write_bytes(b"x" * (100 * (i % 5)))  # many size ties
+    index_full_scan_volume("T:", str(tree))
+    for sort in ("size", "mtime", "path"):
+        for descending in (True, False):
+            whole = list(iter_large_files("T:", 0, sort=sort, descending=descending))
+            paged, after = [], None
+            while True:
+                page = list(iter_large_files("T:", 0, limit=4, sort=sort, descending=descending, after=after))
+                paged += page
+                if len(page) < 4:
+                    break
+                after = decode_large_files_cursor(encode_large_files_cursor(page[-1], sort), sort)
+            assert paged == whole and len(whole) == 23
+    assert [os.path.basename(p) for p, *_ in iter_large_files("T:", 0, name_contains="A%B")] == ["f07_a%b.bin"]
+    assert list(iter_large_files("T:", 0, name_contains="_a_")) == []
+    with pytest.raises(ValueError):
+        decode_large_files_cursor(encode_large_files_cursor(whole[0], "size"), "path")
+
+
+def test_large_files_query_honours_cancel_event(temp_index_db, tmp_path):
+    import threading
+    from backend.core.executors import WorkCancelled
+    from backend.services.index_service import count_large_files, index_full_scan_volume, iter_large_files
+
+    tree = tmp_path / "tree"
+    _make_tree(tree, dirs=2, files_per_dir=3)
+    index_full_scan_volume("T:", str(tree))
+    cancelled = threading.Event()
+    assert count_large_files("T:", 0, cancelled=cancelled) == 7
+    cancelled.set()
+    with pytest.raises(WorkCancelled):
+        list(iter_large_files("T:", 0, cancelled=cancelled))
+    with pytest.raises(WorkCancelled):
+        count_large_files("T:", 0, cancelled=cancelled)
+
+
+def test_name_search_substring_glob_and_sync(temp_index_db, tmp_path):
+    from backend.services.index_service import (
+        _get_connection,
+        index_full_scan_volume,
+        index_incremental_rescan,
+        iter_name_search,
+        remove_file_rows,
+    )
+
+    def names(query, **kw):
+        return sorted(os.path.basename(p) for _r, p, _s, _m in iter_name_search(query, **kw))
+
+    tree = tmp_path / "tree"
+    (tree / "photos" / "2024").mkdir(parents=True)
+    (tree / "docs").mkdir()
+    for rel in ["photos/2024/IMG_2024_0001.jpg", "photos/2024/IMGx2024.jpg", "photos/trip.JPG",
+                "docs/Invoice-March.pdf", "docs/report_final.docx", "docs/café.txt", "docs/年度报告.xlsx"]:
+        (tree / rel).write_bytes(b"x")
+    index_full_scan_volume("T:", str(tree))
+
+    assert names("invoice") == ["Invoice-March.pdf"]
+    assert names("IMG_2024") == ["IMG_2024_0001.jpg"]  # _ is literal, not a LIKE wildcard
+    assert names("*.jpg") == ["IMG_2024_0001.jpg", "IMGx2024.jpg", "trip.JPG"]
+    assert names("img?2024*") == ["IMG_2024_0001.jpg", "IMGx2024.jpg"]
+    assert names("[it]*.jpg") == ["IMG_2024_0001.jpg", "IMGx2024.jpg", "trip.JPG"]
+    assert names("CAFÉ") == ["café.txt"]
+    assert names("报告") == names("度报告") == names("*报告*") == ["年度报告.xlsx"]  # short multi-byte runs scan
+    assert names("docs") == []  # directory names are not file names
+    assert names("jpg", volume="X:") == []
+    first = list(iter_name_search("*.jpg", limit=2))
+    rest = list(iter_name_search("*.jpg", after=first[-1][0]))
+    assert len(first) == 2 and len(rest) == 1 and first[-1][0] < rest[0][0]
+
+    # Incremental rescan: create, delete, rename, subtree removal
+    (tree / "docs" / "new_invoice.pdf").write_bytes(b"y")
+    (tree / "docs" / "Invoice-March.pdf").rename(tree / "docs" / "Invoice-April.pdf")
+    shutil.rmtree(tree / "photos" / "2024")
+    index_incremental_rescan("T:", str(tree))
+    assert names("invoice") == ["Invoice-April.pdf", "new_invoice.pdf"]
+    assert names("*.jpg") == ["trip.JPG"]
+    remove_file_rows([str(tree / "docs" / "new_invoice.pdf")])
+    assert names("invoice") == ["Invoice-April.pdf"]
+    conn = _get_connection()
+    try:
+        counts = conn.execute("SELECT (SELECT COUNT(*) FROM file_index), (SELECT COUNT(*) FROM file_name_fts)").fetchone()
+    finally:
+        conn.close()
+    assert counts[0] == counts[1] == 5
+
+
+def test_name_search_backfills_older_databases(temp_index_db, monkeypatch, tmp_path):
+    import backend.services.index_service as index_mod
+    from backend.services.index_service import (
+        _get_connection,
+        backfill_name_search,
+        index_full_scan_volume,
+        iter_name_search,
+        name_search_ready,
+    )
+
+    monkeypatch.setattr(index_mod, "BATCH_SLEEP_SECONDS", 0)
+    tree = tmp_path / "tree"
+    tree.mkdir()
+    for name in ("old_backup.zip", "a.txt", "b.txt"):
+        (tree / name).write_bytes(b"x")
+    index_full_scan_volume("T:", str(tree))
+    assert name_search_ready()
+    conn = _get_connection()
+    try:
+        with conn:
+            conn.execute("DELETE FROM file_name_fts")
+            conn.execute("PRAGMA user_version = 0")
+    finally:
+        conn.close()
+    # Not backfilled yet: searched by scanning file_index, nothing blocks
+    assert not name_search_ready()
+    assert [os.path.basename(p) for _r, p, _s, _m in iter_name_search("backup")] == ["old_backup.zip"]
+    assert backfill_name_search(batch_rows=2) == 3
+    assert name_search_ready()
+    assert sorted(os.path.basename(p) for _r, p, _s, _m in iter_name_search("*.TXT")) == ["a.txt", "b.txt"]
+    assert backfill_name_search() == 0
+
+
+def test_parked_scan_does_not_block_other_index_users(temp_index_db, monkeypatch, tmp_path):
+    import threading
+    import time
+    import backend.services.index_service as index_mod
+    from backend.services.index_service import index_full_scan_volume, remove_file_rows
+    from backend.services.resource_guard import PauseToken, pause_scope
+
+    monkeypatch.setattr(index_mod, "BATCH_SLEEP_SECONDS", 0)
+    monkeypatch.setattr(index_mod, "BATCH_DIRS_BEFORE_SLEEP", 2)
+    tree = tmp_path / "tree"
+    _make_tree(tree, dirs=4, files_per_dir=2)
+    index_full_scan_volume("T:", str(tree))
+    token = PauseToken()
+    token.pause()
+
+    def scan():
+        with pause_scope(token):
+            index_full_scan_volume("T:", str(tree))
+
+    t = threading.Thread(target=scan, daemon=True)
+    t.start()
+    deadline = time.monotonic() + 5
+    while not token.parked:
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+    # The scan is parked mid-walk; readers and writers still get through
+    big = str(tree / "d0" / "nested" / "big.bin")
+    seen = []
+
+    def use_index():
+        seen.append([r["path"] for r in query_large_files("T:", 40_000)])
+        os.remove(big)
+        remove_file_rows([big])
+        seen.append(query_large_files("T:", 40_000))
+
+    user = threading.Thread(target=use_index, daemon=True)
+    user.start()
+    user.join(5)
+    assert not user.is_alive() and seen == [[big], []]
+    token.resume()
+    t.join(5)
+    assert not t.is_alive()
@@ -0,0 +1,65 @@
+"""
+Unit tests for junk_policy: age report and candidate selection over index
+columns, with NumPy and with the pure-Python fallback.
+"""
+from array import array
+import pytest
+import backend.services.junk_policy as policy_mod
+from backend.services.junk_policy import (
+    NS_PER_DAY,
+    JunkColumns,
+    JunkPolicy,
+    age_report,
+    select_candidates,
+)
+
+NOW = 1_700_000_000.0
+
+
+def _columns():
+    now_ns = int(NOW * 1_000_000_000)
+    ages = [1, 10, 40, 100, 200]
+    sizes = [1, 10, 100, 1000, 10000]
+    return JunkColumns(
+        paths=[f"/junk/f{a}" for a in ages],
+        sizes=array("q", sizes),
+        mtimes=array("q", [now_ns - a * NS_PER_DAY for a in ages]),
+        atimes=array("q", [now_ns - NS_PER_DAY // 2] * len(ages)),
+        categories=array("b", [0, 0, 1, 1, 1]),
+        category_names=["temp", "browser_cache"],
+    )
+
+
+@pytest.fixture(params=["numpy", "fallback"])
+def backend_impl(request, monkeypatch):
+    if request.param == "numpy":
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(policy_mod, "np", None)
+    return request.param
+
+
+def test_age_report_cutoffs(backend_impl):
+    report = age_report([7, 30, 90], cols=_columns(), now=NOW)
+    assert report["total_bytes"] == 11111
+    assert [(c["days"], c["files"], c["bytes"]) for c in report["cutoffs"]] == [
+        (7, 4, 11110),
+        (30, 3, 11100),
+        (90, 2, 11000),
+    ]
+    assert sum(h["bytes"] for h in report["histogram"]) == 11111
+    assert report["percentile_days"]["p50"] == 40
+
+
+def test_age_report_atime_basis(backend_impl):
+    report = age_report([7], age_basis="atime", cols=_columns(), now=NOW)
+    assert report["cutoffs"][0]["bytes"] == 0
+
+
+def test_select_candidates(backend_impl):
+    picked = select_candidates(
+        JunkPolicy(min_age_days=30, min_size_bytes=500, categories=["browser_cache"]),
+        cols=_columns(),
+        now=NOW,
+    )
+    assert [p["path"] for p in picked] == ["/junk/f200", "/junk/f100"]
@@ -0,0 +1,96 @@
+"""
+Unit tests for junk_service: root dedupe, full-depth sizing, category
+breakdown and the mtime-keyed cache.
+"""
+import os
+import pytest
+from backend.services.junk_service import (
+    CATEGORY_BROWSER_CACHE,
+    CATEGORY_TEMP,
+    JunkAnalyzer,
+    get_junk_roots,
+)
+
+
+@pytest.fixture
+def junk_env(monkeypatch, tmp_path):
+    """LOCALAPPDATA with a Temp dir that TEMP and TMP both point to, plus a deep Chrome cache."""
+    local = tmp_path / "Local"
+    temp = local / "Temp"
+    temp.mkdir(parents=True)
+    (temp / "a.tmp").write_bytes(b"x" * 100)
+    cache = local / "Google" / "Chrome" / "User Data" / "Default" / "Cache"
+    deep = cache / "Cache_Data" / "f" / "00"
+    deep.mkdir(parents=True)
+    (deep / "blob").write_bytes(b"y" * 1000)
+    monkeypatch.setenv("LOCALAPPDATA", str(local))
+    monkeypatch.setenv("TEMP", str(temp))
+    monkeypatch.setenv("TMP", str(temp) + os.sep)
+    return local
+
+
+def test_get_junk_roots_dedupes_temp(junk_env):
+    roots = get_junk_roots()
+    temps = [p for p, c in roots if c == CATEGORY_TEMP]
+    assert len(temps) == 1
+    assert len(roots) == 2
+
+
+def test_analyze_full_depth_by_category(junk_env):
+    report = JunkAnalyzer().analyze()
+    assert report.total_bytes == 1100
+    assert report.by_category == {CATEGORY_TEMP: 100, CATEGORY_BROWSER_CACHE: 1000}
+
+
+def test_analyze_reuses_unchanged_dirs(junk_env):
+    analyzer = JunkAnalyzer()
+    first = analyzer.analyze()
+    assert sum(r.dirs_cached for r in first.roots) == 0
+    second = analyzer.analyze()
+    assert second.total_bytes == first.total_bytes
+    assert sum(r.dirs_listed for r in second.roots) == 0
+
+    (junk_env / "Temp" / "b.tmp").write_bytes(b"z" * 50)
+    third = analyzer.analyze()
+    assert third.by_category[CATEGORY_TEMP] == 150
+    assert sum(r.dirs_listed for r in third.roots) == 1
+
+
+def test_analyze_time_budget_marks_partial(junk_env):
+    report = JunkAnalyzer(time_budget_seconds=-1).analyze()
+    assert all(r.partial for r in report.roots)
+
+
+def test_analyze_notifies_listeners(junk_env):
+    analyzer = JunkAnalyzer()
+    seen = []
+    analyzer.add_listener(lambda report: seen.append(report.total_bytes))
+    analyzer.add_listener(lambda report: 1 / 0)  # a failing listener does not break analyze
+    assert analyzer.analyze().total_bytes == 1100
+    assert seen == [1100]
+
+
+def test_junk_roots_and_index_rows_agree_through_symlinks(junk_env, monkeypatch, tmp_path):
+    import backend.services.index_service as index_mod
+    from backend.services.index_service import index_full_scan_volume, iter_rows_under
+
+    monkeypatch.setattr(index_mod, "INDEX_DB_DIR", str(tmp_path / "db"))
+    link = tmp_path / "temp-link"
+    link.symlink_to(junk_env / "Temp", target_is_directory=True)
+    monkeypatch.setenv("TEMP", str(link))
+    index_full_scan_volume("T:", str(junk_env))
+    temp_root = [p for p, c in get_junk_roots() if c == CATEGORY_TEMP]
+    assert temp_root == [os.path.realpath(junk_env / "Temp")]
+    expected = [os.path.join(temp_root[0], "a.tmp")]
+    assert [r[0] for r in iter_rows_under(temp_root[0])] == expected
+    assert [r[0] for r in iter_rows_under(str(link))] == expected
+
+
+def test_analyze_does_not_follow_links(junk_env, tmp_path):
+    outside = tmp_path / "outside"
+    outside.mkdir()
+    (outside / "huge.bin").write_bytes(b"z" * 5000)
+    (junk_env / "Temp" / "linked-dir").symlink_to(outside, target_is_directory=True)
+    (junk_env / "Temp" / "linked-file").symlink_to(outside / "huge.bin")
+    report = JunkAnalyzer().analyze()
+    assert report.by_category == {CATEGORY_TEMP: 100, CATEGORY_BROWSER_CACHE: 1000}
@@ -0,0 +1,84 @@
+"""
+Tests for the metrics subsystem: HDR bucket layout and quantile accuracy,
+Prometheus / JSON rendering, and the values recorded by the API middleware,
+the index walker and SQLite query timing.
+"""
+import random
+
+from fastapi.testclient import TestClient
+
+import backend.services.index_service as index_mod
+from backend.core import metrics
+from backend.core.metrics import HdrHistogram, MetricsRegistry, bucket_bounds, bucket_index
+from backend.main import app
+
+
+def test_buckets_are_contiguous_and_relative_error_bounded():
+    for idx in range(metrics.BUCKET_COUNT):
+        lo, hi = bucket_bounds(idx)
+        assert bucket_index(lo) == idx and bucket_index(hi - 1) == idx
+        if idx >= metrics.LINEAR_LIMIT:
+            assert (hi - lo) / lo <= 1 / metrics.SUB_BUCKETS
+    assert bucket_index(10**15) == metrics.BUCKET_COUNT - 1  # clamped, not out of range
+
+
+def test_quantiles_within_bucket_precision():
+    rng = random.Random(7)
+    values = sorted(int(rng.lognormvariate(13, 1.5)) for _ in range(5000))  # ~0.4 ms median
+    h = HdrHistogram()
+    for v in values:
+        h.record_ns(v)
+    for q in (0.5, 0.9, 0.99):
+        exact = values[int(q * len(values)) - 1] / 1e9
+        assert abs(h.quantile(q) - exact) / exact < 0.07
+    assert h.max_ns == values[-1]
+
+
+def test_prometheus_and_json_rendering():
+    reg = MetricsRegistry()
+    lat = reg.histogram("op_seconds", "Op latency.", ("op",))
+    lat.labels("read").observe(0.003)
+    lat.labels("read").observe(0.2)
+    reg.counter("things_total", "Things.").inc(3)
+    reg.gauge("depth", "Depth.", ("queue",)).set_function(lambda: 4, "q1")
+    text = reg.render_prometheus()
+    assert "# TYPE op_seconds histogram" in text
+    assert 'op_seconds_bucket{op="read",le="0.001"} 0' in text
+    assert 'op_seconds_bucket{op="read",le="0.005"} 1' in text
+    assert 'op_seconds_bucket{op="read",le="+Inf"} 2' in text
+    assert 'op_seconds_count{op="read"} 2' in text
+    assert "things_total 3" in text
+    assert 'depth{queue="q1"} 4' in text
+    data = reg.to_dict()["metrics"]
+    assert data["things_total"]["series"][0]["value"] == 3
+    read = data["op_seconds"]["series"][0]
+    assert read["labels"] == {"op": "read"} and read["count"] == 2
+    assert abs(read["max"] - 0.2) < 1e-6
+
+
+def test_api_metrics_reports_routes_walker_and_sqlite(monkeypatch, tmp_path):
+    monkeypatch.setattr(index_mod, "INDEX_DB_DIR", str(tmp_path / "db"))
+    tree = tmp_path / "tree"
+    for d in range(3):
+        (tree / f"d{d}").mkdir(parents=True)
+        for f in range(4):
+            (tree / f"d{d}" / f"f{f}.bin").write_bytes(b"x" * 10)
+    walked = metrics.SCAN_DIRS_WALKED.labels("index").value
+    stats_before = metrics.SCAN_STAT_CALLS.labels("index").value
+    index_mod.index_full_scan_volume("T:", str(tree))
+    assert metrics.SCAN_DIRS_WALKED.labels("index").value - walked == 4
+    assert metrics.SCAN_STAT_CALLS.labels("index").value - stats_before >= 12
+
+    client = TestClient(app)
+    client.get("/api/health")
+    client.get("/api/scan/large-files", params={"drive": "T", "min_size_mb": 0})
+    data = client.get("/api/metrics", params={"format": "json"}).json()["metrics"]
+    routes = {s["labels"]["route"] for s in data["http_request_duration_seconds"]["series"]}
+    assert {"/api/health", "/api/scan/large-files"} <= routes
+    queries = {s["labels"]["query"] for s in data["sqlite_query_duration_seconds"]["series"]}
+    assert {"index_write", "large_files"} <= queries
+
+    text = client.get("/api/metrics")
+    assert text.headers["content-type"].startswith("text/plain")
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/health",status="200"}' in text.text
+    assert client.get("/api/metrics", params={"format": "xml"}).status_code == 400
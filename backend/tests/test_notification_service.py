@@ -0,0 +1,324 @@
+"""
+Unit tests for notification_service: de-duplication, batching, rate limit,
+the email channel against a local SMTP stand-in and the toast channel
+against a fake notifier; plus threshold hysteresis in monitor_service and
+the asynchronous dispatcher (non-blocking send, overflow merge, retries,
+kept-open SMTP session).
+"""
+import socket
+import threading
+import time
+
+import pytest
+
+import backend.services.notification_service as notif_mod
+from backend.core.config import AppSettings, DiskThresholdConfig, NotificationConfig
+from backend.services.notification_service import (
+    AlertPipeline,
+    EmailChannel,
+    NotificationDispatcher,
+    ToastChannel,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class RecordingChannel:
+    def __init__(self) -> None:
+        self.sent: list[tuple[str, str]] = []
+
+    def send(self, title: str, message: str) -> None:
+        self.sent.append((title, message))
+
+
+class SmtpStandIn:
+    """Minimal SMTP server on localhost: no STARTTLS, AUTH PLAIN only if auth; records messages, logins and connections."""
+
+    def __init__(self, auth: bool = False) -> None:
+        self.auth = auth
+        self.logins: list[str] = []
+        self.sock = socket.socket()
+        self.sock.bind(("127.0.0.1", 0))
+        self.sock.listen(5)
+        self.port = self.sock.getsockname()[1]
+        self.connections = 0
+        self.messages: list[str] = []
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+
+    def _serve(self) -> None:
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            self.connections += 1
+            with conn, conn.makefile("rb") as rf:
+                conn.sendall(b"220 localhost ESMTP\r\n")
+                while True:
+                    line = rf.readline()
+                    if not line:
+                        break
+                    cmd = line[:4].upper()
+                    if cmd == b"EHLO":
+                        extra = b"250-AUTH PLAIN\r\n" if self.auth else b""
+                        conn.sendall(b"250-localhost\r\n" + extra + b"250 8BITMIME\r\n")
+                    elif cmd == b"AUTH":
+                        self.logins.append(line.decode().strip())
+                        conn.sendall(b"235 ok\r\n")
+                    elif cmd == b"DATA":
+                        conn.sendall(b"354 go ahead\r\n")
+                        data = []
+                        for body_line in rf:
+                            if body_line == b".\r\n":
+                                break
+                            data.append(body_line)
+                        self.messages.append(b"".join(data).decode("utf-8", "replace"))
+                        conn.sendall(b"250 queued\r\n")
+                    elif cmd == b"QUIT":
+                        conn.sendall(b"221 bye\r\n")
+                        break
+                    else:
+                        conn.sendall(b"250 OK\r\n")
+
+    def close(self) -> None:
+        self.sock.close()
+
+
+@pytest.fixture
+def smtp_server():
+    server = SmtpStandIn()
+    yield server
+    server.close()
+
+
+def _settings(**notification) -> AppSettings:
+    return AppSettings(notification=NotificationConfig(**notification))
+
+
+def test_keyed_alert_latches_until_rearmed():
+    channel = RecordingChannel()
+    pipeline = AlertPipeline([channel], batch_window=0)
+    assert pipeline.submit("低", "C: 5%", key="disk:C:")
+    assert not pipeline.submit("低", "C: 4%", key="disk:C:")
+    pipeline.rearm("disk:C:")
+    assert pipeline.submit("低", "C: 5%", key="disk:C:")
+    assert len(channel.sent) == 2
+
+
+def test_alerts_within_window_become_one_digest():
+    clock = FakeClock()
+    channel = RecordingChannel()
+    pipeline = AlertPipeline([channel], batch_window=60, clock=clock)
+    pipeline.submit("磁盘空间不足", "C: 剩余 5%")
+    clock.now += 30
+    pipeline.submit("清理提醒", "D:\\Videos 发现 3 个文件")
+    assert pipeline.flush() == 0  # window still open
+    clock.now += 31
+    assert pipeline.flush() == 2
+    assert len(channel.sent) == 1
+    title, message = channel.sent[0]
+    assert "2" in title
+    assert "C: 剩余 5%" in message and "D:\\Videos" in message
+
+
+def test_rate_limit_holds_and_merges():
+    clock = FakeClock()
+    channel = RecordingChannel()
+    pipeline = AlertPipeline([channel], batch_window=0, max_per_hour=2, clock=clock)
+    for i in range(4):
+        pipeline.submit("t", f"m{i}")
+    assert len(channel.sent) == 2
+    clock.now += 3600
+    assert pipeline.flush() == 2  # m2 and m3 merged into one digest
+    assert len(channel.sent) == 3
+    assert "m2" in channel.sent[2][1] and "m3" in channel.sent[2][1]
+
+
+def test_email_digest_uses_one_smtp_session(monkeypatch, smtp_server):
+    monkeypatch.setattr(notif_mod, "load_config", lambda: _settings(
+        email_enabled=True, smtp_host="127.0.0.1", smtp_port=smtp_server.port,
+        smtp_use_tls=False, notify_email_to="me@example.com",
+    ))
+    clock = FakeClock()
+    pipeline = AlertPipeline([EmailChannel()], batch_window=60, clock=clock)
+    pipeline.submit("磁盘空间不足", "C: 剩余 5%")
+    pipeline.submit("磁盘空间不足", "D: 剩余 3%")
+    pipeline.flush(force=True)
+    pipeline.channels[0].close()
+    assert smtp_server.connections == 1
+    assert len(smtp_server.messages) == 1
+    assert "me@example.com" in smtp_server.messages[0]
+
+
+def test_toast_channel_uses_notifier(monkeypatch):
+    monkeypatch.setattr(notif_mod, "load_config", lambda: _settings(use_windows_toast=True))
+    sent = []
+
+    class FakeNotifier:
+        def send(self, title, message):
+            sent.append((title, message))
+
+    created = []
+
+    def factory():
+        created.append(1)
+        return FakeNotifier()
+
+    toast = ToastChannel(notifier_factory=factory)
+    toast.send("t", "m")
+    toast.send("t2", "m2")
+    assert sent == [("t", "m"), ("t2", "m2")]
+    assert len(created) == 1  # notifier reused across messages
+    monkeypatch.setattr(notif_mod, "load_config", lambda: _settings(use_windows_toast=False))
+    toast.send("t", "m")
+    assert len(sent) == 2
+
+
+def test_disk_threshold_hysteresis(monkeypatch):
+    import backend.services.monitor_service as monitor_mod
+    from backend.utils.disk import DriveUsage
+
+    free = {"pct": 5.0}
+
+    class FakeSampler:
+        def latest_all(self):
+            total = 1000
+            f = int(total * free["pct"] / 100)
+            return [DriveUsage("C:", total, total - f, f)]
+
+    channel = RecordingChannel()
+    pipeline = AlertPipeline([channel], batch_window=0)
+    monkeypatch.setattr(monitor_mod, "get_disk_sampler", lambda: FakeSampler())
+    monkeypatch.setattr(monitor_mod, "get_alert_pipeline", lambda: pipeline)
+    monkeypatch.setattr(monitor_mod, "notify_alert", pipeline.submit)
+    monkeypatch.setattr(monitor_mod, "is_under_load", lambda: False)
+    monkeypatch.setattr(monitor_mod, "load_config", lambda: AppSettings(
+        disk_thresholds=[DiskThresholdConfig(free_percent_alert_below=10)]
+    ))
+
+    monitor_mod.check_disk_thresholds()
+    monitor_mod.check_disk_thresholds()
+    assert len(channel.sent) == 1
+    free["pct"] = 11.0  # above the threshold but inside the re-arm margin
+    monitor_mod.check_disk_thresholds()
+    free["pct"] = 9.0
+    monitor_mod.check_disk_thresholds()
+    assert len(channel.sent) == 1
+    free["pct"] = 13.0  # recovered past the margin: re-armed
+    monitor_mod.check_disk_thresholds()
+    free["pct"] = 9.0
+    monitor_mod.check_disk_thresholds()
+    assert len(channel.sent) == 2
+
+
+def test_dispatcher_send_does_not_wait_for_slow_channel():
+    release = threading.Event()
+    delivered = []
+
+    class SlowChannel(RecordingChannel):
+        def send(self, title, message):
+            release.wait(5)
+            delivered.append(title)
+
+    dispatcher = NotificationDispatcher([SlowChannel()])
+    start = time.monotonic()
+    dispatcher.send("a", "1")
+    dispatcher.send("b", "2")
+    assert time.monotonic() - start < 0.5
+    release.set()
+    assert dispatcher.join()
+    assert delivered == ["a", "b"]
+    dispatcher.stop()
+
+
+def test_dispatcher_merges_on_overflow():
+    release = threading.Event()
+    channel = RecordingChannel()
+
+    class Gate:
+        def send(self, title, message):
+            release.wait(5)
+
+        def close_idle(self, now):
+            pass
+
+    dispatcher = NotificationDispatcher([Gate(), channel], maxsize=2)
+    dispatcher.send("first", "0")  # taken by the worker, blocked in Gate
+    time.sleep(0.1)
+    for i in range(1, 5):
+        dispatcher.send(f"t{i}", f"m{i}")
+    assert dispatcher.merged == 2
+    release.set()
+    assert dispatcher.join()
+    assert [t for t, _ in channel.sent] == ["first", "t1", "t2"]
+    assert "m3" in channel.sent[2][1] and "m4" in channel.sent[2][1]
+    dispatcher.stop()
+
+
+def test_dispatcher_retries_only_the_failing_channel():
+    ok = RecordingChannel()
+    attempts = []
+
+    class Flaky:
+        name = "flaky"
+
+        def send(self, title, message):
+            attempts.append(title)
+            if len(attempts) < 3:
+                raise OSError("connection refused")
+
+    dispatcher = NotificationDispatcher([ok, Flaky()], max_retries=3, backoff_seconds=0.01)
+    dispatcher.send("t", "m")
+    assert dispatcher.join()
+    assert len(attempts) == 3
+    assert ok.sent == [("t", "m")]
+    dispatcher.stop()
+
+
+def test_email_session_kept_open_until_idle(monkeypatch, smtp_server):
+    monkeypatch.setattr(notif_mod, "load_config", lambda: _settings(
+        email_enabled=True, smtp_host="127.0.0.1", smtp_port=smtp_server.port,
+        smtp_use_tls=False, notify_email_to="me@example.com",
+    ))
+    clock = FakeClock()
+    email = EmailChannel(idle_timeout=60, clock=clock)
+    email.send("a", "1")
+    email.send("b", "2")
+    email.close_idle(clock.now + 30)
+    email.send("c", "3")
+    assert smtp_server.connections == 1
+    email.close_idle(clock.now + 61)
+    email.send("d", "4")
+    email.close()
+    assert smtp_server.connections == 2
+    assert len(smtp_server.messages) == 4
+
+
+def test_email_refuses_cleartext_login_without_opt_in(monkeypatch):
+    import smtplib
+
+    server = SmtpStandIn(auth=True)
+    try:
+        settings = dict(
+            email_enabled=True, smtp_host="127.0.0.1", smtp_port=server.port, smtp_use_tls=False,
+            smtp_user="me", smtp_password="secret", notify_email_to="me@example.com",
+        )
+        monkeypatch.setattr(notif_mod, "load_config", lambda: _settings(**settings))
+        email = EmailChannel()
+        with pytest.raises(smtplib.SMTPNotSupportedError):
+            email.send("a", "1")
+        assert server.logins == [] and server.messages == []
+
+        settings["smtp_allow_plain_login"] = True
+        email.send("b", "2")
+        email.close()
+        assert len(server.logins) == 1 and len(server.messages) == 1
+    finally:
+        server.close()
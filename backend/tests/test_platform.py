@@ -0,0 +1,234 @@
+"""
+Tests for the platform layer: selection, the fake platform end to end (volumes,
+journal, recycle bin, autostart, API), the freedesktop trash, and identical
+index / rule-scan results for one tree seen through two platforms.
+"""
+import os
+import time
+from urllib.parse import quote
+
+import pytest
+
+import backend.utils.volumes as volumes_mod
+from backend.platform import get_platform, set_platform
+from backend.platform.base import CHANGE_CREATE, CHANGE_DELETE
+from backend.platform.fake import FakePlatform
+from backend.platform.posix import FreedesktopTrash, MountPointProbe, PosixPlatform
+
+
+@pytest.fixture
+def use_platform(monkeypatch):
+    """Install a platform (and a fresh volume registry) for one test."""
+    previous = set_platform(None)
+    monkeypatch.setattr(volumes_mod, "_registry", None)
+
+    def install(platform):
+        set_platform(platform)
+        volumes_mod._registry = None
+        return platform
+
+    yield install
+    set_platform(previous)
+
+
+@pytest.fixture
+def temp_index_db(monkeypatch, tmp_path):
+    import backend.services.index_service as index_mod
+    monkeypatch.setattr(index_mod, "INDEX_DB_DIR", str(tmp_path / "db"))
+    monkeypatch.setattr(index_mod, "BATCH_SLEEP_SECONDS", 0)
+    return tmp_path / "db"
+
+
+def _make_tree(root):
+    for i in range(3):
+        sub = root / f"d{i}" / "nested"
+        sub.mkdir(parents=True)
+        for j in range(4):
+            (sub / f"f{j}.log").write_bytes(b"x" * (100 + j))
+    (root / "d0" / "big.bin").write_bytes(b"y" * 60_000)
+    (root / "d2" / "nested" / "big.tmp").write_bytes(b"z" * 40_000)
+
+
+def test_platform_selection(use_platform, monkeypatch, tmp_path):
+    monkeypatch.setenv("WINDOWS_CLEANER_PLATFORM", "fake")
+    monkeypatch.setenv("WINDOWS_CLEANER_FAKE_VOLUMES", f"B:={tmp_path};bad")
+    platform = get_platform()
+    assert platform.name == "fake" and platform.volumes == [("B:", str(tmp_path))]
+    assert get_platform() is platform
+
+    monkeypatch.setenv("WINDOWS_CLEANER_PLATFORM", "")
+    set_platform(None)
+    assert isinstance(get_platform(), PosixPlatform)  # tests run on POSIX
+
+
+def test_fake_platform_volumes_and_api(use_platform, temp_index_db, tmp_path, monkeypatch):
+    from fastapi.testclient import TestClient
+    import backend.services.idle_scheduler as idle_mod
+    from backend.main import app
+    from backend.utils.disk import get_fixed_drives
+
+    class AlwaysIdle:
+        def snapshot(self):
+            return idle_mod.IdleState()
+
+    sched = idle_mod.IdleScheduler(provider=AlwaysIdle(), settle_seconds=0)
+    monkeypatch.setattr(idle_mod, "_scheduler", sched)
+
+    tree = tmp_path / "tree"
+    _make_tree(tree)
+    use_platform(FakePlatform(volumes=[("B:", str(tree)), ("D:", str(tmp_path / "missing"))]))
+    assert get_fixed_drives() == ["B:"]
+
+    client = TestClient(app)
+    assert client.get("/api/disk/usage/B").json()["drive"] == "B:"
+    r = client.post("/api/scan/rebuild-index", json={"drive": "B"})
+    assert r.json() == {"status": "queued", "drive": "B:", "incremental": False}
+    assert client.post("/api/scan/rebuild-index", json={"drive": "B"}).json()["status"] == "already_queued"
+    assert [q["name"] for q in sched.status()["queued"]] == ["index_rebuild B:"]
+    deadline = time.monotonic() + 10
+    while True:
+        sched.tick()
+        items = client.get("/api/scan/large-files", params={"drive": "B", "min_size_mb": 0.05}).json()["items"]
+        if items or time.monotonic() > deadline:
+            break
+        time.sleep(0.05)
+    assert [os.path.relpath(i["path"], tree) for i in items] == [os.path.join("d0", "big.bin")]
+
+
+def test_fake_change_journal_cursor():
+    journal = FakePlatform().change_journal
+    journal.record("B:", "/t/a", CHANGE_CREATE)
+    journal.record("B:", "/t/b", CHANGE_DELETE)
+    first = journal.read("B:", max_records=1)
+    assert [r.path for r in first.records] == ["/t/a"]
+    rest = journal.read("B:", first.cursor)
+    assert [(r.path, r.reason) for r in rest.records] == [("/t/b", CHANGE_DELETE)]
+    assert journal.read("B:", rest.cursor).records == []
+
+
+def test_usn_journal_cursor_stops_at_last_record_read(monkeypatch):
+    import backend.utils.usn_journal as usn_mod
+    from backend.platform.windows import UsnChangeJournal
+
+    log = [usn_mod.UsnRecord(path=f"f{i}", reason=0, is_directory=False, usn=100 + 10 * i) for i in range(3)]
+    monkeypatch.setattr(usn_mod, "query_usn_journal", lambda drive: {"NextUsn": 130})
+    monkeypatch.setattr(
+        usn_mod,
+        "read_usn_journal",
+        lambda drive, start_usn=0, max_records=1000: iter(
+            [r for r in log if r.usn >= start_usn][:max_records]
+        ),
+    )
+    journal = UsnChangeJournal()
+    first = journal.read("C:", 0, max_records=2)
+    assert [r.path for r in first.records] == ["f0", "f1"] and first.cursor == 111
+    rest = journal.read("C:", first.cursor, max_records=2)
+    assert [r.path for r in rest.records] == ["f2"] and rest.cursor == 130
+
+
+def test_recycle_backend_uses_platform_bin(use_platform, tmp_path):
+    from backend.services.cleanup_service import RecycleBinBackend, get_cleanup_backend
+
+    platform = use_platform(FakePlatform())
+    platform.recycle_bin._bin_dir = str(tmp_path / "bin")
+    os.makedirs(platform.recycle_bin.bin_dir)
+    victim = tmp_path / "old.log"
+    victim.write_bytes(b"x")
+    backend = get_cleanup_backend("recycle")
+    assert isinstance(backend, RecycleBinBackend)
+    assert backend.dispose_batch([str(victim)], "run") == [str(victim)]
+    assert not victim.exists()
+    assert [orig for orig, _ in platform.recycle_bin.sent] == [str(victim)]
+
+
+def test_autostart_goes_through_platform(use_platform):
+    from backend.utils.startup import get_start_with_windows, set_start_with_windows
+
+    platform = use_platform(FakePlatform())
+    set_start_with_windows(True, "cleaner --gui")
+    assert get_start_with_windows() and platform.autostart.command == "cleaner --gui"
+    set_start_with_windows(False)
+    assert not get_start_with_windows()
+
+
+def test_freedesktop_trash_writes_trashinfo(tmp_path):
+    trash = FreedesktopTrash(str(tmp_path / "Trash"))
+    src = tmp_path / "a dir"
+    src.mkdir()
+    for _ in range(2):
+        (src / "x.log").write_bytes(b"1")
+        assert trash.send([str(src / "x.log")]) == [str(src / "x.log")]
+    assert sorted(os.listdir(tmp_path / "Trash" / "files")) == ["x.log", "x.log.2"]
+    info = (tmp_path / "Trash" / "info" / "x.log.trashinfo").read_text(encoding="utf-8")
+    assert info.startswith("[Trash Info]\n")
+    assert f"Path={quote(str(src / 'x.log'), safe='/')}\n" in info
+    assert trash.send([str(src / "gone.log")]) == []
+
+
+class _TwoDeviceTrash(FreedesktopTrash):
+    """Everything under one of `mounts` counts as its own device."""
+
+    def __init__(self, trash_dir, mounts):
+        super().__init__(trash_dir)
+        self.mounts = [str(m) for m in mounts]
+
+    def _device(self, path):
+        for i, mount in enumerate(self.mounts, 2):
+            if path == mount or path.startswith(mount + os.sep):
+                return i
+        return 1
+
+
+def test_freedesktop_trash_uses_per_mount_trash(tmp_path):
+    mnt, bad = tmp_path / "mnt", tmp_path / "bad"
+    (mnt / "data").mkdir(parents=True)
+    bad.mkdir()
+    (bad / f".Trash-{os.getuid()}").write_text("not a directory")
+    victim, stuck = mnt / "data" / "big.iso", bad / "big.iso"
+    victim.write_bytes(b"x")
+    stuck.write_bytes(b"x")
+    trash = _TwoDeviceTrash(str(tmp_path / "home" / "Trash"), [mnt, bad])
+
+    assert trash.send([str(victim), str(stuck)]) == [str(victim)]
+    mount_trash = mnt / f".Trash-{os.getuid()}"
+    assert os.listdir(mount_trash / "files") == ["big.iso"]
+    info = (mount_trash / "info" / "big.iso.trashinfo").read_text(encoding="utf-8")
+    assert "Path=data/big.iso\n" in info
+    assert stuck.exists()  # no usable trash on that mount: reported as not sent
+    assert not (tmp_path / "home" / "Trash" / "files").exists()
+
+
+def test_freedesktop_trash_failure_on_one_path_does_not_stop_the_rest(tmp_path):
+    broken = tmp_path / "broken"
+    (broken / f".Trash-{os.getuid()}").mkdir(parents=True)
+    (broken / f".Trash-{os.getuid()}" / "info").write_text("not a directory")
+    stuck, victim = broken / "a.log", tmp_path / "b.log"
+    stuck.write_bytes(b"x")
+    victim.write_bytes(b"x")
+    trash = _TwoDeviceTrash(str(tmp_path / "home" / "Trash"), [broken])
+
+    assert trash.send([str(stuck), str(victim)]) == [str(victim)]
+    assert stuck.exists() and not victim.exists()
+
+
+def test_index_and_rule_scan_identical_across_platforms(use_platform, temp_index_db, tmp_path):
+    from backend.services.index_service import index_full_scan_volume, iter_large_files
+    from backend.services.monitor_service import run_rule_scan
+
+    tree = tmp_path / "tree"
+    _make_tree(tree)
+    results = []
+    for platform in (PosixPlatform(), FakePlatform(volumes=[("B:", str(tree))])):
+        use_platform(platform)
+        if isinstance(platform, PosixPlatform):
+            platform.volume_probe = lambda: MountPointProbe(mounts=[(str(tree), "ext4")])
+        (volume,) = volumes_mod.get_volume_registry().volumes()
+        index_full_scan_volume(volume.drive, volume.root)
+        indexed = {(os.path.relpath(p, tree), s, m) for p, s, m in iter_large_files(volume.drive, 1)}
+        scanned = {
+            (os.path.relpath(r["path"], tree), r["size_bytes"], r["mtime_ns"])
+            for r in run_rule_scan({"rule_type": "by_extension", "target_path": volume.root, "extensions": [".log", ".tmp"]})
+        }
+        results.append((indexed, scanned))
+    assert results[0] == results[1]
+    assert len(results[0][0]) == 14 and len(results[0][1]) == 13
@@ -0,0 +1,116 @@
+"""
+Tests for the opt-in profiler: stack sampling into collapsed stacks, cProfile
+sessions and their time / size bounds, and the ?profile= request flag with
+the listing and download endpoints.
+"""
+import pstats
+import threading
+import time
+
+from fastapi.testclient import TestClient
+
+from backend.core import profiler
+from backend.core.profiler import StackSampler, profiling, write_folded
+from backend.main import app
+
+
+def _busy_loop(stop: threading.Event) -> None:
+    while not stop.is_set():
+        sum(i * i for i in range(200))
+
+
+def test_sampler_counts_busy_thread_and_skips_parked_ones():
+    stop = threading.Event()
+    worker = threading.Thread(target=_busy_loop, args=(stop,), name="busy-worker")
+    parked = threading.Thread(target=stop.wait, name="parked-worker")
+    worker.start()
+    parked.start()
+    sampler = StackSampler(interval_seconds=0.002)
+    sampler.start()
+    time.sleep(0.2)
+    counts = sampler.stop()
+    stop.set()
+    worker.join()
+    parked.join()
+    busy = [k for k in counts if k.startswith("busy-worker;")]
+    assert busy and any("_busy_loop (tests/test_profiler.py:" in k for k in busy)
+    assert not any(k.startswith("parked-worker;") for k in counts)
+    assert sampler.ticks > 10
+
+
+def test_folded_output_capped_at_max_bytes(tmp_path):
+    counts = {f"main;f{i};g{i}": i + 1 for i in range(500)}
+    path = tmp_path / "out.folded"
+    dropped = write_folded(counts, str(path), max_bytes=2000)
+    lines = path.read_text(encoding="utf-8").splitlines()
+    assert path.stat().st_size <= 2000
+    assert lines[0] == "main;f499;g499 500"  # most-hit stack first
+    assert lines[-1] == f"[other stacks] {dropped}"
+    assert sum(int(line.rsplit(" ", 1)[1]) for line in lines) == sum(counts.values())
+
+
+def test_cprofile_session_writes_pstats_and_stops_at_checkpoint(tmp_path):
+    with profiling("unit job", "cprofile", out_dir=str(tmp_path)) as session:
+        sum(i * i for i in range(1000))
+        session.max_seconds = 0
+        profiler.checkpoint()
+        time.sleep(0.01)  # after the checkpoint: not recorded
+    assert session.timed_out
+    stats = pstats.Stats(session.path)
+    names = {fn[2] for fn in stats.stats}
+    assert "<genexpr>" in names and "sleep" not in str(names)
+
+    with profiling("first", "sample", out_dir=str(tmp_path)) as outer:
+        with profiling("second", "sample", out_dir=str(tmp_path)) as inner:
+            assert outer is not None and inner is None  # one session at a time
+
+
+def test_request_profile_flag_list_and_download(monkeypatch, tmp_path):
+    monkeypatch.setattr(profiler, "PROFILE_DIR", str(tmp_path))
+    client = TestClient(app)
+    r = client.get("/api/health", params={"profile": "sample"})
+    assert r.status_code == 200
+    name = r.headers["x-profile"]
+    assert name.endswith("-GET_api_health.folded")
+
+    listed = client.get("/api/profiles").json()
+    assert [p["name"] for p in listed] == [name] and listed[0]["mode"] == "sample"
+    download = client.get(f"/api/profiles/{name}")
+    assert download.status_code == 200 and download.headers["content-type"].startswith("text/plain")
+
+    assert client.get("/api/health", params={"profile": "perf"}).status_code == 400
+    assert client.get("/api/profiles/..%2Fconfig.json").status_code == 404
+    assert client.get("/api/profiles/missing.prof").status_code == 404
+
+
+def test_request_cprofile_stops_at_time_limit(monkeypatch, tmp_path):
+    import asyncio
+
+    import httpx
+
+    from backend.api.request_profiler import RequestProfilerMiddleware
+
+    monkeypatch.setattr(profiler, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(profiler, "PROFILE_MAX_SECONDS", 0.05)
+
+    def before_limit() -> None:
+        sum(i * i for i in range(1000))
+
+    def after_limit() -> None:
+        sum(i * i for i in range(1000))
+
+    async def slow_app(scope, receive, send) -> None:
+        before_limit()
+        await asyncio.sleep(0.2)  # nothing calls pause_point() on the event loop
+        after_limit()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b"ok"})
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=RequestProfilerMiddleware(slow_app))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get("/slow", params={"profile": "cprofile"})
+
+    r = asyncio.run(scenario())
+    names = {fn[2] for fn in pstats.Stats(str(tmp_path / r.headers["x-profile"])).stats}
+    assert "before_limit" in names and "after_limit" not in names
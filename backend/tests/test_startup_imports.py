@@ -0,0 +1,44 @@
+"""
+Startup guards: importing the API must not pull in optional or heavy modules
+that are only needed on first use (see scripts/bench_startup.py), and the
+ready callback must fire once the server is listening. Both run in a fresh
+interpreter with a temp APPDATA.
+"""
+import os
+import subprocess
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+LAZY_MODULES = ["numpy", "psutil", "tkinter", "webview", "pystray", "PIL", "win32file", "desktop_notifier"]
+
+
+def test_backend_main_import_keeps_optional_modules_lazy(tmp_path):
+    code = (
+        "import sys, backend.main\n"
+        f"print(','.join(m for m in {LAZY_MODULES!r} if m in sys.modules))"
+    )
+    env = dict(os.environ, APPDATA=str(tmp_path))
+    proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr
+    assert proc.stdout.strip() == ""
+
+
+def test_start_server_thread_calls_on_ready_when_listening(tmp_path):
+    code = """
+import socket, sys, threading
+from backend.main import server_ready, start_server_thread
+with socket.socket() as s:
+    s.bind(("127.0.0.1", 0))
+    port = s.getsockname()[1]
+done = threading.Event()
+def on_ready():
+    socket.create_connection(("127.0.0.1", port), timeout=2).close()
+    print("ready", server_ready.is_set())
+    done.set()
+start_server_thread(port=port, on_ready=on_ready)
+sys.exit(0 if done.wait(20) else 1)
+"""
+    env = dict(os.environ, APPDATA=str(tmp_path))
+    proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True, timeout=60)
+    assert proc.returncode == 0, proc.stderr
+    assert "ready True" in proc.stdout
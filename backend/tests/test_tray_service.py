@@ -0,0 +1,83 @@
+"""
+Unit tests for the tray tooltip model: text is pushed from sampler and junk
+analyzer events, and the icon is only touched when the rendered text changes.
+"""
+import pytest
+
+from backend.core.constants import DISK_SAMPLE_INTERVAL_SECONDS
+from backend.services.disk_sampler import DiskSampler
+from backend.services.junk_service import JunkReport, JunkRootResult
+from backend.services.tray_service import DEFAULT_TOOLTIP, TrayTooltip
+from backend.utils.volumes import MountPointProbe, VolumeRegistry
+
+GB = 2**30
+
+
+class NoisyUsage:
+    """shutil.disk_usage stand-in: free space jitters by a few KB per call (logs, temp files)."""
+
+    def __init__(self, total=100 * GB, free=40 * GB):
+        self.total = total
+        self.free = free
+        self.calls = 0
+
+    def __call__(self, root):
+        self.calls += 1
+        free = self.free + (self.calls % 7) * 4096
+        return self.total, self.total - free, free
+
+
+def _junk_report(total_bytes):
+    return JunkReport(total_bytes=total_bytes, roots=[JunkRootResult(path="T", category="temp")])
+
+
+@pytest.fixture
+def wired(tmp_path):
+    """Sampler on a fake clock feeding a tooltip whose sink records every title update."""
+    (tmp_path / "vol").mkdir()
+    registry = VolumeRegistry(MountPointProbe(mounts=[(str(tmp_path / "vol"), "ext4")]))
+    now = [1_000_000.0]
+    usage = NoisyUsage()
+    sampler = DiskSampler(registry=registry, usage_fn=usage, clock=lambda: now[0])
+    tooltip = TrayTooltip()
+    sampler.add_listener(tooltip.on_sample)
+    titles = []
+    tooltip.attach(titles.append)
+    return sampler, tooltip, titles, usage, now
+
+
+def test_idle_day_pushes_once(wired):
+    sampler, tooltip, titles, usage, now = wired
+    assert titles == [DEFAULT_TOOLTIP]
+    tooltip.on_junk_report(_junk_report(300 * 2**20))
+    # A simulated idle day: one sample per interval on the fake clock
+    for _ in range(24 * 3600 // DISK_SAMPLE_INTERVAL_SECONDS):
+        sampler.sample_once()
+        now[0] += DISK_SAMPLE_INTERVAL_SECONDS
+        tooltip.on_junk_report(_junk_report(300 * 2**20 + 123))  # same MB: no change
+    assert usage.calls == 1440
+    # Initial text, junk line, first disk sample; noise never reaches the icon
+    assert len(titles) == 3
+    assert tooltip.pushes == 3
+    assert titles[-1].endswith("剩余 40.0% (40 GB)\n垃圾目录约 300 MB")
+
+
+def test_visible_change_is_pushed(wired):
+    sampler, tooltip, titles, usage, now = wired
+    sampler.sample_once()
+    before = len(titles)
+    usage.free -= 2 * GB
+    now[0] += DISK_SAMPLE_INTERVAL_SECONDS
+    sampler.sample_once()
+    assert len(titles) == before + 1
+    assert "(38 GB)" in titles[-1]
+
+
+def test_stale_drive_drops_out():
+    tooltip = TrayTooltip(stale_after_seconds=120)
+    tooltip.on_sample("C:", 0.0, 50 * GB, 100 * GB)
+    tooltip.on_sample("E:", 0.0, 1 * GB, 10 * GB)
+    assert "E:" in tooltip.text()
+    tooltip.on_sample("C:", 600.0, 50 * GB, 100 * GB)
+    assert "E:" not in tooltip.text()
+    assert tooltip.text().startswith("C:")
@@ -0,0 +1,101 @@
+"""
+Unit tests for the volume registry with mount-point fixtures: discovery,
+caching, invalidation, device-change detection, probe timeouts and
+single-flight refreshes.
+"""
+import threading
+import pytest
+from backend.utils.volumes import MountPointProbe, VolumeInfo, VolumeRegistry
+
+
+class CountingProbe(MountPointProbe):
+    def __init__(self, mounts, hang_on=None):
+        super().__init__(mounts=mounts)
+        self.describe_calls = 0
+        self.hang_on = hang_on
+        self.release = threading.Event()
+
+    def describe(self, drive, root):
+        self.describe_calls += 1
+        if root == self.hang_on:
+            self.release.wait(5)
+        return super().describe(drive, root)
+
+
+@pytest.fixture
+def mounts(tmp_path):
+    (tmp_path / "data").mkdir()
+    (tmp_path / "media").mkdir()
+    return [
+        (str(tmp_path / "data"), "ext4"),
+        (str(tmp_path / "media"), "vfat"),
+        ("/proc", "proc"),
+        (str(tmp_path / "gone"), "ext4"),
+    ]
+
+
+def test_mount_point_probe_skips_pseudo_and_missing(mounts, tmp_path):
+    registry = VolumeRegistry(MountPointProbe(mounts=mounts))
+    volumes = registry.volumes()
+    assert {v.drive for v in volumes} == {str(tmp_path / "data"), str(tmp_path / "media")}
+    assert registry.get(str(tmp_path / "media")) == VolumeInfo(
+        drive=str(tmp_path / "media"), root=str(tmp_path / "media"), fs_type="vfat"
+    )
+
+
+def test_registry_caches_until_stale_or_invalidated(mounts):
+    now = [0.0]
+    probe = CountingProbe(mounts)
+    registry = VolumeRegistry(probe, refresh_seconds=60, clock=lambda: now[0])
+    registry.volumes()
+    calls = probe.describe_calls
+    registry.volumes()
+    registry.get("C:")
+    assert probe.describe_calls == calls
+    now[0] = 61
+    registry.volumes()
+    assert probe.describe_calls == 2 * calls
+    registry.invalidate()
+    registry.volumes()
+    assert probe.describe_calls == 3 * calls
+
+
+def test_registry_probe_timeout_does_not_block(mounts, tmp_path):
+    probe = CountingProbe(mounts, hang_on=str(tmp_path / "media"))
+    registry = VolumeRegistry(probe, probe_timeout=0.2)
+    try:
+        volumes = registry.volumes()
+        assert {v.drive for v in volumes} == {str(tmp_path / "data")}
+    finally:
+        probe.release.set()
+
+
+def test_concurrent_refreshes_share_one_probe_round(mounts, tmp_path):
+    probe = CountingProbe(mounts, hang_on=str(tmp_path / "media"))
+    registry = VolumeRegistry(probe, probe_timeout=0.3)
+    try:
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(registry.refresh())) for _ in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert probe.describe_calls == 3  # one round: data, gone and the hanging media probe
+        assert all({v.drive for v in r} == {str(tmp_path / "data")} for r in results)
+        # The media probe is still hanging: the next round does not start another one
+        registry.refresh()
+        assert probe.describe_calls == 5
+    finally:
+        probe.release.set()
+
+
+def test_check_devices_invalidates_on_mount_change(mounts, tmp_path):
+    now = [0.0]
+    probe = CountingProbe(mounts)
+    registry = VolumeRegistry(probe, refresh_seconds=60, clock=lambda: now[0])
+    registry.volumes()
+    assert not registry.check_devices()
+    (tmp_path / "usb").mkdir()
+    probe._mounts.append((str(tmp_path / "usb"), "vfat"))
+    assert registry.check_devices()
+    assert str(tmp_path / "usb") in {v.drive for v in registry.volumes()}
@@ -1,12 +1,12 @@
 """
 Disk usage and drive enumeration. Lightweight: uses shutil.disk_usage
-per drive, no heavy scanning.
+per drive, no heavy scanning; drive discovery is cached in volumes.py.
 """
 import os
 import shutil
-import string
 from dataclasses import dataclass
-from pathlib import Path
+
+from backend.utils.volumes import get_volume_registry
 
 
 @dataclass
@@ -33,30 +33,24 @@ class DriveUsage:
 
 def get_fixed_drives() -> list[str]:
     """
-    Return list of fixed local drive letters (e.g. ['C:', 'D:']).
-    Uses os.path.exists for each letter to avoid requiring win32.
+    Return list of fixed local drives (e.g. ['C:', 'D:']; mount points on POSIX).
+    Served from the volume registry, which probes once in parallel with a
+    timeout instead of touching every drive letter on each call.
     """
-    drives = []
-    for letter in string.ascii_uppercase:
-        path = f"{letter}:\\"
-        if os.path.exists(path):
-            try:
-                # Only include local fixed drives if we can
-                if hasattr(os, "stat"):
-                    os.stat(path)
-                drives.append(f"{letter}:")
-            except OSError:
-                pass
-    return drives
+    return [v.drive for v in get_volume_registry().volumes()]
 
 
 def get_disk_usage(drive_letter: str) -> DriveUsage | None:
     """
-    Return usage for one drive (e.g. 'C' or 'C:').
+    Return usage for one drive (e.g. 'C' or 'C:', or a registered mount point).
     Returns None if drive not accessible.
     """
-    drive = drive_letter.rstrip(":\\") + ":"
-    root = drive + "\\"
+    volume = get_volume_registry().get(drive_letter)
+    if volume is not None:
+        drive, root = volume.drive, volume.root
+    else:
+        drive = drive_letter.rstrip(":\\") + ":"
+        root = drive + "\\"
     if not os.path.exists(root):
         return None
     try:
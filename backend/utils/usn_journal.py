@@ -21,11 +21,12 @@ FILE_CHANGE = 0x00000400
 
 @dataclass
 class UsnRecord:
-    """Simplified USN record: path and change reason."""
+    """Simplified USN record: path, change reason and the record's own USN."""
 
     path: str
     reason: int
     is_directory: bool
+    usn: int = 0
 
 
 def _open_volume_handle(drive_letter: str):
@@ -155,10 +156,13 @@ def read_usn_journal(
                     )
                     # FileAttributes: 0x10 = DIRECTORY
                     attr = struct.unpack("<I", out_buf[pos + 12 : pos + 16])[0]
+                    # Usn (8) at offset 24
+                    usn = struct.unpack("<q", out_buf[pos + 24 : pos + 32])[0]
                     yield UsnRecord(
                         path=raw_name,
                         reason=reason,
                         is_directory=bool(attr & 0x10),
+                        usn=usn,
                     )
                     count += 1
                 pos += rec_len
@@ -0,0 +1,164 @@
+"""
+Volume registry: discovers volumes once, caches per-volume capabilities
+(filesystem type, USN support) and refreshes on a timer, when invalidated,
+or when check_devices() sees the cheap candidate list (drive bitmask / mount
+table) change; the disk sampler calls it every round, so a plugged-in or
+removed drive shows up within one sample interval. Probing goes through the
+platform's VolumeProbe (backend.platform) and runs in parallel with a
+timeout, so a disconnected network drive or empty card reader cannot stall
+callers. One refresh runs at a time (concurrent callers wait for it), and a
+volume whose previous probe is still hanging is not probed again until it
+returns.
+"""
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Callable
+
+from backend.core.constants import VOLUME_PROBE_TIMEOUT_SECONDS, VOLUME_REFRESH_SECONDS
+from backend.platform import get_platform
+from backend.platform.base import VolumeInfo, VolumeProbe
+from backend.platform.posix import MountPointProbe
+from backend.platform.windows import WindowsVolumeProbe
+
+__all__ = ["MountPointProbe", "VolumeInfo", "VolumeProbe", "VolumeRegistry", "WindowsVolumeProbe", "get_volume_registry"]
+
+
+def default_probe() -> VolumeProbe:
+    """Probe for the running platform (backend.platform)."""
+    return get_platform().volume_probe()
+
+
+class VolumeRegistry:
+    """Cached volume list; stale after refresh_seconds or after invalidate()."""
+
+    def __init__(
+        self,
+        probe: VolumeProbe | None = None,
+        refresh_seconds: float = VOLUME_REFRESH_SECONDS,
+        probe_timeout: float = VOLUME_PROBE_TIMEOUT_SECONDS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.probe = probe or default_probe()
+        self.refresh_seconds = refresh_seconds
+        self.probe_timeout = probe_timeout
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._volumes: dict[str, VolumeInfo] = {}
+        self._refreshed_at: float | None = None
+        self._candidates: list[tuple[str, str]] | None = None  # as of the last refresh
+        self._in_flight: threading.Event | None = None  # set when the running refresh finishes
+        self._probing: dict[str, Future] = {}  # drive -> probe that outlived its refresh round
+        self.generation = 0  # bumped on every refresh (for response caching)
+        # Long-lived pool: a probe that hangs past the timeout keeps one worker, not the caller
+        self._pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="volume-probe")
+
+    def invalidate(self) -> None:
+        """Force re-discovery on next access (e.g. on a device-change notification)."""
+        with self._lock:
+            self._refreshed_at = None
+
+    def check_devices(self) -> bool:
+        """Invalidate if the candidate list changed since the last refresh (cheap; no volume is probed)."""
+        try:
+            candidates = self.probe.candidates()
+        except Exception:
+            return False
+        with self._lock:
+            changed = self._candidates is not None and candidates != self._candidates
+            if changed:
+                self._refreshed_at = None
+            return changed
+
+    def refresh(self) -> list[VolumeInfo]:
+        """
+        Re-discover volumes now; probes run in parallel, each bounded by
+        probe_timeout. A caller arriving while a refresh runs waits for that
+        one instead of starting another.
+        """
+        with self._lock:
+            running = self._in_flight
+            if running is None:
+                self._in_flight = threading.Event()
+        if running is not None:
+            running.wait()
+            return self.cached()
+        try:
+            return self._refresh()
+        finally:
+            with self._lock:
+                done, self._in_flight = self._in_flight, None
+            done.set()
+
+    def _refresh(self) -> list[VolumeInfo]:
+        try:
+            candidates = self.probe.candidates()
+        except Exception:
+            candidates = []
+        futures: dict[Future, str] = {}
+        for drive, root in candidates:
+            previous = self._probing.get(drive)
+            if previous is not None and not previous.done():
+                continue  # still hanging from an earlier round: keep its worker, not another
+            self._probing.pop(drive, None)
+            futures[self._pool.submit(self.probe.describe, drive, root)] = drive
+        done, _not_done = wait(futures, timeout=self.probe_timeout)
+        found: dict[str, VolumeInfo] = {}
+        with self._lock:
+            for drive, _root in candidates:
+                if drive in self._probing and drive in self._volumes:
+                    found[drive] = self._volumes[drive]
+            for fut, drive in futures.items():
+                if fut in done:
+                    try:
+                        info = fut.result()
+                    except Exception:
+                        info = None
+                    if info is not None:
+                        found[drive] = info
+                else:
+                    self._probing[drive] = fut
+                    if drive in self._volumes:
+                        # Slow this time: keep what we knew rather than dropping the volume
+                        found[drive] = self._volumes[drive]
+            self._volumes = found
+            self._candidates = candidates
+            self._refreshed_at = self._clock()
+            self.generation += 1
+            return list(found.values())
+
+    def volumes(self) -> list[VolumeInfo]:
+        """Cached volumes, refreshed when stale."""
+        with self._lock:
+            fresh = (
+                self._refreshed_at is not None
+                and self._clock() - self._refreshed_at < self.refresh_seconds
+            )
+            if fresh:
+                return list(self._volumes.values())
+        return self.refresh()
+
+    def cached(self) -> list[VolumeInfo]:
+        """Last discovered volumes without refreshing (never probes; for async callers)."""
+        with self._lock:
+            return list(self._volumes.values())
+
+    def get(self, drive: str, refresh: bool = True) -> VolumeInfo | None:
+        """Cached info for one drive ("C", "C:" or a mount point); refresh=False never probes."""
+        for v in self.volumes() if refresh else self.cached():
+            if v.drive.upper() == drive.upper() or v.drive.upper() == drive.rstrip(":\\").upper() + ":":
+                return v
+        return None
+
+
+_registry: VolumeRegistry | None = None
+_registry_lock = threading.Lock()
+
+
+def get_volume_registry() -> VolumeRegistry:
+    """Process-wide registry."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = VolumeRegistry()
+        return _registry
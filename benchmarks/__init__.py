@@ -0,0 +1,15 @@
+"""
+Repeatable benchmark suite. Runs on Linux (or any OS) with no Windows APIs:
+a deterministic synthetic tree is generated on tmpfs (benchmarks.synthetic_fs)
+and indexed under a fake volume label, with batch sleeps and load throttling
+turned off so only the code under test is timed.
+
+Cases: directory walker, index load / unchanged refresh, large-file queries
+at several offsets, cleanup rule scans, junk scans and in-process API
+throughput. Usage (from the repository root):
+
+    python -m benchmarks run --preset medium --out bench.json
+    python -m benchmarks run --save-baseline            # writes benchmarks/baseline.json
+    python -m benchmarks run --baseline benchmarks/baseline.json   # exit 1 on regression
+    python -m benchmarks compare old.json new.json --threshold 0.1
+"""
@@ -0,0 +1,101 @@
+"""Command line: python -m benchmarks run|compare (see the package docstring)."""
+import argparse
+import dataclasses
+import json
+import os
+import sys
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from benchmarks.cases import CASES  # noqa: E402
+from benchmarks.runner import (  # noqa: E402
+    DEFAULT_THRESHOLD,
+    compare,
+    format_changes,
+    load,
+    run_suite,
+    save,
+    warn_if_mismatched,
+)
+from benchmarks.synthetic_fs import PRESETS  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def _report(baseline: dict, current: dict, threshold: float) -> int:
+    warn_if_mismatched(baseline, current)
+    changes = compare(baseline, current, threshold)
+    print(format_changes(changes, threshold))
+    return 1 if any(c.regression for c in changes) else 0
+
+
+def cmd_run(args: argparse.Namespace) -> int:
+    spec = PRESETS[args.preset]
+    overrides = {k: v for k, v in (("depth", args.depth), ("fanout", args.fanout),
+                                   ("files_per_dir", args.files_per_dir), ("seed", args.seed)) if v is not None}
+    spec = dataclasses.replace(spec, **overrides)
+    cases = args.cases.split(",") if args.cases else None
+    unknown = set(cases or ()) - set(CASES)
+    if unknown:
+        print(f"unknown case(s): {', '.join(sorted(unknown))}; available: {', '.join(CASES)}", file=sys.stderr)
+        return 2
+    doc = run_suite(
+        spec,
+        cases=cases,
+        repeat=args.repeat,
+        api_seconds=args.api_seconds,
+        base_dir=args.dir,
+        preset=args.preset,
+        log=lambda msg: print(msg, file=sys.stderr),
+    )
+    if args.out:
+        save(doc, args.out)
+    elif not args.save_baseline:
+        print(json.dumps(doc, ensure_ascii=False, indent=2))
+    if args.save_baseline:
+        save(doc, args.baseline or DEFAULT_BASELINE)
+        print(f"baseline written: {args.baseline or DEFAULT_BASELINE}", file=sys.stderr)
+        return 0
+    if args.baseline:
+        return _report(load(args.baseline), doc, args.threshold)
+    return 0
+
+
+def cmd_compare(args: argparse.Namespace) -> int:
+    return _report(load(args.baseline), load(args.current), args.threshold)
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="generate the synthetic tree and run the cases")
+    run.add_argument("--preset", choices=sorted(PRESETS), default="medium")
+    run.add_argument("--cases", help=f"comma-separated subset of: {','.join(CASES)}")
+    run.add_argument("--repeat", type=int, default=5, help="timed runs per measurement (best is reported)")
+    run.add_argument("--api-seconds", type=float, default=1.0, help="load duration per API endpoint")
+    run.add_argument("--dir", help="where to generate the tree (default: /dev/shm when available)")
+    run.add_argument("--depth", type=int)
+    run.add_argument("--fanout", type=int)
+    run.add_argument("--files-per-dir", type=int)
+    run.add_argument("--seed", type=int)
+    run.add_argument("--out", help="write the JSON results here (default: stdout)")
+    run.add_argument("--baseline", help="compare against this results file; exit 1 on regression")
+    run.add_argument("--save-baseline", action="store_true", help="store these results as the baseline")
+    run.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="relative change counted as a regression")
+    run.set_defaults(func=cmd_run)
+
+    cmp_ = sub.add_parser("compare", help="compare two results files")
+    cmp_.add_argument("baseline")
+    cmp_.add_argument("current")
+    cmp_.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD)
+    cmp_.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,270 @@
+"""
+Benchmark cases. Each case takes a BenchContext (generated tree, scratch
+index directory, repeat count) and returns a flat {metric: value} dict.
+Metric names carry their direction for compare mode: *_seconds (best of
+the repeats) is lower-is-better, *_per_second higher-is-better; anything
+else (medians, counts) is informational.
+
+Cases run in CASES order and share state: index_load leaves a populated
+index behind for the query, rule and API cases.
+"""
+import asyncio
+import os
+import statistics
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Callable, Iterator
+
+import backend.core.config as config_mod
+import backend.services.index_service as index_mod
+import backend.services.junk_policy as junk_policy_mod
+import backend.services.junk_service as junk_mod
+import backend.services.monitor_service as monitor_mod
+
+from benchmarks.synthetic_fs import FsManifest
+
+VOLUME = "B:"  # label the synthetic tree is indexed under
+LARGE_FILE_OFFSETS = (0, 1_000, 10_000)
+# name -> query for the filename search case: substring, glob, no trigram (full name scan)
+NAME_SEARCH_QUERIES = {"substring": "report", "glob_ext": "*.iso", "short": "zz"}
+
+
+@dataclass
+class BenchContext:
+    manifest: FsManifest
+    work_dir: str  # scratch: index DB, config
+    repeat: int = 5
+    api_seconds: float = 1.0
+    api_concurrency: int = 8
+
+
+def timed(fn: Callable[[], object], repeat: int, setup: Callable[[], None] | None = None) -> tuple[float, float, object]:
+    """(best, median) wall time over repeat runs after one untimed warm-up run, and the last result."""
+    times = []
+    result = None
+    for i in range(max(1, repeat) + 1):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        result = fn()
+        if i:
+            times.append(time.perf_counter() - start)
+    return min(times), statistics.median(times), result
+
+
+@contextmanager
+def isolated(ctx: BenchContext) -> Iterator[None]:
+    """
+    Point the index and config at the scratch directory, make the synthetic
+    junk root the only junk root, and turn off batch sleeps and load
+    throttling so only the code under test is timed. Restored on exit.
+    """
+    saved_attrs = []
+
+    def patch(obj, name, value) -> None:
+        saved_attrs.append((obj, name, getattr(obj, name)))
+        setattr(obj, name, value)
+
+    saved_env = {k: os.environ.get(k) for k in ("TEMP", "TMP", "LOCALAPPDATA")}
+    patch(index_mod, "INDEX_DB_DIR", os.path.join(ctx.work_dir, "db"))
+    patch(config_mod, "CONFIG_DIR", ctx.work_dir)
+    patch(config_mod, "CONFIG_FILE", os.path.join(ctx.work_dir, "config.json"))
+    patch(index_mod, "BATCH_SLEEP_SECONDS", 0)
+    for mod in (index_mod, monitor_mod):
+        patch(mod, "is_under_load", lambda: False)
+    for mod in (index_mod, junk_mod, monitor_mod):
+        patch(mod, "throttle_if_needed", lambda: None)
+    os.environ["TEMP"] = os.environ["TMP"] = ctx.manifest.junk_root
+    os.environ.pop("LOCALAPPDATA", None)
+    try:
+        yield
+    finally:
+        for obj, name, value in reversed(saved_attrs):
+            setattr(obj, name, value)
+        for k, v in saved_env.items():
+            if v is None:
+                os.environ.pop(k, None)
+            else:
+                os.environ[k] = v
+
+
+def _entry(prefix: str, best: float, median: float, items: int | None = None, unit: str = "") -> dict:
+    out = {f"{prefix}_seconds": round(best, 6), f"{prefix}_seconds_median": round(median, 6)}
+    if items:
+        out[f"{prefix}_{unit}_per_second"] = round(items / best, 1)
+    return out
+
+
+def bench_walk(ctx: BenchContext) -> dict:
+    """full_scan_directory over the data tree (os.walk + stat per file)."""
+    def walk() -> int:
+        return sum(1 for _ in index_mod.full_scan_directory(ctx.manifest.data_root))
+
+    best, median, files = timed(walk, ctx.repeat)
+    return {**_entry("walk", best, median, files, "files"), "walk_files": files}
+
+
+def bench_index_load(ctx: BenchContext) -> dict:
+    """Full index build into an empty database, then an unchanged incremental refresh."""
+    db_dir = index_mod.INDEX_DB_DIR
+
+    def fresh_db() -> None:
+        path = os.path.join(db_dir, index_mod.INDEX_DB_NAME)
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(path + suffix):
+                os.remove(path + suffix)
+
+    root = ctx.manifest.root
+    best, median, rows = timed(lambda: index_mod.index_full_scan_volume(VOLUME, root), ctx.repeat, fresh_db)
+    out = _entry("index_load", best, median, rows, "rows")
+    out["index_rows"] = rows
+    best, median, _ = timed(lambda: index_mod.refresh_index_volume(VOLUME, root), ctx.repeat)
+    out.update(_entry("index_refresh_unchanged", best, median))
+    return out
+
+
+def bench_large_files(ctx: BenchContext) -> dict:
+    """Largest-first page of 100 at several depths, by offset and by keyset cursor (the large-files table paging)."""
+    out = {}
+    for offset in LARGE_FILE_OFFSETS:
+        def page() -> int:
+            return sum(1 for _ in index_mod.iter_large_files(VOLUME, 0, limit=100, offset=offset))
+
+        best, median, _ = timed(page, ctx.repeat * 4)
+        out.update(_entry(f"large_files_offset_{offset}", best, median))
+        before = list(index_mod.iter_large_files(VOLUME, 0, limit=1, offset=offset - 1)) if offset else []
+        if before:
+            # Same page reached by keyset cursor (what the virtual table sends)
+            last = before[0]
+
+            def keyset_page() -> int:
+                return sum(1 for _ in index_mod.iter_large_files(VOLUME, 0, limit=100, after=(last[1], last[0])))
+
+            best, median, _ = timed(keyset_page, ctx.repeat * 4)
+            out.update(_entry(f"large_files_cursor_{offset}", best, median))
+
+    def filtered() -> int:
+        return sum(1 for _ in index_mod.iter_large_files(VOLUME, 100 * 1024 * 1024, extensions=[".mp4", ".iso"], limit=100))
+
+    best, median, _ = timed(filtered, ctx.repeat * 4)
+    out.update(_entry("large_files_filtered", best, median))
+    return out
+
+
+def bench_name_search(ctx: BenchContext) -> dict:
+    """First page of 100 from the filename search (/api/search) for a few query shapes."""
+    out = {}
+    for name, query in NAME_SEARCH_QUERIES.items():
+        best, median, _ = timed(lambda: sum(1 for _ in index_mod.iter_name_search(query, limit=100)), ctx.repeat * 4)
+        out.update(_entry(f"name_search_{name}", best, median))
+    return out
+
+
+def bench_rule_scan(ctx: BenchContext) -> dict:
+    """Cleanup rule scans: large_file and by_extension (pruned walk) and a junk rule (index columns)."""
+    data_root = ctx.manifest.data_root
+    rules = {
+        "rule_large_file": {"rule_type": "large_file", "target_path": data_root, "size_mb_min": 500},
+        "rule_by_extension": {"rule_type": "by_extension", "target_path": data_root, "extensions": [".log", ".tmp"]},
+    }
+    out = {}
+    for name, rule in rules.items():
+        best, median, _ = timed(lambda: monitor_mod.run_rule_scan(rule), ctx.repeat)
+        out.update(_entry(name, best, median))
+
+    junk_rule = {"rule_type": "junk", "target_path": ctx.manifest.junk_root, "min_age_days": 30}
+
+    def clear_columns() -> None:
+        junk_policy_mod._columns_cache = None
+
+    best, median, _ = timed(lambda: monitor_mod.run_rule_scan(junk_rule), ctx.repeat, clear_columns)
+    out.update(_entry("rule_junk_cold", best, median))
+    best, median, _ = timed(lambda: monitor_mod.run_rule_scan(junk_rule), ctx.repeat)
+    out.update(_entry("rule_junk_cached", best, median))
+    return out
+
+
+def bench_junk_scan(ctx: BenchContext) -> dict:
+    """JunkAnalyzer sizing of the junk root: cold (new analyzer) and warm (mtime cache hit)."""
+    analyzer = [junk_mod.JunkAnalyzer()]
+
+    def fresh() -> None:
+        analyzer[0] = junk_mod.JunkAnalyzer()
+
+    best, median, report = timed(lambda: analyzer[0].analyze(), ctx.repeat, fresh)
+    out = _entry("junk_scan_cold", best, median)
+    out["junk_bytes"] = report.total_bytes
+    best, median, _ = timed(lambda: analyzer[0].analyze(), ctx.repeat)
+    out.update(_entry("junk_scan_warm", best, median))
+    return out
+
+
+API_WINDOWS = 3
+API_ENDPOINTS = {
+    "health": ("/api/health", {}),
+    "config": ("/api/config", {}),
+    "large_files": ("/api/scan/large-files", {"drive": "B", "min_size_mb": 0, "limit": 100}),
+    "large_files_offset": ("/api/scan/large-files", {"drive": "B", "min_size_mb": 0, "limit": 100, "offset": 1000}),
+    "growth": ("/api/scan/growth", {"drive": "B"}),
+}
+
+
+async def _throughput(
+    app, path: str, params: dict, seconds: float, concurrency: int, windows: int
+) -> tuple[list[float], int]:
+    import httpx
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        count = 0
+        errors = 0
+
+        async def worker(until: float, counted: bool) -> None:
+            nonlocal count, errors
+            while time.perf_counter() < until:
+                r = await client.get(path, params=params)
+                if counted:
+                    count += 1
+                    errors += r.status_code >= 400
+
+        # Warm-up (caches filled, as for a polling view), then the measured windows
+        await asyncio.gather(*(worker(time.perf_counter() + seconds / 4, False) for _ in range(concurrency)))
+        rates = []
+        for _ in range(windows):
+            count = 0
+            start = time.perf_counter()
+            await asyncio.gather(*(worker(start + seconds, True) for _ in range(concurrency)))
+            rates.append(count / (time.perf_counter() - start))
+        return rates, errors
+
+
+def bench_api(ctx: BenchContext) -> dict:
+    """
+    Requests/second per endpoint through the app in-process (httpx
+    ASGITransport, no sockets), so the number tracks app-side cost. Best of
+    API_WINDOWS windows of api_seconds each.
+    """
+    from backend.main import app
+
+    out = {}
+    for name, (path, params) in API_ENDPOINTS.items():
+        rates, errors = asyncio.run(
+            _throughput(app, path, params, ctx.api_seconds, ctx.api_concurrency, API_WINDOWS)
+        )
+        out[f"api_{name}_requests_per_second"] = round(max(rates), 1)
+        out[f"api_{name}_requests_per_second_median"] = round(statistics.median(rates), 1)
+        if errors:
+            out[f"api_{name}_errors"] = errors
+    return out
+
+
+CASES: dict[str, Callable[[BenchContext], dict]] = {
+    "walk": bench_walk,
+    "index_load": bench_index_load,
+    "large_files": bench_large_files,
+    "name_search": bench_name_search,
+    "rule_scan": bench_rule_scan,
+    "junk_scan": bench_junk_scan,
+    "api": bench_api,
+}
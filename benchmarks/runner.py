@@ -0,0 +1,154 @@
+"""
+Run the suite into a JSON document and compare two such documents.
+
+Result document:
+    {"meta": {...machine, python, git commit, preset, tree manifest...},
+     "results": {case: {metric: value}}}
+
+compare() flags a regression when a *_seconds metric grew, or a
+*_per_second metric shrank, by more than the threshold (relative). Timings
+that moved by less than MIN_ABSOLUTE_SECONDS are never flagged: sub-
+millisecond cases jitter by more than any sensible threshold.
+"""
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass
+
+from benchmarks.cases import CASES, VOLUME, BenchContext, isolated
+from benchmarks.synthetic_fs import FsSpec, generate
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+DEFAULT_THRESHOLD = 0.15
+MIN_ABSOLUTE_SECONDS = 0.001
+_NEEDS_INDEX = {"large_files", "rule_scan", "api"}
+
+
+def _git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, timeout=5)
+        return out.stdout.strip()
+    except Exception:
+        return ""
+
+
+def run_suite(
+    spec: FsSpec,
+    cases: list[str] | None = None,
+    repeat: int = 5,
+    api_seconds: float = 1.0,
+    base_dir: str | None = None,
+    preset: str = "",
+    log=print,
+) -> dict:
+    """Generate the tree, run the selected cases in CASES order, remove the tree."""
+    selected = [c for c in CASES if cases is None or c in cases]
+    manifest = generate(spec, base_dir)
+    work_dir = tempfile.mkdtemp(prefix="wc-bench-work-", dir=os.path.dirname(manifest.root))
+    log(f"tree: {manifest.dirs} dirs, {manifest.files} files under {manifest.root} ({manifest.generate_seconds} s)")
+    ctx = BenchContext(manifest=manifest, work_dir=work_dir, repeat=repeat, api_seconds=api_seconds)
+    results: dict[str, dict] = {}
+    try:
+        with isolated(ctx):
+            from backend.services.index_service import index_full_scan_volume
+
+            if "index_load" not in selected and _NEEDS_INDEX & set(selected):
+                index_full_scan_volume(VOLUME, manifest.root)  # untimed: later cases query it
+            for name in selected:
+                start = time.perf_counter()
+                results[name] = CASES[name](ctx)
+                log(f"  {name:12s} {time.perf_counter() - start:6.1f} s")
+    finally:
+        shutil.rmtree(manifest.root, ignore_errors=True)
+        shutil.rmtree(work_dir, ignore_errors=True)
+    return {
+        "meta": {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "git_commit": _git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+            "cpu_count": os.cpu_count(),
+            "preset": preset,
+            "repeat": repeat,
+            "spec": asdict(spec),
+            "tree": manifest.to_dict(),
+        },
+        "results": results,
+    }
+
+
+@dataclass
+class Change:
+    case: str
+    metric: str
+    baseline: float
+    current: float
+    ratio: float  # > 0: worse by this fraction; < 0: better
+    regression: bool
+
+    @property
+    def relative(self) -> float:
+        """Raw relative change of the value (sign independent of direction)."""
+        return (self.current - self.baseline) / self.baseline
+
+
+def _direction(metric: str) -> int:
+    """+1: lower is better, -1: higher is better, 0: informational."""
+    if metric.endswith("_per_second"):
+        return -1
+    if metric.endswith("_seconds"):
+        return 1
+    return 0
+
+
+def compare(baseline: dict, current: dict, threshold: float = DEFAULT_THRESHOLD) -> list[Change]:
+    """Changes for every directional metric present in both documents."""
+    changes = []
+    for case, metrics in current.get("results", {}).items():
+        base_metrics = baseline.get("results", {}).get(case, {})
+        for metric, value in metrics.items():
+            direction = _direction(metric)
+            base = base_metrics.get(metric)
+            if not direction or not base or not isinstance(value, (int, float)):
+                continue
+            ratio = (value - base) / base * direction
+            significant = direction < 0 or abs(value - base) >= MIN_ABSOLUTE_SECONDS
+            changes.append(Change(case, metric, base, value, ratio, ratio > threshold and significant))
+    return changes
+
+
+def format_changes(changes: list[Change], threshold: float) -> str:
+    lines = [f"{'metric':46s} {'baseline':>12s} {'current':>12s} {'change':>8s}"]
+    for c in changes:
+        flag = "  REGRESSION" if c.regression else ("  improved" if c.ratio < -threshold else "")
+        lines.append(f"{c.case + '.' + c.metric:46s} {c.baseline:12.6g} {c.current:12.6g} {c.relative * 100:+7.1f}%{flag}")
+    worse = sum(c.regression for c in changes)
+    lines.append(f"{worse} regression(s) beyond {threshold * 100:.0f} % out of {len(changes)} metrics")
+    return "\n".join(lines)
+
+
+def load(path: str) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save(doc: dict, path: str) -> None:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(doc, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+
+
+def warn_if_mismatched(baseline: dict, current: dict, out=sys.stderr) -> None:
+    """Comparisons across different trees or machines are not meaningful; say so."""
+    b, c = baseline.get("meta", {}), current.get("meta", {})
+    if b.get("tree", {}).get("fingerprint") != c.get("tree", {}).get("fingerprint"):
+        print("warning: baseline was run on a different synthetic tree (spec/preset differ)", file=out)
+    if (b.get("machine"), b.get("cpu_count"), b.get("python")) != (c.get("machine"), c.get("cpu_count"), c.get("python")):
+        print("warning: baseline was recorded on a different machine or Python version", file=out)
@@ -0,0 +1,165 @@
+"""
+Deterministic synthetic volume: a directory tree with configurable depth,
+fan-out, file counts, a log-normal size distribution with a large-file tail,
+Unicode names and spread-out mtimes, plus a junk (Temp-like) subtree of old
+cache files. The same FsSpec always produces the same tree (names, sizes and
+ages), so timings are comparable across runs and machines.
+
+Files are created sparse (truncate, no data written), so a multi-GB tree
+fits on tmpfs and generation is fast. Default location is /dev/shm.
+"""
+import hashlib
+import os
+import random
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+
+# Name fragments: ASCII, CJK, accented Latin (precomposed and combining), Cyrillic, Greek,
+# emoji and spaces; nothing Windows forbids in a file name
+_ASCII = ["report", "data", "photo", "backup", "build", "cache", "notes", "video", "setup", "log"]
+_UNICODE = [
+    "报告", "数据", "照片", "备份", "文档", "下载", "ファイル", "사진",
+    "café", "résumé", "cafe\u0301", "naïve", "Ångström",
+    "отчёт", "данные", "αρχείο", "📁 archive", "🎵 music", "my docs",
+]
+_EXTENSIONS = [
+    (".txt", 10), (".log", 8), (".jpg", 10), (".png", 6), (".pdf", 5), (".docx", 4),
+    (".zip", 3), (".mp4", 2), (".iso", 1), (".dat", 6), (".tmp", 4), (".json", 5),
+]
+_LARGE_EXTENSIONS = [".mp4", ".iso", ".zip", ".vhdx", ".mkv"]
+_JUNK_EXTENSIONS = [".tmp", ".log", ".cache", ".dmp", ".etl"]
+
+
+@dataclass(frozen=True)
+class FsSpec:
+    depth: int = 4  # directory levels below the root
+    fanout: int = 5  # subdirectories per directory
+    files_per_dir: int = 30
+    size_median_bytes: int = 48 * 1024
+    size_sigma: float = 2.2  # log-normal spread of ordinary file sizes
+    large_file_ratio: float = 0.003  # share of files drawn from the large tail
+    large_file_min_bytes: int = 600 * 1024 * 1024
+    large_file_max_bytes: int = 8 * 1024 * 1024 * 1024
+    unicode_ratio: float = 0.35  # share of names built from non-ASCII fragments
+    max_age_days: float = 400.0
+    junk_dirs: int = 60
+    junk_files_per_dir: int = 40
+    seed: int = 20240601
+
+
+PRESETS = {
+    "tiny": FsSpec(depth=2, fanout=3, files_per_dir=8, junk_dirs=6, junk_files_per_dir=10),
+    "small": FsSpec(depth=3, fanout=4, files_per_dir=20, junk_dirs=20, junk_files_per_dir=30),
+    "medium": FsSpec(),
+    "large": FsSpec(depth=5, fanout=6, files_per_dir=40, junk_dirs=300, junk_files_per_dir=60),
+}
+
+
+@dataclass
+class FsManifest:
+    """What generate() built: roots, counts and a fingerprint of the layout."""
+
+    root: str
+    data_root: str
+    junk_root: str
+    spec: FsSpec
+    dirs: int = 0
+    files: int = 0
+    total_bytes: int = 0
+    large_files: int = 0
+    fingerprint: str = ""
+    generate_seconds: float = 0.0
+    large_paths: list[str] = field(default_factory=list, repr=False)
+
+    def to_dict(self) -> dict:
+        d = asdict(self)
+        d.pop("large_paths")
+        return d
+
+
+def default_base_dir() -> str:
+    """tmpfs when available (so timings measure code, not the disk), else the temp dir."""
+    shm = "/dev/shm"
+    if os.path.isdir(shm) and os.access(shm, os.W_OK):
+        return shm
+    return tempfile.gettempdir()
+
+
+def _name(rng: random.Random, spec: FsSpec, index: int) -> str:
+    pool = _UNICODE if rng.random() < spec.unicode_ratio else _ASCII
+    return f"{rng.choice(pool)}-{index}"
+
+
+def _ordinary_size(rng: random.Random, spec: FsSpec) -> int:
+    size = int(rng.lognormvariate(0, spec.size_sigma) * spec.size_median_bytes)
+    return min(size, spec.large_file_min_bytes - 1)
+
+
+def _make_file(path: str, size: int, age_seconds: float, now: float) -> None:
+    with open(path, "wb") as f:
+        if size:
+            f.truncate(size)
+    mtime_ns = int((now - age_seconds) * 1e9)
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def generate(spec: FsSpec, base_dir: str | None = None) -> FsManifest:
+    """Build the tree for spec under a fresh directory in base_dir."""
+    started = time.perf_counter()
+    rng = random.Random(spec.seed)
+    now = time.time()
+    root = tempfile.mkdtemp(prefix="wc-bench-", dir=base_dir or default_base_dir())
+    data_root = os.path.join(root, "data")
+    junk_root = os.path.join(root, "junk", "Temp")
+    manifest = FsManifest(root=root, data_root=data_root, junk_root=junk_root, spec=spec)
+    digest = hashlib.sha256()
+    ext_names = [e for e, _w in _EXTENSIONS]
+    ext_weights = [w for _e, w in _EXTENSIONS]
+
+    def add_file(dirpath: str, name: str, size: int, age_days: float) -> None:
+        path = os.path.join(dirpath, name)
+        _make_file(path, size, age_days * 86400, now)
+        manifest.files += 1
+        manifest.total_bytes += size
+        digest.update(f"{os.path.relpath(path, root)}\0{size}\0{age_days:.4f}\n".encode("utf-8"))
+
+    # Data tree: breadth-first so names and sizes depend only on the spec
+    level = [data_root]
+    os.makedirs(data_root)
+    for depth in range(spec.depth + 1):
+        next_level = []
+        for dirpath in level:
+            manifest.dirs += 1
+            for i in range(spec.files_per_dir):
+                age = rng.uniform(0, spec.max_age_days)
+                if rng.random() < spec.large_file_ratio:
+                    size = rng.randint(spec.large_file_min_bytes, spec.large_file_max_bytes)
+                    name = _name(rng, spec, i) + rng.choice(_LARGE_EXTENSIONS)
+                    manifest.large_files += 1
+                    manifest.large_paths.append(os.path.join(dirpath, name))
+                else:
+                    size = _ordinary_size(rng, spec)
+                    name = _name(rng, spec, i) + rng.choices(ext_names, ext_weights)[0]
+                add_file(dirpath, name, size, age)
+            if depth < spec.depth:
+                for j in range(spec.fanout):
+                    sub = os.path.join(dirpath, _name(rng, spec, j))
+                    os.mkdir(sub)
+                    next_level.append(sub)
+        level = next_level
+
+    # Junk subtree: flat-ish cache directories of mostly old, small files
+    os.makedirs(junk_root)
+    manifest.dirs += 1
+    for d in range(spec.junk_dirs):
+        sub = os.path.join(junk_root, f"{rng.choice(_ASCII)}-{d}", "cache")
+        os.makedirs(sub)
+        manifest.dirs += 2
+        for i in range(spec.junk_files_per_dir):
+            size = int(rng.lognormvariate(0, 1.5) * 16 * 1024)
+            add_file(sub, f"{_name(rng, spec, i)}{rng.choice(_JUNK_EXTENSIONS)}", size, rng.uniform(0, 180))
+
+    manifest.fingerprint = digest.hexdigest()[:16]
+    manifest.generate_seconds = round(time.perf_counter() - started, 3)
+    return manifest
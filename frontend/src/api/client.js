@@ -30,16 +30,37 @@ export async function updateConfig(partial) {
   return data
 }
 
-export async function getLargeFiles(params = {}) {
-  const { data } = await client.get('/api/scan/large-files', { params })
+/**
+ * params.format: 'rows' ({ items }) or 'columns' ({ paths, sizes, mtimes }).
+ * Paging: pass the previous page's next_cursor as params.cursor (null on the last page).
+ * signal: AbortSignal to cancel a stale request (rejects with isCanceled(e) true).
+ */
+export async function getLargeFiles(params = {}, { signal } = {}) {
+  const { data } = await client.get('/api/scan/large-files', { params, signal })
+  return data
+}
+
+/** Files by name: q is a substring, or a glob on the whole name ("*.iso"). Same layouts and paging as getLargeFiles. */
+export async function searchFiles(q, params = {}, { signal } = {}) {
+  const { data } = await client.get('/api/search', { params: { ...params, q }, signal })
   return data
 }
 
+/** True for the rejection of a request cancelled through its AbortSignal. */
+export function isCanceled(e) {
+  return axios.isCancel(e) || e?.code === 'ERR_CANCELED'
+}
+
 export async function rebuildIndex(drive) {
   const { data } = await client.post('/api/scan/rebuild-index', { drive })
   return data
 }
 
+export async function runCleanup(ruleId, dryRun = true) {
+  const { data } = await client.post('/api/cleanup/run', { rule_id: ruleId, dry_run: dryRun })
+  return data
+}
+
 export async function health() {
   const { data } = await client.get('/api/health')
   return data
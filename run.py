@@ -7,6 +7,9 @@ import sys
 import time
 import traceback
 
+# Fallback launch timestamp when the process start time is unavailable (see _launch_started_at)
+_MODULE_T0 = time.time()
+
 ROOT = os.path.abspath(os.path.dirname(__file__))
 if ROOT not in sys.path:
     sys.path.insert(0, ROOT)
@@ -34,6 +37,8 @@ def _bootstrap_log(msg: str, exc_text: str | None = None) -> None:
 
 # Lazy imports for backend - will be done inside main to enable logging before import errors
 run_server = None
+start_server_thread = None
+wait_until_ready = None
 _disk_check_callback = None
 run_tray = None
 app = None
@@ -41,16 +46,43 @@ app = None
 
 def _import_backend() -> None:
     """Import backend modules. Call after bootstrap log is set up."""
-    global run_server, _disk_check_callback, run_tray, app
+    global run_server, start_server_thread, wait_until_ready, _disk_check_callback, run_tray, app
     from backend.main import run_server as _run_server, _disk_check_callback as _disk_cb
+    from backend.main import start_server_thread as _start, wait_until_ready as _wait
     from backend.services.tray_service import run_tray as _run_tray
     from backend.main import app as _app
     run_server = _run_server
+    start_server_thread = _start
+    wait_until_ready = _wait
     _disk_check_callback = _disk_cb
     run_tray = _run_tray
     app = _app
 
 
+def _launch_started_at() -> float:
+    """
+    Wall-clock start of this process. With PyInstaller the interpreter starts
+    after the bundle is unpacked, so the OS process start time is the honest
+    origin for time-to-window; falls back to when run.py was loaded.
+    """
+    try:
+        import psutil
+        return psutil.Process().create_time()
+    except Exception:
+        return _MODULE_T0
+
+
+def _log_startup_timing(event: str) -> None:
+    """Record time since launch for one startup milestone (app log and bootstrap log)."""
+    elapsed_ms = (time.time() - _launch_started_at()) * 1000
+    _bootstrap_log(f"startup timing: {event} {elapsed_ms:.0f} ms")
+    try:
+        from backend.core.logging_config import get_logger
+        get_logger().info("启动耗时: %s %.0f ms", event, elapsed_ms)
+    except Exception:
+        pass
+
+
 def _kill_old_instances(port: int) -> None:
     """
     启动前结束占用本程序端口或同名 exe 的旧进程，避免残留导致无法启动。
@@ -105,20 +137,12 @@ def _kill_old_instances(port: int) -> None:
         time.sleep(1.5)
 
 
-def _wait_for_server(port: int, timeout_sec: float = 15.0, interval: float = 0.5) -> bool:
-    """等待本地服务就绪，返回 True 表示已就绪。"""
-    import socket
-    import urllib.request
-    url = f"http://127.0.0.1:{port}/api/health"
-    deadline = time.monotonic() + timeout_sec
-    while time.monotonic() < deadline:
-        try:
-            req = urllib.request.Request(url)
-            urllib.request.urlopen(req, timeout=2)
-            return True
-        except (OSError, urllib.error.URLError, socket.timeout):
-            time.sleep(interval)
-    return False
+def _wait_for_server(port: int) -> bool:
+    """等待本进程内的服务开始监听（server_ready 事件），返回 True 表示已就绪。"""
+    if not wait_until_ready():
+        return False
+    _log_startup_timing("server ready")
+    return True
 
 
 def _open_main_window_webview(port: int, keep_tray_after_close: bool = True) -> None:
@@ -127,12 +151,13 @@ def _open_main_window_webview(port: int, keep_tray_after_close: bool = True) ->
     Args:
         keep_tray_after_close: 如果为 True，关闭窗口后保持托盘运行
     """
-    if not _wait_for_server(port):
-        _bootstrap_log("server not ready, skip webview")
-        return
     url = f"http://127.0.0.1:{port}"
     try:
+        # Imported while the API thread is still starting, so the two overlap
         import webview
+        if not _wait_for_server(port):
+            _bootstrap_log("server not ready, skip webview")
+            return
         _bootstrap_log("starting webview")
         window = webview.create_window(
             "Windows 文件清理工具",
@@ -141,6 +166,11 @@ def _open_main_window_webview(port: int, keep_tray_after_close: bool = True) ->
             height=700,
             min_size=(800, 600),
         )
+        try:
+            window.events.shown += lambda *a: _log_startup_timing("window shown")
+            window.events.loaded += lambda *a: _log_startup_timing("page loaded")
+        except AttributeError:
+            pass  # older pywebview without window events
         webview.start()
         _bootstrap_log("webview closed by user")
         if keep_tray_after_close:
@@ -148,8 +178,7 @@ def _open_main_window_webview(port: int, keep_tray_after_close: bool = True) ->
             _keep_running()
     except ImportError:
         _bootstrap_log("webview not available, using browser")
-        import webbrowser
-        webbrowser.open(url)
+        _open_main_window_browser(port)
         _keep_running()
     except Exception:
         _bootstrap_log("webview failed", traceback.format_exc())
@@ -174,6 +203,7 @@ def _open_main_window_browser(port: int) -> None:
     url = f"http://127.0.0.1:{port}"
     import webbrowser
     webbrowser.open(url)
+    _log_startup_timing("browser opened")
 
 
 if __name__ == "__main__":
@@ -213,12 +243,8 @@ if __name__ == "__main__":
                 raise
             import threading
 
-            def run_api() -> None:
-                try:
-                    run_server(port=port)
-                except Exception:
-                    _bootstrap_log("server thread failed", traceback.format_exc())
-                    raise
+            def on_server_error(e: BaseException) -> None:
+                _bootstrap_log("server thread failed", "".join(traceback.format_exception(e)))
 
             def run_tray_thread() -> None:
                 try:
@@ -226,9 +252,8 @@ if __name__ == "__main__":
                 except Exception:
                     _bootstrap_log("tray thread failed", traceback.format_exc())
 
-            # 启动 API 服务器线程
-            t_api = threading.Thread(target=run_api, daemon=True)
-            t_api.start()
+            # 启动 API 服务器线程；监听后在后台线程计算首次托盘摘要（磁盘 + 垃圾），不阻塞窗口
+            start_server_thread(port=port, on_ready=_disk_check_callback, on_error=on_server_error)
             _bootstrap_log("server thread started")
 
             # 启动托盘线程
@@ -236,9 +261,6 @@ if __name__ == "__main__":
             t_tray.start()
             _bootstrap_log("tray thread started")
 
-            time.sleep(1)
-            _disk_check_callback()
-
             # 主线程运行 webview（webview 必须在主线程）
             _bootstrap_log("about to open webview on main thread")
             if args.browser:
@@ -0,0 +1,156 @@
+"""
+Benchmark: requests/sec for the read-mostly endpoints the Vue views poll
+(/api/config, /api/disk/drives, /api/scan/large-files) against a local
+uvicorn server (separate process) with a seeded index. Each endpoint is
+measured with plain GETs and with conditional GETs (If-None-Match from the
+first response).
+Usage: python scripts/bench_api_cache.py [--rows 50000] [--seconds 3] [--concurrency 16]
+"""
+import argparse
+import asyncio
+import os
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import httpx  # noqa: E402
+import uvicorn  # noqa: E402
+
+import backend.core.config as config_mod  # noqa: E402
+import backend.services.index_service as index_mod  # noqa: E402
+
+ENDPOINTS = [
+    ("/api/config", {}),
+    ("/api/disk/drives", {}),
+    ("/api/scan/large-files", {"min_size_mb": 1, "limit": 100}),
+]
+
+
+def seed_index(rows: int) -> None:
+    index_mod.ensure_index_schema()
+    conn = sqlite3.connect(index_mod._db_path())
+    with conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO file_index (path, volume, size_bytes, mtime_ns, is_dir, dir_path)"
+            " VALUES (?,?,?,?,0,?)",
+            (
+                (f"C:\\bench\\{i // 1000}\\f{i}.bin", "C:", (i % 5000) * 1024 * 1024, i, f"C:\\bench\\{i // 1000}")
+                for i in range(rows)
+            ),
+        )
+    conn.close()
+
+
+def serve(tmp: str, port: int, rows: int) -> None:
+    """Server process: temp config and index, seeded rows, uvicorn in the foreground."""
+    index_mod.INDEX_DB_DIR = os.path.join(tmp, "db")
+    config_mod.CONFIG_DIR = tmp
+    config_mod.CONFIG_FILE = os.path.join(tmp, "config.json")
+    seed_index(rows)
+    from backend.main import app
+
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def start_server(tmp: str, rows: int) -> tuple[subprocess.Popen, int]:
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+    proc = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), "--serve", tmp, "--port", str(port), "--rows", str(rows)]
+    )
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/api/health").status_code == 200:
+                return proc, port
+        except httpx.TransportError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("server did not start")
+
+
+async def _request(reader, writer, target: str, extra: str) -> tuple[int, dict, bytes]:
+    """One HTTP/1.1 keep-alive GET on an open connection."""
+    writer.write(f"GET {target} HTTP/1.1\r\nHost: bench\r\n{extra}\r\n".encode())
+    head = await reader.readuntil(b"\r\n\r\n")
+    lines = head.decode("latin-1").split("\r\n")
+    status = int(lines[0].split()[1])
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            k, v = line.split(":", 1)
+            headers[k.strip().lower()] = v.strip()
+    body = await reader.readexactly(int(headers.get("content-length", 0)))
+    return status, headers, body
+
+
+async def measure(port: int, path: str, params: dict, seconds: float, concurrency: int, conditional: bool) -> tuple[float, dict]:
+    """
+    Raw keep-alive connections (one per worker) so the generator is cheap
+    compared with the server and the numbers reflect server-side work.
+    """
+    target = str(httpx.URL(path, params=params))
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    _status, headers, _body = await _request(reader, writer, target, "")
+    writer.close()
+    extra = ""
+    if conditional and headers.get("etag"):
+        extra = f"If-None-Match: {headers['etag']}\r\n"
+    codes: dict[int, int] = {}
+    count = 0
+    deadline = time.perf_counter() + seconds
+
+    async def worker() -> None:
+        nonlocal count
+        r, w = await asyncio.open_connection("127.0.0.1", port)
+        try:
+            while time.perf_counter() < deadline:
+                status, _h, _b = await _request(r, w, target, extra)
+                codes[status] = codes.get(status, 0) + 1
+                count += 1
+        finally:
+            w.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return count / (time.perf_counter() - start), codes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--serve", help=argparse.SUPPRESS)
+    parser.add_argument("--port", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.serve:
+        serve(args.serve, args.port, args.rows)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        proc, port = start_server(tmp, args.rows)
+        try:
+            for path, params in ENDPOINTS:
+                for conditional in (False, True):
+                    rps, codes = asyncio.run(
+                        measure(port, path, params, args.seconds, args.concurrency, conditional)
+                    )
+                    mode = "If-None-Match" if conditional else "plain"
+                    print(f"{path:24s} {mode:14s} {rps:8.0f} req/s  {codes}")
+        finally:
+            proc.terminate()
+            proc.wait()
+
+
+if __name__ == "__main__":
+    main()
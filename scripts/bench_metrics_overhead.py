@@ -0,0 +1,143 @@
+"""
+Benchmark: cost of metrics recording in the directory-walker hot loops.
+Builds a synthetic tree, then times the junk walker, full_scan_directory and
+the index walker with metrics recording on and off (alternating runs, best
+of each). Run-to-run noise on a walk is a few percent, so the acceptance
+number is the bound: recording calls made during one walk x measured cost
+per call / walk time, which must stay under 1 %.
+Batch sleeps and load throttling are disabled for the run so only walking is
+timed. Usage: python scripts/bench_metrics_overhead.py [--dirs 400] [--files 50] [--runs 7]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import backend.services.index_service as index_mod  # noqa: E402
+import backend.services.junk_service as junk_mod  # noqa: E402
+from backend.core import metrics  # noqa: E402
+
+
+def build_tree(base: str, dirs: int, files: int) -> str:
+    root = os.path.join(base, "tree")
+    for d in range(dirs):
+        sub = os.path.join(root, f"g{d % 20}", f"d{d}")
+        os.makedirs(sub, exist_ok=True)
+        for f in range(files):
+            with open(os.path.join(sub, f"f{f}.dat"), "wb") as fh:
+                fh.write(b"x" * (f * 37 % 4096))
+    return root
+
+
+def _no_throttle() -> None:
+    index_mod.BATCH_SLEEP_SECONDS = 0
+    index_mod.is_under_load = lambda: False
+    index_mod.throttle_if_needed = lambda: None
+    junk_mod.throttle_if_needed = lambda: None
+
+
+def walkers(root: str) -> dict:
+    def junk() -> None:
+        junk_mod.JunkAnalyzer()._walk_root(root, "temp")  # fresh analyzer: every dir listed
+
+    def full_scan() -> None:
+        for _ in index_mod.full_scan_directory(root):
+            pass
+
+    def incremental() -> None:
+        index_mod.index_incremental_rescan("B:", root)  # every dir unchanged: walk + rollup reads
+
+    return {"junk walker": junk, "full_scan_directory": full_scan, "index incremental": incremental}
+
+
+def time_walkers(root: str) -> dict[str, float]:
+    out = {}
+    for name, fn in walkers(root).items():
+        start = time.perf_counter()
+        fn()
+        out[name] = time.perf_counter() - start
+    return out
+
+
+def count_recording_calls(root: str) -> dict[str, int]:
+    """Recording calls (counter inc + histogram record) made by one walk of each walker."""
+    calls = [0]
+    orig_inc, orig_record = metrics._Value.inc, metrics.HdrHistogram.record_ns
+
+    def inc(self, amount=1):
+        calls[0] += 1
+        orig_inc(self, amount)
+
+    def record_ns(self, value_ns):
+        calls[0] += 1
+        orig_record(self, value_ns)
+
+    metrics._Value.inc, metrics.HdrHistogram.record_ns = inc, record_ns
+    out = {}
+    try:
+        for name, fn in walkers(root).items():
+            calls[0] = 0
+            fn()
+            out[name] = calls[0]
+    finally:
+        metrics._Value.inc, metrics.HdrHistogram.record_ns = orig_inc, orig_record
+    return out
+
+
+def per_call_cost(n: int = 200_000) -> tuple[float, float]:
+    h = metrics.HdrHistogram()
+    c = metrics.get_metrics().counter("bench_calls_total", "Benchmark counter.")
+    start = time.perf_counter_ns()
+    for i in range(n):
+        h.record_ns(i)
+    hist_ns = (time.perf_counter_ns() - start) / n
+    start = time.perf_counter_ns()
+    for _ in range(n):
+        c.inc()
+    return hist_ns, (time.perf_counter_ns() - start) / n
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dirs", type=int, default=400)
+    parser.add_argument("--files", type=int, default=50)
+    parser.add_argument("--runs", type=int, default=7)
+    args = parser.parse_args()
+    _no_throttle()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = build_tree(tmp, args.dirs, args.files)
+        db_dir = os.path.join(tmp, "db")
+        index_mod.INDEX_DB_DIR = db_dir
+        index_mod.index_full_scan_volume("B:", root)
+        time_walkers(root)  # warm the page cache
+        samples: dict[bool, dict[str, list[float]]] = {True: {}, False: {}}
+        for i in range(args.runs * 2):
+            enabled = i % 2 == 0
+            metrics.set_enabled(enabled)
+            for name, secs in time_walkers(root).items():
+                samples[enabled].setdefault(name, []).append(secs)
+        metrics.set_enabled(True)
+        calls = count_recording_calls(root)
+
+    hist_ns, counter_ns = per_call_cost()
+    per_call = max(hist_ns, counter_ns)
+    print(f"tree: {args.dirs} dirs x {args.files} files, best of {args.runs} runs")
+    print(f"histogram record {hist_ns:.0f} ns/call, counter inc {counter_ns:.0f} ns/call")
+    for name in samples[True]:
+        on = min(samples[True][name])
+        off = min(samples[False][name])
+        bound = calls[name] * per_call / (off * 1e9) * 100
+        print(
+            f"  {name:22s} off {off * 1000:7.1f} ms  on {on * 1000:7.1f} ms  measured {(on - off) / off * 100:+6.2f} %"
+            f"  | {calls[name]:4d} calls -> bound {bound:.3f} %"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Benchmark: quarantine (rename into store + manifest) and restore throughput
+for many small files. Runs on any OS against a temp directory.
+Usage: python scripts/bench_quarantine.py [--files 100000] [--batch 1000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from backend.services.quarantine_service import QuarantineStore  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--files", type=int, default=100_000)
+    parser.add_argument("--batch", type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        src = os.path.join(tmp, "cache")
+        paths = []
+        for i in range(args.files):
+            d = os.path.join(src, f"{i // 1000:04d}")
+            if i % 1000 == 0:
+                os.makedirs(d, exist_ok=True)
+            p = os.path.join(d, f"entry_{i}.tmp")
+            with open(p, "wb") as f:
+                f.write(b"x" * 512)
+            paths.append(p)
+
+        store = QuarantineStore(os.path.join(tmp, "quarantine"))
+        start = time.perf_counter()
+        for i in range(0, len(paths), args.batch):
+            store.dispose_batch(paths[i : i + args.batch], "bench")
+            store.flush()
+        q_sec = time.perf_counter() - start
+
+        start = time.perf_counter()
+        report = store.restore_run("bench")
+        r_sec = time.perf_counter() - start
+
+        print(f"files:      {args.files}")
+        print(f"quarantine: {q_sec:.2f}s  ({args.files / q_sec:,.0f} files/s)")
+        print(f"restore:    {r_sec:.2f}s  ({report.restored / r_sec:,.0f} files/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+Benchmark: backend cold-start cost. Runs `python -X importtime -c "import
+backend.main"` in fresh interpreters (temp APPDATA, so no user config is
+touched) and reports the total import time, the critical path (from the
+root, repeatedly the child with the largest cumulative time) and the modules
+with the most self time, grouped by top-level package. With --serve it also
+measures wall time from process spawn until the API socket accepts
+connections. Runs on Linux; nothing Windows-only is imported at startup.
+Usage: python scripts/bench_startup.py [--runs 5] [--module backend.main] [--top 15] [--serve]
+"""
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass, field
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+@dataclass
+class ImportNode:
+    name: str
+    self_us: int
+    cumulative_us: int
+    children: list["ImportNode"] = field(default_factory=list)
+
+
+def parse_importtime(stderr: str) -> list[ImportNode]:
+    """
+    Top-level import nodes from -X importtime output. Lines are printed
+    post-order (children before their parent), indented two spaces per level.
+    """
+    pending: dict[int, list[ImportNode]] = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        parts = line[len("import time:"):].split("|", 2)
+        if len(parts) != 3 or not parts[0].strip().isdigit():
+            continue
+        raw_name = parts[2][1:]  # drop the separator space
+        depth = (len(raw_name) - len(raw_name.lstrip(" "))) // 2
+        node = ImportNode(raw_name.strip(), int(parts[0]), int(parts[1]), pending.pop(depth + 1, []))
+        pending.setdefault(depth, []).append(node)
+    return pending.get(0, [])
+
+
+def find(nodes: list[ImportNode], name: str) -> ImportNode | None:
+    for node in nodes:
+        if node.name == name:
+            return node
+        hit = find(node.children, name)
+        if hit is not None:
+            return hit
+    return None
+
+
+def critical_path(node: ImportNode) -> list[ImportNode]:
+    path = [node]
+    while node.children:
+        node = max(node.children, key=lambda c: c.cumulative_us)
+        path.append(node)
+    return path
+
+
+def walk(node: ImportNode):
+    yield node
+    for child in node.children:
+        yield from walk(child)
+
+
+def _env(tmp: str) -> dict:
+    env = dict(os.environ)
+    env["APPDATA"] = tmp
+    env["PYTHONPATH"] = os.pathsep.join(p for p in (ROOT, env.get("PYTHONPATH")) if p)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)  # measure with .pyc, as a real launch would
+    return env
+
+
+def measure_imports(module: str, tmp: str) -> tuple[float, ImportNode]:
+    start = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=_env(tmp), capture_output=True, text=True,
+    )
+    wall = time.perf_counter() - start
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    node = find(parse_importtime(proc.stderr), module)
+    if node is None:
+        raise RuntimeError(f"{module} not found in importtime output")
+    return wall, node
+
+
+def measure_ready(tmp: str, timeout: float = 30.0) -> float:
+    """Seconds from spawning run_server until the port accepts a connection."""
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    code = f"from backend.main import run_server; run_server(port={port})"
+    start = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-c", code], cwd=ROOT, env=_env(tmp),
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                socket.create_connection(("127.0.0.1", port), timeout=0.1).close()
+                return time.perf_counter() - start
+            except OSError:
+                if proc.poll() is not None:
+                    raise RuntimeError("server exited before listening")
+                time.sleep(0.005)
+        raise RuntimeError("server did not start")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--module", default="backend.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--serve", action="store_true", help="also measure spawn-to-listening")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        measure_imports(args.module, tmp)  # warm-up: compile .pyc, fill the page cache
+        runs = [measure_imports(args.module, tmp) for _ in range(args.runs)]
+        # Report the median run so one noisy interpreter does not skew the tree
+        runs.sort(key=lambda r: r[1].cumulative_us)
+        wall, root = runs[len(runs) // 2]
+        totals = [r[1].cumulative_us / 1000 for r in runs]
+        print(f"import {args.module}: median {statistics.median(totals):.1f} ms "
+              f"(min {min(totals):.1f}, max {max(totals):.1f}; process wall {wall * 1000:.0f} ms)")
+
+        print("\ncritical path (cumulative / self ms):")
+        for depth, node in enumerate(critical_path(root)):
+            print(f"  {node.cumulative_us / 1000:8.1f} {node.self_us / 1000:7.1f}  {'  ' * depth}{node.name}")
+
+        nodes = list(walk(root))
+        print(f"\ntop {args.top} modules by self time (ms):")
+        for node in sorted(nodes, key=lambda n: -n.self_us)[:args.top]:
+            print(f"  {node.self_us / 1000:7.1f}  {node.name}")
+
+        by_package: dict[str, int] = {}
+        for node in nodes:
+            pkg = node.name.split(".")[0]
+            by_package[pkg] = by_package.get(pkg, 0) + node.self_us
+        print("\nself time by top-level package (ms):")
+        for pkg, us in sorted(by_package.items(), key=lambda kv: -kv[1])[:args.top]:
+            print(f"  {us / 1000:7.1f}  {pkg}")
+
+        if args.serve:
+            ready = [measure_ready(tmp) for _ in range(args.runs)]
+            print(f"\nspawn -> listening: median {statistics.median(ready) * 1000:.0f} ms "
+                  f"(min {min(ready) * 1000:.0f}, max {max(ready) * 1000:.0f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -64,8 +64,8 @@ def test_rebuild_index():
     r = requests.post(f"{BASE_URL}/api/scan/rebuild-index", json={"drive": "C:"}, timeout=5)
     assert r.status_code == 200
     data = r.json()
-    assert data.get("status") == "started"
-    print("[OK] Rebuild index triggered")
+    assert data.get("status") in ("queued", "already_queued")
+    print("[OK] Rebuild index queued")
 
 def test_frontend_served():
     r = requests.get(f"{BASE_URL}/", timeout=5)